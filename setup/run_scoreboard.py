@@ -0,0 +1,347 @@
+"""Local scoreboard runner.
+
+Run backend tests of all frameworks listed in the scoreboard configuration
+concurrently and generate the static website from the collected results.
+
+Each framework is tested in its own docker container built from the Dockerfile
+in the "runtimes" directory matching the framework results directory,
+e.g. "./results/onnx-runtime/stable" is tested with
+"./runtimes/onnx-runtime/stable/Dockerfile".
+Containers are run by a bounded pool of jobs and each of them gets
+its own CPU budget, so a full scoreboard refresh takes about as long
+as the slowest backend.
+
+Usage (from the main dir):
+    python3 setup/run_scoreboard.py --config ./setup/config.json --jobs 3
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Exit code of pytest when some backend tests failed (the job results are complete)
+TESTS_FAILED_CODE = 1
+
+
+class ScoreboardError(Exception):
+    """Base class for exceptions in this module."""
+
+    pass
+
+
+def load_config(file_path="./setup/config.json"):
+    """Load scoreboard configuration file.
+
+    :param file_path: Path to the config file, defaults to "./setup/config.json"
+    :type file_path: str
+    :raises ScoreboardError: Raise ScoreboardError if config file can't be loaded.
+    :return: Dictionary with the scoreboard configuration.
+    :rtype: dict
+    """
+    file_path = os.path.abspath(file_path)
+    try:
+        with open(file_path, "r") as config_file:
+            config = json.load(config_file)
+    except (IOError, json.decoder.JSONDecodeError) as err:
+        raise ScoreboardError("Can't load the scoreboard config file!", err)
+    return config
+
+
+def get_dockerfile_path(results_dir):
+    """Return path to the Dockerfile of runtime with the specified results directory.
+
+    Runtimes directory tree mirrors the results directory tree,
+    e.g. "./results/ngraph/stable" -> "./runtimes/ngraph/stable/Dockerfile".
+
+    :param results_dir: Path to the framework results directory.
+    :type results_dir: str
+    :return: Path to the Dockerfile.
+    :rtype: str
+    """
+    path_parts = os.path.normpath(results_dir).split(os.sep)
+    path_parts = ["runtimes" if part == "results" else part for part in path_parts]
+    return os.path.join(*path_parts, "Dockerfile")
+
+
+def get_jobs(config, states=("stable", "development")):
+    """Return list of test jobs for frameworks listed in the config.
+
+    Job example:
+    {
+        "id": "ngraph-stable",
+        "name": "nGraph",
+        "results_dir": "./results/ngraph/stable",
+        "dockerfile": "runtimes/ngraph/stable/Dockerfile",
+        "image": "scoreboard/ngraph-stable"
+    }
+
+    :param config: Dictionary with the scoreboard config (documented in README.md).
+    :type config: dict
+    :param states: Runtime versions to run, defaults to ("stable", "development")
+    :type states: tuple, optional
+    :return: List of jobs.
+    :rtype: list
+    """
+    jobs = []
+    for state in states:
+        for framework_id, framework_config in config.get(state, {}).items():
+            results_dir = framework_config.get("results_dir")
+            job_id = "{framework}-{state}".format(framework=framework_id, state=state)
+            jobs.append(
+                {
+                    "id": job_id,
+                    "name": framework_config.get("name", framework_id),
+                    "results_dir": results_dir,
+                    "dockerfile": framework_config.get(
+                        "dockerfile", get_dockerfile_path(results_dir)
+                    ),
+                    "image": "scoreboard/{0}".format(job_id),
+                }
+            )
+    return jobs
+
+
+def get_cpu_budget(jobs_count, max_jobs, cpu_count=None):
+    """Return number of CPUs available for a single job.
+
+    :param jobs_count: Number of all jobs.
+    :type jobs_count: int
+    :param max_jobs: Maximal number of jobs running at the same time.
+    :type max_jobs: int
+    :param cpu_count: Number of CPUs, defaults to os.cpu_count()
+    :type cpu_count: int, optional
+    :return: Number of CPUs per job.
+    :rtype: int
+    """
+    cpu_count = cpu_count or os.cpu_count() or 1
+    concurrent_jobs = max(1, min(jobs_count, max_jobs))
+    return max(1, cpu_count // concurrent_jobs)
+
+
+def run_command(command, log_file):
+    """Run command and write its output to the log file.
+
+    :param command: Command with arguments.
+    :type command: list
+    :param log_file: Opened log file.
+    :type log_file: file
+    :return: Command return code.
+    :rtype: int
+    """
+    log_file.write("$ {0}\n".format(" ".join(command)))
+    log_file.flush()
+    return subprocess.call(command, stdout=log_file, stderr=subprocess.STDOUT)
+
+
+def get_test_args(benchmark=None, refresh_results=False, cpus=1):
+    """Return additional pytest arguments passed to the container.
+
+    Thread settings of the threads benchmark are limited to the container CPUs,
+    which are not visible as the number of cores inside the container.
+
+    :param benchmark: Benchmark mode run instead of tests, defaults to None
+    :type benchmark: str, optional
+    :param refresh_results: Don't use cached results, defaults to False
+    :type refresh_results: bool, optional
+    :param cpus: Number of CPUs available for the container, defaults to 1
+    :type cpus: int, optional
+    :return: Arguments joined with spaces.
+    :rtype: str
+    """
+    test_args = []
+    if benchmark:
+        test_args.append("--benchmark={0}".format(benchmark))
+    if benchmark == "threads":
+        threads = [2 ** power for power in range(cpus.bit_length())]
+        threads = [count for count in threads if count < cpus] + [cpus]
+        threads = ",".join(str(count) for count in threads)
+        test_args.append("--benchmark_threads={0}".format(threads))
+    if refresh_results:
+        test_args.append("--refresh_results")
+    return " ".join(test_args)
+
+
+def run_job(job, cpus, logs_dir, skip_build=False, benchmark=None, refresh=False):
+    """Build docker image of the framework and run backend tests in the container.
+
+    Results are saved in the framework results directory mounted in the container.
+    Benchmarks are run in a single test process, so the measurements don't compete
+    for the container CPUs. Failed backend tests don't fail the job, only errors
+    of the docker build and pytest exit codes other than TESTS_FAILED_CODE do.
+
+    :param job: Job description returned by get_jobs.
+    :type job: dict
+    :param cpus: Number of CPUs available for the container.
+    :type cpus: int
+    :param logs_dir: Directory to save the job log file.
+    :type logs_dir: str
+    :param skip_build: Use already built docker image, defaults to False
+    :type skip_build: bool, optional
+    :param benchmark: Benchmark mode run instead of tests, defaults to None
+    :type benchmark: str, optional
+    :param refresh: Run tests even if their results are cached, defaults to False
+    :type refresh: bool, optional
+    :return: Return code of the failed command or 0.
+    :rtype: int
+    """
+    build_command = ["docker", "build", "-t", job["image"], "-f", job["dockerfile"]]
+    build_command.append(".")
+    test_command = [
+        "docker",
+        "run",
+        "--rm",
+        "--name",
+        "scoreboard-{0}".format(job["id"]),
+        "--cpus",
+        str(cpus),
+        "--env-file",
+        "setup/env.list",
+        "-e",
+        "TEST_WORKERS={0}".format(0 if benchmark else cpus),
+        "-e",
+        "TEST_ARGS={0}".format(get_test_args(benchmark, refresh, cpus)),
+        "-v",
+        "{0}:/root/results".format(os.path.abspath(job["results_dir"])),
+        job["image"],
+    ]
+
+    log_path = os.path.join(logs_dir, "{0}.log".format(job["id"]))
+    with open(log_path, "w") as log_file:
+        if not skip_build:
+            return_code = run_command(build_command, log_file)
+            if return_code:
+                return return_code
+        return_code = run_command(test_command, log_file)
+    return 0 if return_code == TESTS_FAILED_CODE else return_code
+
+
+def run_jobs(jobs, max_jobs, cpus, logs_dir, **job_options):
+    """Run jobs concurrently in a bounded pool.
+
+    Each job waits on its docker processes, so a thread pool is enough
+    to keep max_jobs containers running at the same time.
+
+    :param jobs: List of jobs returned by get_jobs.
+    :type jobs: list
+    :param max_jobs: Maximal number of jobs running at the same time.
+    :type max_jobs: int
+    :param cpus: Number of CPUs available for a single job.
+    :type cpus: int
+    :param logs_dir: Directory to save the jobs log files.
+    :type logs_dir: str
+    :param job_options: Keyword arguments of run_job (skip_build, benchmark, refresh).
+    :type job_options: dict
+    :return: Dictionary with job id as a key and return code as a value.
+    :rtype: dict
+    """
+    os.makedirs(logs_dir, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=max_jobs) as executor:
+        futures = {
+            job["id"]: executor.submit(run_job, job, cpus, logs_dir, **job_options)
+            for job in jobs
+        }
+        return {job_id: future.result() for job_id, future in futures.items()}
+
+
+def generate_website(config_path):
+    """Generate static website from the collected results.
+
+    :param config_path: Path to the scoreboard config file.
+    :type config_path: str
+    :return: Generator return code.
+    :rtype: int
+    """
+    generator_path = os.path.join("website-generator", "generator.py")
+    return subprocess.call([sys.executable, generator_path, "--config", config_path])
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument(
+        "--config",
+        dest="config",
+        help="Load configuration from the specified json file",
+        default="./setup/config.json",
+        type=str,
+    )
+    parser.add_argument(
+        "--jobs",
+        dest="jobs",
+        help="Maximal number of backends tested at the same time, defaults to all",
+        default=None,
+        type=int,
+    )
+    parser.add_argument(
+        "--cpus",
+        dest="cpus",
+        help="Number of CPUs for each backend, defaults to CPU count divided by jobs",
+        default=None,
+        type=int,
+    )
+    parser.add_argument(
+        "--state",
+        dest="states",
+        help="Run only the specified runtime versions (stable/development)",
+        action="append",
+        choices=["stable", "development"],
+    )
+    parser.add_argument(
+        "--logs_dir",
+        dest="logs_dir",
+        help="Directory to save the jobs log files",
+        default="./logs",
+        type=str,
+    )
+    parser.add_argument(
+        "--skip_build",
+        dest="skip_build",
+        help="Use already built docker images",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--benchmark",
+        dest="benchmark",
+        help="Run the benchmark of the specified mode instead of backend tests",
+        choices=["concurrency", "latency", "scaling", "threads"],
+    )
+    parser.add_argument(
+        "--refresh",
+        dest="refresh",
+        help="Run tests even if results for the same versions are cached",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--skip_website",
+        dest="skip_website",
+        help="Don't generate the static website",
+        action="store_true",
+    )
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    jobs = get_jobs(config, args.states or ("stable", "development"))
+    max_jobs = args.jobs or len(jobs)
+    cpus = args.cpus or get_cpu_budget(len(jobs), max_jobs)
+
+    return_codes = run_jobs(
+        jobs,
+        max_jobs,
+        cpus,
+        args.logs_dir,
+        skip_build=args.skip_build,
+        benchmark=args.benchmark,
+        refresh=args.refresh,
+    )
+    for job_id, return_code in return_codes.items():
+        status = "exit code {0}".format(return_code) if return_code else "done"
+        print("{job}: {status}".format(job=job_id, status=status))
+
+    website_code = 0 if args.skip_website else generate_website(args.config)
+    # Pages are generated from results of other jobs, even if some of them failed
+    failed_codes = [return_code for return_code in return_codes.values() if return_code]
+    sys.exit(failed_codes[0] if failed_codes else website_code)
@@ -0,0 +1,301 @@
+"""Warm backend server for repeated runs of the ONNX backend tests.
+
+The server imports the ONNX backend and creates its test cases once
+(as test_backend.py does), opens the test data cache and keeps them resident.
+Run requests are accepted over a Unix socket, so repeated runs (local debugging,
+benchmark sweeps) skip the backend import and the test cases creation.
+
+Request is a single JSON line with the tests selection:
+    {"ops": ["Abs", "Conv"]}           - node tests of the operators,
+    {"tests": ["OnnxBackendNodeModelTest::test_abs_cpu"]} - listed tests.
+Request without "ops" and "tests" (an empty JSON object) runs all tests.
+Result of each test is streamed back as a JSON line in the results log format
+(see result_log.py) and the last line contains the report in the report.json format:
+    {"test": "OnnxBackendNodeModelTest::test_abs_cpu", "status": "passed",
+     "durations": {"call": 0.0123}, "properties": {"profile": {...}}}
+    {"report": {"passed": [...], "failed": [...], ..., "date": "..."}}
+Requests are handled one at a time in the server process, so a backend crash
+stops the server (run such backends with the pytest `--isolate` option).
+
+Usage:
+    python3 test/backend_server.py serve --onnx_backend onnxruntime.backend.backend
+    python3 test/backend_server.py run --ops Abs,Conv --output report.json
+"""
+
+import data_cache
+import importlib
+import impacted
+import json
+import os
+import profiling
+import result_log
+import socket
+import socketserver
+import tempfile
+import test
+import time
+import unittest
+
+from argparse import ArgumentParser
+from collections import OrderedDict
+from datetime import datetime
+
+
+# Default path to the server socket
+SOCKET_PATH = os.path.join(tempfile.gettempdir(), "onnx-backend-scoreboard.sock")
+
+
+class BackendTests:
+    """ONNX backend test cases kept resident in the server process."""
+
+    def __init__(self, onnx_backend_module):
+        """Open the test data cache, import the backend and create its test cases.
+
+        :param onnx_backend_module: ONNX backend module to import.
+        :type onnx_backend_module: str
+        """
+        cache_dir = os.environ.get("TEST_DATA_CACHE_DIR", data_cache.CACHE_DIR)
+        if not data_cache.load(cache_dir):
+            data_cache.build(cache_dir)
+            data_cache.load(cache_dir)
+
+        test.ONNX_BACKEND_MODULE = onnx_backend_module
+        test.BENCHMARK = None
+        test_backend = importlib.import_module("test_backend")
+        self.backend_import = dict(profiling.IMPORT)
+        self._tests = OrderedDict()
+        for test_case in test_backend.backend_test.test_cases.values():
+            for method_name in unittest.defaultTestLoader.getTestCaseNames(test_case):
+                test_name = "{0}::{1}".format(test_case.__name__, method_name)
+                self._tests[test_name] = (test_case, method_name)
+        self._tests_ops = None
+
+    def __len__(self):
+        """Return number of the test cases."""
+        return len(self._tests)
+
+    def select(self, request):
+        """Return names of tests selected by the run request.
+
+        :param request: Run request with "tests" or "ops" list, all tests without them.
+        :type request: dict
+        :return: List of test names in the collection order.
+        :rtype: list
+        """
+        test_names = list(self._tests)
+        if request.get("tests") is not None:
+            selected_tests = set(request["tests"])
+        elif request.get("ops") is not None:
+            if self._tests_ops is None:
+                self._tests_ops = impacted.get_node_tests_ops()
+            selected_tests = impacted.select_ops(
+                test_names, set(request["ops"]), self._tests_ops
+            )
+        else:
+            return test_names
+        return [test_name for test_name in test_names if test_name in selected_tests]
+
+    def run(self, test_name):
+        """Run the test and return its results log record.
+
+        :param test_name: Test name, e.g. "OnnxBackendNodeModelTest::test_abs_cpu".
+        :type test_name: str
+        :return: Test record with status, duration and profile.
+        :rtype: dict
+        """
+        test_case, method_name = self._tests[test_name]
+        result = unittest.TestResult()
+        start = time.perf_counter()
+        test_case(method_name).run(result)
+        duration = time.perf_counter() - start
+        record = {
+            "test": test_name,
+            "status": get_status(result),
+            "durations": {"call": duration},
+            "properties": {},
+        }
+        profile = profiling.pop_test_profile()
+        if profile:
+            record["properties"]["profile"] = profile
+        return record
+
+
+def get_status(result):
+    """Return status of the single test in the report format.
+
+    :param result: Result of the test run.
+    :type result: unittest.TestResult
+    :return: "passed", "failed" or "skipped".
+    :rtype: str
+    """
+    if result.errors or result.failures or result.unexpectedSuccesses:
+        return "failed"
+    if result.skipped:
+        return "skipped"
+    return "passed"
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handler running the tests selected by the request."""
+
+    def handle(self):
+        """Stream results of the selected tests and the final report."""
+        try:
+            request = json.loads(self.rfile.readline().decode())
+        except (UnicodeDecodeError, json.decoder.JSONDecodeError) as err:
+            self._send({"error": "Invalid request: {0}".format(err)})
+            return
+
+        records = {}
+        try:
+            for test_name in self.server.tests.select(request):
+                records[test_name] = self.server.tests.run(test_name)
+                self._send(records[test_name])
+        except BrokenPipeError:
+            return  # The client disconnected, the run is stopped
+        report = result_log.get_report(records, impacted.REPORT_KEYS)
+        report["date"] = datetime.now().strftime("%m/%d/%Y %H:%M:%S")
+        self._send({"report": report})
+
+    def _send(self, message):
+        """Write JSON line to the client.
+
+        :param message: JSON serializable message.
+        :type message: dict
+        """
+        self.wfile.write((json.dumps(message, sort_keys=True) + "\n").encode())
+        self.wfile.flush()
+
+
+def serve(onnx_backend_module, socket_path=SOCKET_PATH):
+    """Import the backend and serve run requests until interrupted (Ctrl+C).
+
+    :param onnx_backend_module: ONNX backend module to import.
+    :type onnx_backend_module: str
+    :param socket_path: Path to the server socket, defaults to SOCKET_PATH
+    :type socket_path: str, optional
+    """
+    tests = BackendTests(onnx_backend_module)
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    with socketserver.UnixStreamServer(socket_path, _RequestHandler) as server:
+        server.tests = tests
+        print(
+            "Serving {0} tests of {1} (imported in {2} s) at {3}".format(
+                len(tests),
+                onnx_backend_module,
+                tests.backend_import.get("time"),
+                socket_path,
+            )
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(socket_path)
+
+
+def run(request, socket_path=SOCKET_PATH):
+    """Send the run request to the server and yield the streamed messages.
+
+    :param request: Run request, see the module docstring.
+    :type request: dict
+    :param socket_path: Path to the server socket, defaults to SOCKET_PATH
+    :type socket_path: str, optional
+    :return: Generator of test records and the final message with the report.
+    :rtype: generator
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall((json.dumps(request) + "\n").encode())
+        with client.makefile("rb") as server_file:
+            for line in server_file:
+                yield json.loads(line.decode())
+
+
+def _run_client(args):
+    """Run tests on the server, print their results and save the report.
+
+    :param args: Parsed command line arguments.
+    :type args: argparse.Namespace
+    """
+    request = {}
+    if args.tests:
+        request["tests"] = args.tests
+    elif args.ops:
+        request["ops"] = args.ops.split(",")
+    for message in run(request, args.socket):
+        if "test" in message:
+            print("{0} {1}".format(message["status"].upper(), message["test"]))
+        elif "report" in message:
+            _save_report(message["report"], args.output)
+        else:
+            print(message.get("error"))
+
+
+def _save_report(report, file_path=None):
+    """Print number of tests with each status and save the report.
+
+    :param report: Report in the report.json format.
+    :type report: dict
+    :param file_path: Path to the report file, defaults to None (not saved)
+    :type file_path: str, optional
+    """
+    counts = ("{0} {1}".format(len(report[key]), key) for key in impacted.REPORT_KEYS)
+    print(", ".join(counts))
+    if file_path:
+        with open(file_path, "w") as report_file:
+            json.dump(report, report_file, sort_keys=True, indent=4)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument(
+        "command",
+        help="Start the server or run tests on the running server",
+        choices=["serve", "run"],
+    )
+    parser.add_argument(
+        "--socket",
+        dest="socket",
+        help="Path to the server socket",
+        default=SOCKET_PATH,
+        type=str,
+    )
+    parser.add_argument(
+        "--onnx_backend",
+        dest="onnx_backend",
+        help="ONNX backend module imported by the server",
+        default=os.environ.get("ONNX_BACKEND"),
+        type=str,
+    )
+    parser.add_argument(
+        "--ops",
+        dest="ops",
+        help="Run node tests of the comma separated operators, e.g. Abs,Conv",
+        default=None,
+        type=str,
+    )
+    parser.add_argument(
+        "--tests",
+        dest="tests",
+        help="Run the listed tests, e.g. OnnxBackendNodeModelTest::test_abs_cpu",
+        nargs="+",
+        default=None,
+    )
+    parser.add_argument(
+        "--output",
+        dest="output",
+        help="Save the report in the report.json format to the file",
+        default=None,
+        type=str,
+    )
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        if not args.onnx_backend:
+            parser.error("--onnx_backend or ONNX_BACKEND variable is required")
+        serve(args.onnx_backend, args.socket)
+    else:
+        _run_client(args)
@@ -0,0 +1,1240 @@
+"""ONNX backend benchmarks.
+
+Benchmark mode (pytest option `--benchmark=<mode>`) replaces the ONNX backend
+unit tests with benchmark test cases generated for the imported backend.
+Each benchmark test saves its result in the RESULTS dictionary, the result is
+attached to the pytest report and saved by conftest.py in the results directory.
+
+Benchmark modes:
+    latency - per-operator inference latency of ONNX node test models.
+    scaling - compile time, latency and throughput of synthetic models
+              of growing depth, width and tensor size (see synthetic_models.py).
+    threads - latency of representative node test and synthetic models
+              with 1, 2, 4 ... intra-op threads up to the number of cores.
+    concurrency - throughput, tail latency and wrong outputs of ONNX node test
+                  models run from concurrent threads and processes.
+"""
+
+import data_cache
+import glob
+import importlib
+import multiprocessing
+import os
+import profiling
+import synthetic_models
+import threading
+import time
+import unittest
+
+import numpy as np
+import onnx
+import onnx.backend.test.loader
+import onnx.backend.test.runner
+
+from concurrent.futures import ThreadPoolExecutor
+from onnx import numpy_helper
+
+
+# Results of benchmark tests run in the current process (test name as a key)
+RESULTS = {}
+
+# Device used to prepare models
+DEVICE = "CPU"
+
+# Benchmark options (set by conftest.py from command line),
+# threads is a comma separated list of thread settings of the threads mode,
+# concurrency is the number of inference threads and processes of the concurrency mode
+OPTIONS = {
+    "runs": 100,
+    "warmup": 10,
+    "max_time": 1.0,
+    "threads": None,
+    "concurrency": 4,
+}
+
+# Synthetic models benchmarked by the scaling mode:
+# base model configuration and values of each dimension swept separately
+SCALING = {
+    "base": {"depth": 4, "width": 1, "size": 32},
+    "sweeps": {
+        "depth": [1, 2, 4, 8, 16, 32],
+        "width": [1, 2, 4, 8],
+        "size": [8, 16, 32, 64, 128],
+    },
+}
+
+# Models benchmarked by the threads mode: node tests (benchmarked if they passed)
+# and synthetic models large enough to be split between threads,
+# and environment variables limiting thread pools of the runtimes
+THREADS = {
+    "node_tests": [
+        "test_conv_with_strides_padding",
+        "test_gemm_default_matrix_bias",
+        "test_matmul_2d",
+        "test_maxpool_2d_default",
+        "test_softmax_large_number",
+    ],
+    "synthetic": [
+        {"mix": "conv", "depth": 8, "width": 1, "size": 128},
+        {"mix": "matmul", "depth": 8, "width": 1, "size": 128},
+        {"mix": "mixed", "depth": 8, "width": 4, "size": 64},
+    ],
+    "env_vars": [
+        "OMP_NUM_THREADS",
+        "MKL_NUM_THREADS",
+        "OPENBLAS_NUM_THREADS",
+        "TF_NUM_INTRAOP_THREADS",
+    ],
+}
+
+# Backend prepare option setting the number of intra-op threads of the runtime,
+# other runtimes are limited with the THREADS environment variables only
+THREAD_OPTIONS = {"onnxruntime.backend.backend": "intra_op_num_threads"}
+
+# Ways of running the inference concurrently in the concurrency mode
+CONCURRENCY_MODES = ["threads", "processes"]
+
+# Time limit in seconds of preparing the model in all concurrency mode workers
+CONCURRENCY_TIMEOUT = 120
+
+# Worker processes of the threads and concurrency modes,
+# with mode and number of threads or processes as a key
+_worker_pools = {}
+
+# Backend, node test cases and start barrier of the worker process
+_worker = {}
+
+
+def load_test_data(model_dir, data_set=0):
+    """Load ONNX test model with its inputs and expected outputs.
+
+    Data is loaded from the pre-decoded test data cache if it's open.
+
+    :param model_dir: Path to the ONNX test directory with model.onnx file
+                      and test_data_set_* directories.
+    :type model_dir: str
+    :param data_set: Number of the test data set, defaults to 0
+    :type data_set: int, optional
+    :return: Model, list of input arrays and list of expected output arrays.
+    :rtype: tuple
+    """
+    model = data_cache.load_model(os.path.join(model_dir, "model.onnx"))
+    data_dir = os.path.join(model_dir, "test_data_set_{0}".format(data_set))
+    arrays = {}
+    for kind in ["input", "output"]:
+        arrays[kind] = []
+        file_count = len(glob.glob(os.path.join(data_dir, "{0}_*.pb".format(kind))))
+        for idx in range(file_count):
+            file_path = os.path.join(data_dir, "{0}_{1}.pb".format(kind, idx))
+            array = data_cache.get_array(file_path)
+            if array is None:
+                tensor = onnx.TensorProto()
+                with open(file_path, "rb") as tensor_file:
+                    tensor.ParseFromString(tensor_file.read())
+                array = numpy_helper.to_array(tensor)
+            arrays[kind].append(array)
+    return model, arrays["input"], arrays["output"]
+
+
+def load_test_case(test_case):
+    """Load model, inputs and expected outputs of the ONNX node test case.
+
+    Node test cases of older ONNX versions are stored in test directories,
+    newer ONNX versions generate the model and data sets in memory.
+
+    :param test_case: ONNX node test case.
+    :type test_case: onnx.backend.test.loader.TestCase
+    :return: Model, list of input arrays and list of expected output arrays.
+    :rtype: tuple
+    """
+    if test_case.model_dir:
+        return load_test_data(test_case.model_dir)
+    inputs, outputs = test_case.data_sets[0]
+    return test_case.model, list(inputs), list(outputs)
+
+
+def get_model_ops(model):
+    """Return sorted list of operators used in the model graph.
+
+    :param model: ONNX model.
+    :type model: onnx.ModelProto
+    :return: List of operator names (as in nodes.csv).
+    :rtype: list
+    """
+    return sorted({node.op_type for node in model.graph.node})
+
+
+def prepare_model(backend, model, device=DEVICE, **options):
+    """Prepare model with the backend and return a function running the inference.
+
+    Backends without prepare function run the whole model with run_model each time.
+
+    :param backend: ONNX backend module.
+    :type backend: module
+    :param model: ONNX model.
+    :type model: onnx.ModelProto
+    :param device: Device name, defaults to "CPU"
+    :type device: str, optional
+    :param **options: Backend specific options, e.g. number of threads.
+    :return: Function running the inference with the list of inputs.
+    :rtype: function
+    """
+    if hasattr(backend, "prepare"):
+        backend_rep = backend.prepare(model, device, **options)
+        return backend_rep.run
+    return lambda inputs: backend.run_model(model, inputs, device, **options)
+
+
+def measure_latency(run, inputs, runs, warmup, max_time):
+    """Return latencies of the repeated inference runs.
+
+    Runs are stopped when the number of runs or the time limit is reached,
+    but at least one run is always measured.
+
+    :param run: Function running the inference.
+    :type run: function
+    :param inputs: List of input arrays.
+    :type inputs: list
+    :param runs: Maximal number of measured runs.
+    :type runs: int
+    :param warmup: Number of runs before the measurement.
+    :type warmup: int
+    :param max_time: Time limit of the measurement in seconds.
+    :type max_time: float
+    :return: List of latencies in seconds.
+    :rtype: list
+    """
+    for _ in range(warmup):
+        run(inputs)
+
+    latencies = []
+    end_time = time.perf_counter() + max_time
+    while len(latencies) < max(runs, 1):
+        start = time.perf_counter()
+        run(inputs)
+        latencies.append(time.perf_counter() - start)
+        if time.perf_counter() > end_time:
+            break
+    return latencies
+
+
+def get_latency_stats(latencies):
+    """Return latency percentiles and throughput.
+
+    :param latencies: List of latencies in seconds.
+    :type latencies: list
+    :return: Dictionary with p50, p90, p99 latencies in milliseconds,
+             throughput in inferences per second and number of runs.
+    :rtype: dict
+    """
+    p50, p90, p99 = np.percentile(np.array(latencies) * 1000, [50, 90, 99])
+    return {
+        "p50": round(float(p50), 4),
+        "p90": round(float(p90), 4),
+        "p99": round(float(p99), 4),
+        "throughput": round(len(latencies) / sum(latencies), 2),
+        "runs": len(latencies),
+    }
+
+
+def _latency_test(backend, test_case):
+    """Return test function benchmarking latency of the node test model.
+
+    :param backend: ONNX backend module.
+    :type backend: module
+    :param test_case: ONNX node test case.
+    :type test_case: onnx.backend.test.loader.TestCase
+    :return: Test function.
+    :rtype: function
+    """
+
+    def run(test_self):
+        model, inputs, _ = load_test_case(test_case)
+        run_model = prepare_model(backend, model)
+        latencies = measure_latency(
+            run_model, inputs, OPTIONS["runs"], OPTIONS["warmup"], OPTIONS["max_time"]
+        )
+        result = get_latency_stats(latencies)
+        result["ops"] = get_model_ops(model)
+        RESULTS[get_test_name(test_self)] = result
+
+    return run
+
+
+def _node_tests(backend, passed_tests, make_test):
+    """Return benchmark test functions of ONNX node test models.
+
+    Only node tests which passed in the latest report are benchmarked.
+
+    :param backend: ONNX backend module.
+    :type backend: module
+    :param passed_tests: Names of tests passed in the latest report,
+                         None to benchmark all tests.
+    :type passed_tests: set
+    :param make_test: Function returning test function of the backend and test case.
+    :type make_test: function
+    :return: Dictionary with test name as a key and test function as a value.
+    :rtype: dict
+    """
+    tests = {}
+    for test_case in onnx.backend.test.loader.load_model_tests(kind="node"):
+        test_name = "{0}_{1}".format(test_case.name, DEVICE.lower())
+        report_name = "OnnxBackendNodeModelTest::{0}".format(test_name)
+        if passed_tests is not None and report_name not in passed_tests:
+            continue
+        tests[test_name] = make_test(backend, test_case)
+    return tests
+
+
+def _latency_tests(backend, passed_tests=None):
+    """Return latency benchmark test functions of ONNX node test models.
+
+    :param backend: ONNX backend module.
+    :type backend: module
+    :param passed_tests: Names of tests passed in the latest report,
+                         defaults to None (benchmark all tests)
+    :type passed_tests: set, optional
+    :return: Dictionary with test name as a key and test function as a value.
+    :rtype: dict
+    """
+    return _node_tests(backend, passed_tests, _latency_test)
+
+
+def get_scaling_configs():
+    """Return configurations of synthetic models benchmarked by the scaling mode.
+
+    For each operators mix, one dimension (depth, width or size) of the base
+    configuration is changed at a time, which gives a scaling curve per dimension.
+
+    :return: Dictionary with test name as a key and model configuration as a value.
+    :rtype: dict
+    """
+    configs = {}
+    for mix in sorted(synthetic_models.OP_MIXES):
+        for dimension, values in sorted(SCALING["sweeps"].items()):
+            for value in values:
+                config = dict(SCALING["base"], mix=mix)
+                config[dimension] = value
+                test_name = "test_{mix}_d{depth}_w{width}_s{size}".format(**config)
+                configs[test_name] = config
+    return configs
+
+
+def _scaling_test(backend, config):
+    """Return test function benchmarking the synthetic model.
+
+    :param backend: ONNX backend module.
+    :type backend: module
+    :param config: Model configuration with mix, depth, width and size keys.
+    :type config: dict
+    :return: Test function.
+    :rtype: function
+    """
+
+    def run(test_self):
+        model = synthetic_models.make_model(
+            synthetic_models.OP_MIXES[config["mix"]],
+            config["depth"],
+            config["width"],
+            config["size"],
+        )
+        inputs = synthetic_models.make_inputs(model)
+        start = time.perf_counter()
+        run_model = prepare_model(backend, model)
+        compile_time = time.perf_counter() - start
+        latencies = measure_latency(
+            run_model, inputs, OPTIONS["runs"], OPTIONS["warmup"], OPTIONS["max_time"]
+        )
+        result = get_latency_stats(latencies)
+        result.update(config, nodes=len(model.graph.node))
+        result["compile_time"] = round(compile_time * 1000, 4)
+        RESULTS[get_test_name(test_self)] = result
+
+    return run
+
+
+def _scaling_tests(backend, passed_tests=None):
+    """Return scaling benchmark test functions of synthetic models.
+
+    :param backend: ONNX backend module.
+    :type backend: module
+    :param passed_tests: Not used, synthetic models aren't part of the report.
+    :type passed_tests: set, optional
+    :return: Dictionary with test name as a key and test function as a value.
+    :rtype: dict
+    """
+    return {
+        test_name: _scaling_test(backend, config)
+        for test_name, config in get_scaling_configs().items()
+    }
+
+
+def get_thread_counts():
+    """Return thread settings benchmarked by the threads mode.
+
+    :return: Sorted list of thread counts from the "threads" option,
+             by default 1, 2, 4 ... and the number of cores available to the process.
+    :rtype: list
+    """
+    if OPTIONS.get("threads"):
+        return sorted({int(threads) for threads in OPTIONS["threads"].split(",")})
+    if hasattr(os, "sched_getaffinity"):
+        cores = len(os.sched_getaffinity(0))
+    else:
+        cores = os.cpu_count() or 1
+    thread_counts = {cores}
+    threads = 1
+    while threads < cores:
+        thread_counts.add(threads)
+        threads *= 2
+    return sorted(thread_counts)
+
+
+def _init_worker(onnx_backend_module, barrier=None):
+    """Import the backend in the worker process.
+
+    :param onnx_backend_module: ONNX backend module to import.
+    :type onnx_backend_module: str
+    :param barrier: Barrier of all processes of the pool, defaults to None
+    :type barrier: multiprocessing.Barrier, optional
+    """
+    _worker["backend"] = importlib.import_module(onnx_backend_module)
+    _worker["barrier"] = barrier
+
+
+def _get_thread_pool(onnx_backend_module, threads):
+    """Return worker process with the backend limited to the number of threads.
+
+    Thread pools of most runtimes are sized once, when the runtime is loaded,
+    so each thread setting has a separate process started with the THREADS
+    environment variables. Processes are reused by all tests of the session.
+
+    :param onnx_backend_module: ONNX backend module to import.
+    :type onnx_backend_module: str
+    :param threads: Number of threads.
+    :type threads: int
+    :return: Pool with a single worker process.
+    :rtype: multiprocessing.pool.Pool
+    """
+    key = ("threads", threads)
+    if key not in _worker_pools:
+        environ = dict(os.environ)
+        os.environ.update({name: str(threads) for name in THREADS["env_vars"]})
+        try:
+            _worker_pools[key] = multiprocessing.get_context("spawn").Pool(
+                1, initializer=_init_worker, initargs=(onnx_backend_module,)
+            )
+        finally:
+            os.environ.clear()
+            os.environ.update(environ)
+    return _worker_pools[key]
+
+
+def _get_process_pool(onnx_backend_module, processes):
+    """Return worker processes of the concurrency mode sharing a start barrier.
+
+    Processes are reused by all tests of the session, so the backend
+    is imported only once in each of them.
+
+    :param onnx_backend_module: ONNX backend module to import.
+    :type onnx_backend_module: str
+    :param processes: Number of processes.
+    :type processes: int
+    :return: Pool of the worker processes.
+    :rtype: multiprocessing.pool.Pool
+    """
+    key = ("processes", processes)
+    if key not in _worker_pools:
+        context = multiprocessing.get_context("spawn")
+        _worker_pools[key] = context.Pool(
+            processes,
+            initializer=_init_worker,
+            initargs=(onnx_backend_module, context.Barrier(processes)),
+        )
+    return _worker_pools[key]
+
+
+def _close_worker_pool(key):
+    """Stop worker processes of the pool.
+
+    :param key: Key of the pool in _worker_pools.
+    :type key: tuple
+    """
+    pool = _worker_pools.pop(key, None)
+    if pool is not None:
+        pool.terminate()
+        pool.join()
+
+
+def close_worker_pools():
+    """Stop worker processes of the threads and concurrency modes."""
+    for key in list(_worker_pools):
+        _close_worker_pool(key)
+
+
+def _get_node_test(test_name):
+    """Return ONNX node test case loaded in the worker process.
+
+    :param test_name: Node test name, e.g. "test_abs".
+    :type test_name: str
+    :return: ONNX node test case.
+    :rtype: onnx.backend.test.loader.TestCase
+    """
+    if "node_tests" not in _worker:
+        _worker["node_tests"] = {
+            test_case.name: test_case
+            for test_case in onnx.backend.test.loader.load_model_tests(kind="node")
+        }
+    return _worker["node_tests"][test_name]
+
+
+def _load_threads_model(model_config):
+    """Return model and inputs of the threads mode model configuration.
+
+    :param model_config: Node test name or synthetic model configuration.
+    :type model_config: dict
+    :return: Model and list of input arrays.
+    :rtype: tuple
+    """
+    if "node_test" not in model_config:
+        model = synthetic_models.make_model(
+            synthetic_models.OP_MIXES[model_config["mix"]],
+            model_config["depth"],
+            model_config["width"],
+            model_config["size"],
+        )
+        return model, synthetic_models.make_inputs(model)
+    model, inputs, _ = load_test_case(_get_node_test(model_config["node_test"]))
+    return model, inputs
+
+
+def _run_threads_benchmark(model_config, threads, options):
+    """Measure latency of the model in the threads mode worker process.
+
+    :param model_config: Node test name or synthetic model configuration.
+    :type model_config: dict
+    :param threads: Number of threads of the worker process.
+    :type threads: int
+    :param options: Benchmark options (OPTIONS of the parent process).
+    :type options: dict
+    :return: Latency statistics.
+    :rtype: dict
+    """
+    backend = _worker["backend"]
+    model, inputs = _load_threads_model(model_config)
+    backend_options = {}
+    if backend.__name__ in THREAD_OPTIONS:
+        backend_options[THREAD_OPTIONS[backend.__name__]] = threads
+    run_model = prepare_model(backend, model, **backend_options)
+    latencies = measure_latency(
+        run_model, inputs, options["runs"], options["warmup"], options["max_time"]
+    )
+    return get_latency_stats(latencies)
+
+
+def _threads_test(backend, model_config):
+    """Return test function benchmarking the model with each thread setting.
+
+    :param backend: ONNX backend module.
+    :type backend: module
+    :param model_config: Node test name or synthetic model configuration.
+    :type model_config: dict
+    :return: Test function.
+    :rtype: function
+    """
+
+    def run(test_self):
+        curve = []
+        for threads in get_thread_counts():
+            pool = _get_thread_pool(backend.__name__, threads)
+            stats = pool.apply(
+                _run_threads_benchmark, (model_config, threads, dict(OPTIONS))
+            )
+            curve.append(dict(stats, threads=threads))
+        RESULTS[get_test_name(test_self)] = {
+            "model": model_config,
+            "curve": get_speedup_curve(curve),
+        }
+
+    return run
+
+
+def _threads_tests(backend, passed_tests=None):
+    """Return thread scaling benchmark test functions.
+
+    Node tests are benchmarked only if they passed in the latest report.
+
+    :param backend: ONNX backend module.
+    :type backend: module
+    :param passed_tests: Names of tests passed in the latest report,
+                         defaults to None (benchmark all tests)
+    :type passed_tests: set, optional
+    :return: Dictionary with test name as a key and test function as a value.
+    :rtype: dict
+    """
+    tests = {}
+    for node_test in THREADS["node_tests"]:
+        test_name = "{0}_{1}".format(node_test, DEVICE.lower())
+        report_name = "OnnxBackendNodeModelTest::{0}".format(test_name)
+        if passed_tests is not None and report_name not in passed_tests:
+            continue
+        tests[test_name] = _threads_test(backend, {"node_test": node_test})
+    for config in THREADS["synthetic"]:
+        test_name = "test_{mix}_d{depth}_w{width}_s{size}".format(**config)
+        tests[test_name] = _threads_test(backend, config)
+    return tests
+
+
+def get_speedup_curve(curve):
+    """Return latency curve with speedup and parallel efficiency of each point.
+
+    Speedup is the p50 latency of the first (smallest) thread setting divided
+    by the p50 latency of the point, parallel efficiency is the speedup divided
+    by the relative number of threads (1.0 for linear scaling).
+
+    :param curve: List of latency statistics with "threads" key sorted by threads.
+    :type curve: list
+    :return: List of points with "speedup" and "efficiency" keys.
+    :rtype: list
+    """
+    if not curve:
+        return []
+    base = curve[0]
+    points = []
+    for point in curve:
+        speedup = base["p50"] / point["p50"] if point["p50"] else 0.0
+        efficiency = speedup * base["threads"] / point["threads"]
+        points.append(
+            dict(point, speedup=round(speedup, 4), efficiency=round(efficiency, 4))
+        )
+    return points
+
+
+def is_output_correct(outputs, ref_outputs, rtol, atol):
+    """Check inference outputs against the reference outputs of the test case.
+
+    Outputs are compared the same way as in the ONNX backend tests.
+
+    :param outputs: Outputs returned by the backend.
+    :type outputs: list
+    :param ref_outputs: Reference outputs of the test case.
+    :type ref_outputs: list
+    :param rtol: Relative tolerance of the test case.
+    :type rtol: float
+    :param atol: Absolute tolerance of the test case.
+    :type atol: float
+    :return: True if outputs match the reference outputs.
+    :rtype: bool
+    """
+    try:
+        onnx.backend.test.runner.Runner.assert_similar_outputs(
+            ref_outputs, list(outputs), rtol, atol
+        )
+    except (AssertionError, TypeError):
+        return False
+    return True
+
+
+def _run_safely(run_model, inputs):
+    """Run the inference and return its latency and outputs.
+
+    Errors of failed inference (profiling.RUN_ERRORS) are counted by the caller,
+    other errors are raised.
+
+    :param run_model: Function running the inference with the list of inputs.
+    :type run_model: function
+    :param inputs: List of input arrays.
+    :type inputs: list
+    :return: Latency in seconds and outputs (None if the inference raised an error).
+    :rtype: tuple
+    """
+    start = time.perf_counter()
+    try:
+        outputs = run_model(inputs)
+    except profiling.RUN_ERRORS:
+        outputs = None
+    return time.perf_counter() - start, outputs
+
+
+def get_outputs_key(outputs):
+    """Return bytes identifying shapes and values of the outputs.
+
+    :param outputs: Outputs returned by the backend.
+    :type outputs: list
+    :return: Key equal for equal outputs.
+    :rtype: bytes
+    """
+    parts = []
+    for output in outputs:
+        if isinstance(output, (list, tuple)):
+            parts.append(b"[" + get_outputs_key(output) + b"]")
+            continue
+        array = np.asarray(output)
+        if array.dtype == object:
+            data = repr(array.tolist()).encode()
+        else:
+            data = array.tobytes()
+        parts.append(str(array.shape).encode() + data)
+    return b"|".join(parts)
+
+
+def _add_outputs(distinct_outputs, outputs):
+    """Count the outputs of a run among distinct outputs of all runs.
+
+    :param distinct_outputs: Dictionary with outputs key (None for errors)
+                             as a key and list of outputs and count as a value.
+    :type distinct_outputs: dict
+    :param outputs: Outputs of the run, None if the run raised an error.
+    :type outputs: list
+    """
+    key = None if outputs is None else get_outputs_key(outputs)
+    if key not in distinct_outputs:
+        distinct_outputs[key] = [outputs, 0]
+    distinct_outputs[key][1] += 1
+
+
+def _count_failures(distinct_outputs, reference):
+    """Return numbers of runs with wrong outputs and runs which raised an error.
+
+    :param distinct_outputs: Distinct outputs of the runs counted by _add_outputs.
+    :type distinct_outputs: dict
+    :param reference: Reference outputs, rtol and atol of the test case.
+    :type reference: tuple
+    :return: Dictionary with "wrong_outputs" and "errors" counts.
+    :rtype: dict
+    """
+    failures = {"wrong_outputs": 0, "errors": 0}
+    for outputs, count in distinct_outputs.values():
+        if outputs is None:
+            failures["errors"] += count
+        elif not is_output_correct(outputs, *reference):
+            failures["wrong_outputs"] += count
+    return failures
+
+
+def _run_concurrently(run_model, inputs, reference, barrier, options):
+    """Run the inference repeatedly for the whole time limit once all workers are ready.
+
+    All workers run for the same time, so their runs overlap even for short
+    inferences. Inference errors are counted instead of raised, and the barrier
+    is aborted if the worker raised other error during the warmup, so a single
+    failing worker doesn't leave the others waiting at the barrier. Only distinct
+    outputs are kept and they are checked after the measurement, so the comparison
+    doesn't slow down the concurrent runs.
+
+    :param run_model: Function running the inference with the list of inputs.
+    :type run_model: function
+    :param inputs: List of input arrays.
+    :type inputs: list
+    :param reference: Reference outputs, rtol and atol of the test case.
+    :type reference: tuple
+    :param barrier: Barrier of all concurrent workers.
+    :type barrier: threading.Barrier or multiprocessing.Barrier
+    :param options: Benchmark options.
+    :type options: dict
+    :return: Dictionary with list of latencies in seconds, numbers of runs
+             with wrong outputs and errors and start and end (wall clock) time.
+    :rtype: dict
+    """
+    ready = False
+    try:
+        for _ in range(options["warmup"]):
+            _run_safely(run_model, inputs)
+        ready = True
+    finally:
+        if not ready:
+            barrier.abort()
+    barrier.wait(CONCURRENCY_TIMEOUT)
+
+    latencies, distinct_outputs = [], {}
+    start = time.time()
+    end_time = time.perf_counter() + options["max_time"]
+    while not latencies or time.perf_counter() < end_time:
+        latency, outputs = _run_safely(run_model, inputs)
+        latencies.append(latency)
+        _add_outputs(distinct_outputs, outputs)
+    result = {"latencies": latencies, "start": start, "end": time.time()}
+    result.update(_count_failures(distinct_outputs, reference))
+    return result
+
+
+def _run_threads(run_model, inputs, reference, concurrency):
+    """Run the prepared model from concurrent threads.
+
+    :param run_model: Function running the inference with the list of inputs.
+    :type run_model: function
+    :param inputs: List of input arrays.
+    :type inputs: list
+    :param reference: Reference outputs, rtol and atol of the test case.
+    :type reference: tuple
+    :param concurrency: Number of threads.
+    :type concurrency: int
+    :return: List of results of the threads returned by _run_concurrently.
+    :rtype: list
+    """
+    barrier = threading.Barrier(concurrency)
+    with ThreadPoolExecutor(concurrency) as executor:
+        futures = [
+            executor.submit(
+                _run_concurrently, run_model, inputs, reference, barrier, dict(OPTIONS)
+            )
+            for _ in range(concurrency)
+        ]
+        return [future.result() for future in futures]
+
+
+def _run_concurrency_worker(test_name, options):
+    """Prepare the node test model and run it in the concurrency mode worker process.
+
+    :param test_name: Node test name, e.g. "test_abs".
+    :type test_name: str
+    :param options: Benchmark options (OPTIONS of the parent process).
+    :type options: dict
+    :return: Result of the process returned by _run_concurrently.
+    :rtype: dict
+    """
+    test_case = _get_node_test(test_name)
+    model, inputs, ref_outputs = load_test_case(test_case)
+    run_model = prepare_model(_worker["backend"], model)
+    reference = (ref_outputs, test_case.rtol, test_case.atol)
+    return _run_concurrently(run_model, inputs, reference, _worker["barrier"], options)
+
+
+def _run_processes(onnx_backend_module, test_name, concurrency):
+    """Run the node test model from concurrent processes.
+
+    Each process prepares its own copy of the model. Processes are restarted
+    if any of them failed, so the broken start barrier isn't reused.
+
+    :param onnx_backend_module: ONNX backend module to import.
+    :type onnx_backend_module: str
+    :param test_name: Node test name, e.g. "test_abs".
+    :type test_name: str
+    :param concurrency: Number of processes.
+    :type concurrency: int
+    :return: List of results of the processes returned by _run_concurrently,
+             None if a process crashed or didn't finish in time.
+    :rtype: list
+    """
+    pool = _get_process_pool(onnx_backend_module, concurrency)
+    args = [(test_name, dict(OPTIONS))] * concurrency
+    timeout = 2 * CONCURRENCY_TIMEOUT + OPTIONS["max_time"]
+    results = None
+    try:
+        results = pool.starmap_async(_run_concurrency_worker, args, 1).get(timeout)
+    except (multiprocessing.TimeoutError, threading.BrokenBarrierError):
+        return None
+    finally:
+        if results is None:
+            _close_worker_pool(("processes", concurrency))
+    return results
+
+
+def get_concurrency_stats(worker_results, sequential=None):
+    """Return aggregate statistics of the concurrent workers.
+
+    Throughput is the number of runs of all workers divided by the time
+    from the first start to the last end of the workers (wall clock time
+    is used, since it's comparable between processes). Speedup is the throughput
+    divided by the throughput of the sequential runs (equal to the number
+    of workers if the inferences don't slow each other down, close to 1
+    if the runtime serializes them).
+
+    :param worker_results: List of results returned by _run_concurrently.
+    :type worker_results: list
+    :param sequential: Statistics of the sequential runs, defaults to None
+                       (statistics of the sequential runs are returned)
+    :type sequential: dict, optional
+    :return: Latency statistics with speedup and numbers of failed runs.
+    :rtype: dict
+    """
+    latencies = [
+        latency for result in worker_results for latency in result["latencies"]
+    ]
+    stats = get_latency_stats(latencies)
+    start = min(result["start"] for result in worker_results)
+    end = max(result["end"] for result in worker_results)
+    throughput = len(latencies) / max(end - start, 1e-9)
+    stats["throughput"] = round(throughput, 2)
+    if sequential is not None:
+        stats["speedup"] = round(throughput / sequential["throughput"], 4)
+    for key in ["wrong_outputs", "errors"]:
+        stats[key] = sum(result[key] for result in worker_results)
+    return stats
+
+
+def _concurrency_test(backend, test_case):
+    """Return test function running the node test model concurrently.
+
+    The model is prepared once and run from a single thread to get the baseline,
+    then from concurrent threads sharing the prepared model
+    and from concurrent processes.
+
+    :param backend: ONNX backend module.
+    :type backend: module
+    :param test_case: ONNX node test case.
+    :type test_case: onnx.backend.test.loader.TestCase
+    :return: Test function.
+    :rtype: function
+    """
+
+    def run(test_self):
+        model, inputs, ref_outputs = load_test_case(test_case)
+        run_model = prepare_model(backend, model)
+        reference = (ref_outputs, test_case.rtol, test_case.atol)
+        results = _run_threads(run_model, inputs, reference, 1)
+        sequential = get_concurrency_stats(results)
+        concurrency = OPTIONS["concurrency"]
+        results = _run_threads(run_model, inputs, reference, concurrency)
+        result = {
+            "ops": get_model_ops(model),
+            "concurrency": concurrency,
+            "sequential": sequential,
+            "threads": get_concurrency_stats(results, sequential),
+            "processes": {"crashed": True},
+        }
+        results = _run_processes(backend.__name__, test_case.name, concurrency)
+        if results is not None:
+            result["processes"] = get_concurrency_stats(results, sequential)
+        RESULTS[get_test_name(test_self)] = result
+
+    return run
+
+
+def _concurrency_tests(backend, passed_tests=None):
+    """Return concurrency benchmark test functions of ONNX node test models.
+
+    :param backend: ONNX backend module.
+    :type backend: module
+    :param passed_tests: Names of tests passed in the latest report,
+                         defaults to None (benchmark all tests)
+    :type passed_tests: set, optional
+    :return: Dictionary with test name as a key and test function as a value.
+    :rtype: dict
+    """
+    return _node_tests(backend, passed_tests, _concurrency_test)
+
+
+def get_test_name(test_self):
+    """Return name of the benchmark test in the report format.
+
+    :param test_self: Test case instance.
+    :type test_self: unittest.TestCase
+    :return: Test name, e.g. "OnnxBackendLatencyBenchmarkTest::test_abs_cpu".
+    :rtype: str
+    """
+    return "{0}::{1}".format(type(test_self).__name__, test_self._testMethodName)
+
+
+def create_test_cases(backend, mode, passed_tests=None):
+    """Return benchmark test cases for the specified mode.
+
+    :param backend: ONNX backend module.
+    :type backend: module
+    :param mode: Benchmark mode, one of MODES keys.
+    :type mode: str
+    :param passed_tests: Names of tests passed in the latest report,
+                         defaults to None (benchmark all tests)
+    :type passed_tests: set, optional
+    :return: Dictionary with test case name as a key and test case class as a value.
+    :rtype: dict
+    """
+    test_case_name = MODES[mode]["test_case"]
+    tests = MODES[mode]["tests"](backend, passed_tests)
+    return {test_case_name: type(test_case_name, (unittest.TestCase,), tests)}
+
+
+def _median_stats(tests_stats, keys):
+    """Return median of each statistic of the tests.
+
+    :param tests_stats: List of dictionaries with tests statistics.
+    :type tests_stats: list
+    :param keys: Names of statistics.
+    :type keys: list
+    :return: Dictionary with statistic name as a key and median as a value.
+    :rtype: dict
+    """
+    return {
+        key: round(float(np.median([stats[key] for stats in tests_stats])), 4)
+        for key in keys
+    }
+
+
+def summarize_latency(results):
+    """Return latency benchmark results with per-operator statistics.
+
+    Operator statistics are medians of statistics of all tests using the operator.
+    Results example:
+    {
+        "tests": {
+            "OnnxBackendLatencyBenchmarkTest::test_abs_cpu": {
+                "ops": ["Abs"],
+                "p50": 0.0123,
+                "p90": 0.0131,
+                "p99": 0.0205,
+                "throughput": 79365.08,
+                "runs": 100
+            }
+        },
+        "ops": {
+            "Abs": {
+                "p50": 0.0123,
+                "p90": 0.0131,
+                "p99": 0.0205,
+                "throughput": 79365.08,
+                "tests": 1
+            }
+        }
+    }
+
+    :param results: Dictionary with test name as a key and test result as a value.
+    :type results: dict
+    :return: Dictionary with tests and operators statistics.
+    :rtype: dict
+    """
+    ops_tests = {}
+    for test_result in results.values():
+        for op in test_result.get("ops", []):
+            ops_tests.setdefault(op, []).append(test_result)
+
+    ops = {}
+    for op, tests_stats in sorted(ops_tests.items()):
+        ops[op] = _median_stats(tests_stats, ["p50", "p90", "p99", "throughput"])
+        ops[op]["tests"] = len(tests_stats)
+    return {"tests": results, "ops": ops}
+
+
+def summarize_latency_trend(summary):
+    """Return latency benchmark summary saved in the trend.
+
+    :param summary: Latency benchmark results returned by summarize_latency.
+    :type summary: dict
+    :return: Dictionary with operator name as a key and p50 latency as a value.
+    :rtype: dict
+    """
+    return {op: stats.get("p50") for op, stats in summary.get("ops", {}).items()}
+
+
+def summarize_scaling(results):
+    """Return scaling benchmark results with scaling curves.
+
+    Curve of each operators mix and dimension contains results of models
+    which differ from the base configuration only in that dimension.
+    Results example:
+    {
+        "tests": {
+            "OnnxBackendScalingBenchmarkTest::test_conv_d4_w1_s32": {
+                "mix": "conv", "depth": 4, "width": 1, "size": 32, "nodes": 9,
+                "compile_time": 1.2345,
+                "p50": 0.0123, "p90": 0.0131, "p99": 0.0205,
+                "throughput": 79365.08, "runs": 100
+            }
+        },
+        "curves": {
+            "conv": {
+                "depth": [{"value": 4, "p50": 0.0123, "compile_time": 1.2345, ...}]
+            }
+        }
+    }
+
+    :param results: Dictionary with test name as a key and test result as a value.
+    :type results: dict
+    :return: Dictionary with tests results and scaling curves.
+    :rtype: dict
+    """
+    curves = {}
+    for test_result in results.values():
+        for dimension in SCALING["sweeps"]:
+            others = set(SCALING["base"]) - {dimension}
+            if any(test_result.get(key) != SCALING["base"][key] for key in others):
+                continue
+            point = dict(test_result, value=test_result.get(dimension))
+            mix_curves = curves.setdefault(test_result.get("mix"), {})
+            mix_curves.setdefault(dimension, []).append(point)
+
+    for mix_curves in curves.values():
+        for points in mix_curves.values():
+            points.sort(key=lambda point: point["value"])
+    return {"tests": results, "curves": curves}
+
+
+def summarize_scaling_trend(summary):
+    """Return scaling benchmark summary saved in the trend.
+
+    :param summary: Scaling benchmark results returned by summarize_scaling.
+    :type summary: dict
+    :return: Dictionary with operators mix as a key and p50 latency
+             of the base configuration model as a value.
+    :rtype: dict
+    """
+    trend = {}
+    for test_result in summary.get("tests", {}).values():
+        if all(test_result.get(key) == value for key, value in SCALING["base"].items()):
+            trend[test_result.get("mix")] = test_result.get("p50")
+    return trend
+
+
+def summarize_threads(results):
+    """Return thread scaling results with the median curve of all models.
+
+    Results example:
+    {
+        "tests": {
+            "OnnxBackendThreadsBenchmarkTest::test_conv_d8_w1_s128": {
+                "model": {"mix": "conv", "depth": 8, "width": 1, "size": 128},
+                "curve": [
+                    {"threads": 1, "p50": 2.5, "p90": 2.6, "p99": 2.9,
+                     "throughput": 398.1, "runs": 100,
+                     "speedup": 1.0, "efficiency": 1.0},
+                    {"threads": 2, "p50": 1.4, ...,
+                     "speedup": 1.7857, "efficiency": 0.8929}
+                ]
+            }
+        },
+        "curve": [{"threads": 1, "p50": 0.31, "speedup": 1.0, "efficiency": 1.0,
+                   "tests": 8}],
+        "threads": [1, 2]
+    }
+
+    :param results: Dictionary with test name as a key and test result as a value.
+    :type results: dict
+    :return: Dictionary with tests results, median curve and thread settings.
+    :rtype: dict
+    """
+    threads_stats = {}
+    for test_result in results.values():
+        for point in test_result.get("curve", []):
+            threads_stats.setdefault(point["threads"], []).append(point)
+
+    curve = []
+    for threads, tests_stats in sorted(threads_stats.items()):
+        point = _median_stats(tests_stats, ["p50", "speedup", "efficiency"])
+        point.update(threads=threads, tests=len(tests_stats))
+        curve.append(point)
+    return {"tests": results, "curve": curve, "threads": sorted(threads_stats)}
+
+
+def summarize_threads_trend(summary):
+    """Return thread scaling benchmark summary saved in the trend.
+
+    :param summary: Thread scaling results returned by summarize_threads.
+    :type summary: dict
+    :return: Dictionary with thread setting as a key and median speedup as a value.
+    :rtype: dict
+    """
+    return {str(point["threads"]): point["speedup"] for point in summary["curve"]}
+
+
+def summarize_concurrency(results):
+    """Return concurrency results with medians of each mode and failed tests.
+
+    Tests failed in a mode if any concurrent run returned wrong outputs
+    or raised an error, or if any process crashed.
+    Results example:
+    {
+        "tests": {
+            "OnnxBackendConcurrencyBenchmarkTest::test_abs_cpu": {
+                "ops": ["Abs"],
+                "concurrency": 4,
+                "sequential": {"p50": 0.0061, "p90": 0.0065, "p99": 0.0118,
+                               "throughput": 155011.9, "runs": 100},
+                "threads": {"p50": 0.0212, ..., "throughput": 171240.4,
+                            "speedup": 1.1047, "wrong_outputs": 0, "errors": 0},
+                "processes": {"p50": 0.0064, ..., "throughput": 601290.1,
+                              "speedup": 3.8790, "wrong_outputs": 0, "errors": 0}
+            }
+        },
+        "modes": {
+            "threads": {"p50": 0.0212, "p99": 0.0601, "speedup": 1.1047,
+                        "tests": 1, "failed": []},
+            "processes": {...}
+        },
+        "concurrency": 4
+    }
+
+    :param results: Dictionary with test name as a key and test result as a value.
+    :type results: dict
+    :return: Dictionary with tests results, summaries of modes and concurrency.
+    :rtype: dict
+    """
+    modes = {}
+    for mode in CONCURRENCY_MODES:
+        tests_stats = {
+            test_name: test_result[mode]
+            for test_name, test_result in results.items()
+            if mode in test_result
+        }
+        modes[mode] = _summarize_concurrency_mode(tests_stats)
+    concurrency = max(
+        (test_result.get("concurrency", 0) for test_result in results.values()),
+        default=0,
+    )
+    return {"tests": results, "modes": modes, "concurrency": concurrency}
+
+
+def _summarize_concurrency_mode(tests_stats):
+    """Return medians of statistics of the mode and tests failed in the mode.
+
+    :param tests_stats: Dictionary with test name as a key and statistics
+                        of the mode as a value.
+    :type tests_stats: dict
+    :return: Dictionary with medians, number of tests and failed tests names.
+    :rtype: dict
+    """
+    measured = [stats for stats in tests_stats.values() if not stats.get("crashed")]
+    summary = _median_stats(measured, ["p50", "p99", "speedup"]) if measured else {}
+    summary["tests"] = len(tests_stats)
+    summary["failed"] = sorted(
+        test_name
+        for test_name, stats in tests_stats.items()
+        if stats.get("crashed") or stats.get("wrong_outputs") or stats.get("errors")
+    )
+    return summary
+
+
+def summarize_concurrency_trend(summary):
+    """Return concurrency benchmark summary saved in the trend.
+
+    :param summary: Concurrency results returned by summarize_concurrency.
+    :type summary: dict
+    :return: Dictionary with mode as a key and median speedup
+             and number of failed tests as a value.
+    :rtype: dict
+    """
+    return {
+        mode: {
+            "speedup": mode_summary.get("speedup"),
+            "failed": len(mode_summary["failed"]),
+        }
+        for mode, mode_summary in summary["modes"].items()
+    }
+
+
+# Benchmark modes with test case name, test functions factory
+# and functions summarizing results and trend entry
+MODES = {
+    "latency": {
+        "test_case": "OnnxBackendLatencyBenchmarkTest",
+        "tests": _latency_tests,
+        "summarize": summarize_latency,
+        "summarize_trend": summarize_latency_trend,
+    },
+    "scaling": {
+        "test_case": "OnnxBackendScalingBenchmarkTest",
+        "tests": _scaling_tests,
+        "summarize": summarize_scaling,
+        "summarize_trend": summarize_scaling_trend,
+    },
+    "threads": {
+        "test_case": "OnnxBackendThreadsBenchmarkTest",
+        "tests": _threads_tests,
+        "summarize": summarize_threads,
+        "summarize_trend": summarize_threads_trend,
+    },
+    "concurrency": {
+        "test_case": "OnnxBackendConcurrencyBenchmarkTest",
+        "tests": _concurrency_tests,
+        "summarize": summarize_concurrency,
+        "summarize_trend": summarize_concurrency_trend,
+    },
+}
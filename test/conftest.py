@@ -8,17 +8,106 @@ From pytest docs: https://docs.pytest.org/en/latest/writing_plugins.html
 
 We're implementing reporting hooks to collect data about
 passing and failing tests for the scoreboard.
+
+Tests can be spread across worker processes with pytest-xdist (`-n <workers>`).
+Workers send their ONNX coverage data to the controller process, which merges it
+and generates the same report.json, trend.json and nodes.csv as a serial run.
+
+With the `--benchmark=<mode>` option, benchmark results attached to test reports
+are saved in <mode>.json and the benchmark trend log instead of the report.
+
+Result of each test is written to the results log as soon as the test finishes
+and the report is built from the log, so an interrupted run can be resumed
+with the `--resume` option (see result_log.py).
 """
 
+import benchmark
+import data_cache
+import impacted
+import isolation
 import json
+import memory_usage
 import os
+import profiling
+import result_cache
+import result_log
+import tempfile
 import test
+import trend_log
 
 from datetime import datetime
 
+import onnx
+import onnx.backend.test.report as onnx_report
+import pytest
+
+
+# This is a pytest variable to load extra plugins
+# Enable the ONNX compatibility report. The plugin is loaded here, not in the test
+# module, to be registered also in the pytest-xdist controller process,
+# which doesn't collect test modules.
+pytest_plugins = "onnx.backend.test.report"
 
 # Keys for values to save in report (matched with terminalreporter.stats)
-REPORT_KEYS = ["passed", "failed", "skipped"]
+REPORT_KEYS = [
+    "passed",
+    "failed",
+    "skipped",
+    isolation.CRASHED_STATUS,
+    isolation.TIMEOUT_STATUS,
+]
+
+# Key of the coverage data in the pytest-xdist worker output
+COVERAGE_OUTPUT_KEY = "onnx_coverage"
+
+# Trend summary keys ignored when comparing summary with the previous one
+TREND_IGNORED_KEYS = ["date", "durations", "profile", "memory"]
+
+# Trend summary keys of collapsed repeated runs (first run date and number of runs)
+TREND_RANGE_KEYS = ["first_date", "runs"]
+
+# Test phases which durations are saved
+DURATION_KEYS = ["setup", "call", "teardown"]
+
+# Ids of tests passed in the current process (used by pytest-xdist workers)
+_passed_tests = set()
+
+# Name of the pytest report user property with benchmark test result
+BENCHMARK_PROPERTY = "benchmark"
+
+# Test name as a key and benchmark test result as a value
+_benchmark_results = {}
+
+# Result cache key, directory and entry restored instead of running the tests
+_result_cache = {}
+
+# Name of the pytest report user property with test compile and run times
+PROFILE_PROPERTY = "profile"
+
+# Key of the backend import time in the pytest-xdist worker output
+IMPORT_OUTPUT_KEY = "backend_import"
+
+# Backend import measurements of all test processes
+_backend_imports = []
+
+# Name of the pytest report user property with test peak memory
+MEMORY_PROPERTY = "memory"
+
+# Keys of the test peak memory
+MEMORY_KEYS = ["rss_peak", "python_peak"]
+
+# Name of the pytest report user property with ONNX coverage mark of isolated test
+COVERAGE_PROPERTY = "onnx_coverage"
+
+# Pytest report user properties collected per test name
+_test_properties = {BENCHMARK_PROPERTY: _benchmark_results}
+
+# Pytest report user properties saved in the results log
+LOGGED_PROPERTIES = [PROFILE_PROPERTY, MEMORY_PROPERTY]
+
+# Results log of the session, records of finished and running tests
+# and names of tests finished by the resumed run
+_result_log = {}
 
 
 def pytest_addoption(parser):
@@ -28,29 +117,442 @@ def pytest_addoption(parser):
         help='"Select onnx backend module.\
             Example:  --onnx_backend="ngraph_onnx.onnx_importer.backend"',
     )
+    parser.addoption(
+        "--benchmark",
+        choices=sorted(benchmark.MODES.keys()),
+        help="Run benchmark instead of unit tests. Results are saved in <mode>.json.",
+    )
+    parser.addoption(
+        "--benchmark_runs",
+        type=int,
+        default=benchmark.OPTIONS["runs"],
+        help="Maximal number of measured inference runs of each benchmark test.",
+    )
+    parser.addoption(
+        "--benchmark_warmup",
+        type=int,
+        default=benchmark.OPTIONS["warmup"],
+        help="Number of inference runs before the measurement.",
+    )
+    parser.addoption(
+        "--benchmark_time",
+        type=float,
+        default=benchmark.OPTIONS["max_time"],
+        help="Time limit of the measurement of each benchmark test in seconds.",
+    )
+    parser.addoption(
+        "--benchmark_threads",
+        default=benchmark.OPTIONS["threads"],
+        help="Comma separated thread settings of the threads benchmark, e.g. 1,2,4 "
+        "(defaults to 1, 2, 4 ... up to the number of cores).",
+    )
+    parser.addoption(
+        "--benchmark_concurrency",
+        type=int,
+        default=benchmark.OPTIONS["concurrency"],
+        help="Number of concurrent inference threads and processes "
+        "of the concurrency benchmark.",
+    )
+    parser.addoption(
+        "--steady_state_runs",
+        type=int,
+        default=profiling.STEADY_STATE_RUNS,
+        help="Number of additional inference runs measuring the steady-state time.",
+    )
+    parser.addoption(
+        "--impacted",
+        choices=["failed", "ops", "sample"],
+        help="Run only impacted tests and merge their results into report.json.",
+    )
+    parser.addoption(
+        "--impacted_ops",
+        default="",
+        help="Comma separated operators tested in the ops impacted mode "
+        "(operators not passing in nodes.csv by default).",
+    )
+    parser.addoption(
+        "--sample_fraction",
+        type=float,
+        default=0.1,
+        help="Fraction of tests run in the sample impacted mode.",
+    )
+    parser.addoption(
+        "--sample_seed",
+        type=int,
+        default=0,
+        help="Seed of the random sample in the sample impacted mode.",
+    )
+    parser.addoption(
+        "--memory",
+        action="store_true",
+        help="Measure peak RSS growth and Python allocations peak of each test.",
+    )
+    parser.addoption(
+        "--isolate",
+        action="store_true",
+        help="Run tests in pytest-xdist workers replaced when a test crashes or "
+        "times out.",
+    )
+    parser.addoption(
+        "--test_timeout",
+        type=float,
+        default=isolation.TEST_TIMEOUT,
+        help="Timeout of a single test in seconds in the isolated mode.",
+    )
+    parser.addoption(
+        "--no_data_cache",
+        action="store_true",
+        help="Load test data from protobuf files instead of the pre-decoded cache.",
+    )
+    parser.addoption(
+        "--refresh_data_cache",
+        action="store_true",
+        help="Decode test data again, e.g. to add downloaded real models.",
+    )
+    parser.addoption(
+        "--resume",
+        action="store_true",
+        help="Skip tests finished in the results log of an interrupted run.",
+    )
+    parser.addoption(
+        "--refresh_results",
+        action="store_true",
+        help="Run the tests even if results for the same versions are cached.",
+    )
+    parser.addoption(
+        "--result_cache_size",
+        type=int,
+        default=result_cache.CACHE_SIZE,
+        help="Maximal number of cached results, 0 disables the result cache.",
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_cmdline_main(config):
+    """Pytest hook function."""
+    if not config.getvalue("isolate") or hasattr(config, "workerinput"):
+        return
+    if not hasattr(config.option, "numprocesses"):
+        raise pytest.UsageError("--isolate requires the pytest-xdist plugin.")
+    # Run at least one worker and replace crashed workers until the end of the run
+    config.option.numprocesses = config.option.numprocesses or 1
+    if config.option.maxworkerrestart is None:
+        config.option.maxworkerrestart = str(isolation.MAX_WORKER_RESTARTS)
 
 
 def pytest_configure(config):
     """Pytest hook function."""
     onnx_backend_module = config.getvalue("onnx_backend")
     test.ONNX_BACKEND_MODULE = onnx_backend_module
+    test.BENCHMARK = config.getvalue("benchmark")
+    test.IMPACTED = None if test.BENCHMARK else config.getvalue("impacted")
+    is_worker = hasattr(config, "workerinput")
+    if test.IMPACTED == "ops":
+        _configure_impacted_ops(config)
+    partial_run = test.BENCHMARK or test.IMPACTED
+    if not (is_worker or partial_run) and config.getvalue("result_cache_size") > 0:
+        _init_result_cache(config)
+    if is_worker or partial_run or _result_cache.get("entry"):
+        # nodes.csv is generated by the controller process of full unit tests run
+        # only (or restored from the result cache)
+        os.environ.pop("CSVDIR", None)
+    _init_result_log(config, is_worker)
+    if config.getvalue("isolate"):
+        _configure_isolation(config, is_worker)
+    if not (config.getvalue("no_data_cache") or _result_cache.get("entry")):
+        _init_data_cache(config, is_worker)
+    profiling.STEADY_STATE_RUNS = config.getvalue("steady_state_runs")
+    benchmark.OPTIONS.update(
+        runs=config.getvalue("benchmark_runs"),
+        warmup=config.getvalue("benchmark_warmup"),
+        max_time=config.getvalue("benchmark_time"),
+        threads=config.getvalue("benchmark_threads"),
+        concurrency=config.getvalue("benchmark_concurrency"),
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_logreport(report):
+    """Pytest hook function."""
+    if report.when == "call" and report.passed:
+        _passed_tests.add(report.nodeid)
+    for name, value in report.user_properties:
+        if name == COVERAGE_PROPERTY:
+            # Merged before the ONNX report plugin counts the passed test
+            _merge_coverage_marks(value)
+        elif name in _test_properties:
+            _test_properties[name][_get_test_name(report.nodeid)] = value
+    if _result_log.get("log"):
+        _log_test_report(report)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    """Pytest hook function."""
+    isolation.start_timeout(item.config.getvalue("test_timeout"))
+    yield
+    isolation.cancel_timeout()
+
+
+def pytest_report_teststatus(report, config):
+    """Pytest hook function."""
+    if not isolation.is_crash_report(report):
+        return None
+    log_dir = getattr(config.option, "crash_log_dir", None)
+    status = isolation.CRASHED_STATUS
+    if log_dir:
+        status = isolation.get_crash_status(log_dir, report.node.gateway.id)
+    return status, status[0].upper(), status.upper()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    """Pytest hook function."""
+    if not item.config.getvalue("memory"):
+        yield
+        return
+    memory_usage.start()
+    yield
+    memory_usage.stop()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Pytest hook function."""
+    outcome = yield
+    report = outcome.get_result()
+    result = benchmark.RESULTS.pop(_get_test_name(item.nodeid), None)
+    if result is not None:
+        report.user_properties.append((BENCHMARK_PROPERTY, result))
+    if call.when == "call":
+        profile = profiling.pop_test_profile()
+        if profile:
+            report.user_properties.append((PROFILE_PROPERTY, profile))
+        memory = memory_usage.pop_test_memory()
+        if memory:
+            report.user_properties.append((MEMORY_PROPERTY, memory))
+        if item.nodeid in onnx_report._marks:
+            # Coverage is sent with each test to be saved in the results log,
+            # a crashed worker has no output either
+            marks = {item.nodeid: onnx_report._marks.pop(item.nodeid)}
+            coverage = _dump_coverage_marks(marks, set())
+            report.user_properties.append((COVERAGE_PROPERTY, coverage))
+
+
+def pytest_collection_modifyitems(session, config, items):
+    """Pytest hook function."""
+    finished_tests = _result_log.get("finished", set())
+    if not (test.IMPACTED or finished_tests):
+        return
+    test_names = [_get_test_name(item.nodeid) for item in items]
+    selected_tests = set(test_names)
+    if test.IMPACTED:
+        selected_tests = _select_impacted_tests(config, test_names)
+    selected_tests.difference_update(finished_tests)
+    selected_items, deselected_items = [], []
+    for item in items:
+        if _get_test_name(item.nodeid) in selected_tests:
+            selected_items.append(item)
+        else:
+            deselected_items.append(item)
+    config.hook.pytest_deselected(items=deselected_items)
+    items[:] = selected_items
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection(session):
+    """Pytest hook function."""
+    # Tests aren't collected when their results are restored from the cache
+    if _result_cache.get("entry"):
+        session.items = []
+        return True
+    return None
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """Pytest hook function."""
+    _result_cache["exitstatus"] = exitstatus
+    if _result_cache.get("entry"):
+        session.exitstatus = pytest.ExitCode.OK
+    # Only pytest-xdist workers have the workeroutput attribute
+    workeroutput = getattr(session.config, "workeroutput", None)
+    if workeroutput is not None:
+        workeroutput[COVERAGE_OUTPUT_KEY] = _dump_coverage_marks(
+            onnx_report._marks, _passed_tests
+        )
+        workeroutput[IMPORT_OUTPUT_KEY] = profiling.IMPORT
+    elif profiling.IMPORT:
+        _backend_imports.append(profiling.IMPORT)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """Pytest-xdist hook function."""
+    crash_log_dir = getattr(node.config.option, "crash_log_dir", None)
+    if crash_log_dir:
+        node.workerinput["crash_log_dir"] = crash_log_dir
+    if _result_log.get("finished"):
+        node.workerinput["finished_tests"] = sorted(_result_log["finished"])
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """Pytest-xdist hook function."""
+    workeroutput = getattr(node, "workeroutput", {})
+    _merge_coverage_marks(workeroutput.get(COVERAGE_OUTPUT_KEY, []))
+    if workeroutput.get(IMPORT_OUTPUT_KEY):
+        _backend_imports.append(workeroutput[IMPORT_OUTPUT_KEY])
 
 
 def pytest_terminal_summary(terminalreporter, exitstatus, config):
     """Pytest hook function."""
+    # Results are collected and saved by the controller process only
+    if hasattr(config, "workerinput"):
+        return
+
     # Set directory in which test results will be generated
     results_dir = os.environ.get("RESULTS_DIR", os.getcwd())
-
-    # Collect and save the results
-    report = _prepare_report(terminalreporter.stats)
-    _save_report(report, results_dir)
     package_versions = _load_versions(results_dir)
     scoreboard_config = _load_scoreboard_config("/root/setup/config.json")
     core_package_versions = _filter_packages(package_versions, scoreboard_config)
+
+    if test.BENCHMARK:
+        _save_benchmark(
+            test.BENCHMARK, _benchmark_results, results_dir, core_package_versions
+        )
+        return
+
+    if _result_cache.get("entry"):
+        report, durations, profile, memory = _restore_cached_results(
+            _result_cache, results_dir
+        )
+        terminalreporter.write_line(
+            "Results restored from the cache: {0}".format(_result_cache["entry"])
+        )
+    else:
+        report, durations, profile, memory = _collect_results(
+            _close_result_log(), results_dir
+        )
     summary = _prepare_summary(report, core_package_versions)
-    trend = _load_trend(results_dir)
-    current_trend = _update_trend(summary, trend)
-    _save_trend(current_trend, results_dir)
+    summary["durations"] = _prepare_durations_summary(durations)
+    summary["profile"] = _prepare_profile_summary(profile)
+    if config.getvalue("memory") and memory.get("tests"):
+        summary["memory"] = _prepare_memory_summary(memory)
+    if test.IMPACTED:
+        summary["partial"] = _prepare_partial_summary(terminalreporter.stats)
+    _append_trend(summary, results_dir)
+    _report_crash_logs(terminalreporter, config)
+
+
+def pytest_unconfigure(config):
+    """Pytest hook function."""
+    if _result_log.get("log"):
+        _result_log["log"].close()
+    benchmark.close_worker_pools()
+    # Results are cached at the end, when the ONNX report plugin saved CSV files
+    completed = _result_cache.get("exitstatus") in [
+        pytest.ExitCode.OK,
+        pytest.ExitCode.TESTS_FAILED,
+    ]
+    if _result_cache.get("key") and not _result_cache.get("entry") and completed:
+        _store_cached_results(_result_cache)
+
+
+def _collect_results(records, results_dir):
+    """Prepare report and tests durations and save them in the results directory.
+
+    Results of the impacted tests run are merged into the previous results.
+    Memory file is saved only when memory of tests was measured.
+
+    :param records: Dictionary with test name as a key and results log record
+                    as a value (see result_log.py).
+    :type records: dict
+    :param results_dir: Path to directory with results.
+    :type results_dir: str
+    :return: Report, tests durations, backend profile and tests memory.
+    :rtype: tuple
+    """
+    report = result_log.get_report(records, REPORT_KEYS)
+    report["date"] = datetime.now().strftime("%m/%d/%Y %H:%M:%S")
+    tests_ops = _get_tests_ops(onnx_report._marks)
+    test_durations = {
+        test_name: record.get("durations", {}) for test_name, record in records.items()
+    }
+    durations = _prepare_durations(test_durations, tests_ops)
+    test_profiles = _get_logged_property(records, PROFILE_PROPERTY)
+    profile = _prepare_profile(test_profiles, _backend_imports)
+    test_memory = _get_logged_property(records, MEMORY_PROPERTY)
+    memory = _prepare_memory(test_memory, tests_ops)
+    if test.IMPACTED:
+        report = impacted.merge_report(impacted.load_report(results_dir), report)
+        previous_durations = impacted.load_report(results_dir, "durations.json")
+        durations = impacted.merge_durations(previous_durations, durations, tests_ops)
+        previous_profile = impacted.load_report(results_dir, "profile.json")
+        profile = _merge_profile(previous_profile, profile)
+        previous_memory = impacted.load_report(results_dir, "memory.json")
+        memory = _merge_memory(previous_memory, memory, tests_ops)
+    _save_report(report, results_dir)
+    _save_report(durations, results_dir, file_name="durations.json")
+    _save_report(profile, results_dir, file_name="profile.json")
+    if test_memory:
+        _save_report(memory, results_dir, file_name="memory.json")
+    return report, durations, profile, memory
+
+
+def _get_logged_property(records, name):
+    """Return values of the test report user property saved in the results log.
+
+    :param records: Dictionary with test name as a key and results log record
+                    as a value.
+    :type records: dict
+    :param name: Name of the user property, one of LOGGED_PROPERTIES.
+    :type name: str
+    :return: Dictionary with test name as a key and property value as a value.
+    :rtype: dict
+    """
+    return {
+        test_name: record["properties"][name]
+        for test_name, record in records.items()
+        if name in record.get("properties", {})
+    }
+
+
+def _select_impacted_tests(config, test_names):
+    """Return names of tests selected by the impacted mode.
+
+    :param config: Pytest config object.
+    :type config: _pytest.config.Config
+    :param test_names: Names of collected tests.
+    :type test_names: list
+    :return: Set of selected tests names.
+    :rtype: set
+    """
+    results_dir = os.environ.get("RESULTS_DIR", os.getcwd())
+    previous_report = impacted.load_report(results_dir)
+    if test.IMPACTED == "failed":
+        return impacted.select_failed(test_names, previous_report)
+    if test.IMPACTED == "ops":
+        ops = set(filter(None, config.getvalue("impacted_ops").split(",")))
+        return impacted.select_ops(test_names, ops, impacted.get_node_tests_ops())
+    return impacted.select_sample(
+        test_names,
+        previous_report,
+        config.getvalue("sample_fraction"),
+        config.getvalue("sample_seed"),
+    )
+
+
+def _prepare_partial_summary(stats):
+    """Return description of the impacted tests run added to its trend summary.
+
+    :param stats: Dictionary with tests reports, e.g. terminalreporter.stats.
+    :type stats: dict
+    :return: Dictionary with impacted mode and number of run tests.
+    :rtype: dict
+    """
+    partial_report = _prepare_report(stats)
+    run_tests = sum(len(partial_report.get(key, [])) for key in REPORT_KEYS)
+    return {"mode": test.IMPACTED, "tests": run_tests}
 
 
 def _prepare_report(stats):
@@ -72,15 +574,376 @@ def _prepare_report(stats):
         report[key] = []
         for record in stats_group:
             if hasattr(record, "nodeid"):
-                # Remove file name from test id
-                split_id = record.nodeid.split("::")
-                clear_id = filter(lambda x: ".py" not in x, split_id)
-                record_name = "::".join(clear_id)
-                report[key].append(record_name)
+                report[key].append(_get_test_name(record.nodeid))
         report[key].sort()
     return report
 
 
+def _get_test_name(nodeid):
+    """Return test name used in the report (test id without file name).
+
+    :param nodeid: Pytest test id,
+                   e.g. "test_backend.py::OnnxBackendNodeModelTest::test_abs_cpu".
+    :type nodeid: str
+    :return: Test name, e.g. "OnnxBackendNodeModelTest::test_abs_cpu".
+    :rtype: str
+    """
+    split_id = nodeid.split("::")
+    clear_id = filter(lambda x: ".py" not in x, split_id)
+    return "::".join(clear_id)
+
+
+def _get_tests_ops(marks):
+    """Return operators tested by each test.
+
+    Operators are read from models of onnx_coverage marks,
+    so their names match operator names in the nodes.csv file.
+
+    :param marks: Dictionary with test id as a key and onnx_coverage mark as a value.
+    :type marks: dict
+    :return: Dictionary with test name as a key and sorted list of operators as a value.
+    :rtype: dict
+    """
+    tests_ops = {}
+    for nodeid, mark in marks.items():
+        proto = mark.args[0]
+        if isinstance(proto, list):
+            proto = proto[0]
+        if isinstance(proto, onnx.ModelProto):
+            proto = proto.graph
+        nodes = getattr(proto, "node", [proto] if proto is not None else [])
+        tests_ops[_get_test_name(nodeid)] = sorted({node.op_type for node in nodes})
+    return tests_ops
+
+
+def _prepare_durations(test_durations, tests_ops):
+    """Return durations of tests and operators.
+
+    Duration of each test is added to all operators used by the test.
+    Durations example:
+    {
+        "tests": {
+            "OnnxBackendNodeModelTest::test_abs_cpu": {
+                "call": 0.0123,
+                "setup": 0.0002,
+                "teardown": 0.0001,
+                "total": 0.0126
+            }
+        },
+        "ops": {
+            "Abs": 0.0126
+        }
+    }
+
+    :param test_durations: Dictionary with test id as a key and dictionary
+                           with test phase durations as a value.
+    :type test_durations: dict
+    :param tests_ops: Dictionary with test name as a key and list of operators
+                      as a value.
+    :type tests_ops: dict
+    :return: Dictionary with tests and operators durations in seconds.
+    :rtype: dict
+    """
+    durations = {"tests": {}, "ops": {}}
+    for nodeid, phases in test_durations.items():
+        test_name = _get_test_name(nodeid)
+        phase_durations = {key: round(phases.get(key, 0.0), 4) for key in DURATION_KEYS}
+        phase_durations["total"] = round(sum(phases.values()), 4)
+        durations["tests"][test_name] = phase_durations
+        for op in tests_ops.get(test_name, []):
+            op_duration = durations["ops"].get(op, 0.0) + phase_durations["total"]
+            durations["ops"][op] = round(op_duration, 4)
+    return durations
+
+
+def _prepare_durations_summary(durations):
+    """Return durations summary saved in the trend.
+
+    :param durations: Dictionary with tests and operators durations.
+    :type durations: dict
+    :return: Total duration of all tests and durations of operators.
+    :rtype: dict
+    """
+    total = sum(test.get("total", 0.0) for test in durations.get("tests").values())
+    return {"total": round(total, 4), "ops": durations.get("ops", {})}
+
+
+def _prepare_profile(test_profiles, backend_imports):
+    """Return backend import time and compile and run times of tests.
+
+    Import time is a median of the backend import times in all test processes.
+    Profile example:
+    {
+        "import": {
+            "module": "onnxruntime.backend.backend",
+            "time": 0.4321,
+            "cold": true,
+            "processes": 1
+        },
+        "tests": {
+            "OnnxBackendNodeModelTest::test_abs_cpu": {
+                "compile": 0.0123,
+                "first_run": 0.0021,
+                "steady_run": 0.0004,
+                "runs": 2
+            }
+        },
+        "totals": {
+            "compile": 0.0123,
+            "first_run": 0.0021,
+            "steady_run": 0.0004
+        }
+    }
+
+    :param test_profiles: Dictionary with test name as a key and test compile
+                          and run times as a value.
+    :type test_profiles: dict
+    :param backend_imports: List of backend import measurements.
+    :type backend_imports: list
+    :return: Dictionary with backend import time, tests profiles and their totals.
+    :rtype: dict
+    """
+    backend_import = {}
+    if backend_imports:
+        import_times = sorted(measurement["time"] for measurement in backend_imports)
+        backend_import = dict(
+            backend_imports[0],
+            time=import_times[len(import_times) // 2],
+            cold=all(measurement.get("cold") for measurement in backend_imports),
+            processes=len(backend_imports),
+        )
+    return {
+        "import": backend_import,
+        "tests": test_profiles,
+        "totals": _get_profile_totals(test_profiles),
+    }
+
+
+def _get_profile_totals(test_profiles):
+    """Return sums of compile and run times of all tests.
+
+    :param test_profiles: Dictionary with test name as a key and test compile
+                          and run times as a value.
+    :type test_profiles: dict
+    :return: Dictionary with compile, first run and steady-state run total times.
+    :rtype: dict
+    """
+    return {
+        key: round(sum(profile.get(key, 0.0) for profile in test_profiles.values()), 4)
+        for key in ["compile", "first_run", "steady_run"]
+    }
+
+
+def _merge_profile(full_profile, partial_profile):
+    """Return profile of the full run updated with profiles of the partial run.
+
+    :param full_profile: Backend profile of the last full run.
+    :type full_profile: dict
+    :param partial_profile: Backend profile of the partial run.
+    :type partial_profile: dict
+    :return: Merged profile.
+    :rtype: dict
+    """
+    test_profiles = dict(full_profile.get("tests", {}))
+    test_profiles.update(partial_profile.get("tests", {}))
+    return {
+        "import": partial_profile.get("import") or full_profile.get("import", {}),
+        "tests": test_profiles,
+        "totals": _get_profile_totals(test_profiles),
+    }
+
+
+def _prepare_profile_summary(profile):
+    """Return backend profile summary saved in the trend.
+
+    :param profile: Backend profile returned by _prepare_profile.
+    :type profile: dict
+    :return: Dictionary with backend import time and total compile and run times.
+    :rtype: dict
+    """
+    summary = dict(profile.get("totals", {}))
+    summary["import"] = profile.get("import", {}).get("time")
+    return summary
+
+
+def _prepare_memory(test_memory, tests_ops):
+    """Return peak memory of tests and operators.
+
+    Peak memory of each operator is the highest peak of tests using the operator.
+    Memory example:
+    {
+        "tests": {
+            "OnnxBackendNodeModelTest::test_abs_cpu": {
+                "rss_peak": 1048576,
+                "python_peak": 20480
+            }
+        },
+        "ops": {
+            "Abs": {
+                "rss_peak": 1048576,
+                "python_peak": 20480
+            }
+        }
+    }
+
+    :param test_memory: Dictionary with test name as a key and test peak memory
+                        as a value.
+    :type test_memory: dict
+    :param tests_ops: Dictionary with test name as a key and list of operators
+                      as a value.
+    :type tests_ops: dict
+    :return: Dictionary with tests and operators peak memory in bytes.
+    :rtype: dict
+    """
+    ops = {}
+    for test_name, memory in test_memory.items():
+        for op in tests_ops.get(test_name, []):
+            op_memory = ops.setdefault(op, dict.fromkeys(MEMORY_KEYS, 0))
+            for key in MEMORY_KEYS:
+                op_memory[key] = max(op_memory[key], memory.get(key, 0))
+    return {"tests": test_memory, "ops": ops}
+
+
+def _merge_memory(full_memory, partial_memory, tests_ops):
+    """Return peak memory of the full run updated with the partial run.
+
+    :param full_memory: Tests and operators peak memory of the last full run.
+    :type full_memory: dict
+    :param partial_memory: Tests and operators peak memory of the partial run.
+    :type partial_memory: dict
+    :param tests_ops: Dictionary with test name as a key and list of operators
+                      as a value.
+    :type tests_ops: dict
+    :return: Merged memory.
+    :rtype: dict
+    """
+    test_memory = dict(full_memory.get("tests", {}))
+    test_memory.update(partial_memory.get("tests", {}))
+    return _prepare_memory(test_memory, tests_ops)
+
+
+def _prepare_memory_summary(memory):
+    """Return peak memory summary saved in the trend.
+
+    :param memory: Tests and operators peak memory returned by _prepare_memory.
+    :type memory: dict
+    :return: Maximal, median and total peak of each memory key in bytes.
+    :rtype: dict
+    """
+    summary = {}
+    for key in MEMORY_KEYS:
+        peaks = sorted(test.get(key, 0) for test in memory.get("tests", {}).values())
+        if peaks:
+            summary[key] = {
+                "max": peaks[-1],
+                "median": peaks[len(peaks) // 2],
+                "total": sum(peaks),
+            }
+    return summary
+
+
+def _dump_coverage_marks(marks, passed_tests):
+    """Return ONNX coverage marks serialized to be sent by pytest-xdist worker.
+
+    onnx.backend.test.report plugin collects an "onnx_coverage" mark
+    with the tested model for each test run in the current process.
+    Models are stripped of weights (see _strip_coverage_model) and serialized
+    to bytes, because only basic types can be sent between pytest-xdist processes.
+    Serialized mark example:
+    {
+        "nodeid": "test_backend.py::OnnxBackendNodeModelTest::test_abs_cpu",
+        "category": "NodeModel",
+        "proto_type": "ModelProto",
+        "proto": b"...",
+        "passed": True
+    }
+
+    :param marks: Dictionary with test id as a key and onnx_coverage mark as a value.
+    :type marks: dict
+    :param passed_tests: Ids of tests passed in the current process.
+    :type passed_tests: set
+    :return: List of serialized marks.
+    :rtype: list
+    """
+    serialized_marks = []
+    for nodeid, mark in marks.items():
+        proto, category = mark.args[0], mark.args[1]
+        if isinstance(proto, list):
+            proto = proto[0]
+        if proto is None:
+            continue
+        serialized_marks.append(
+            {
+                "nodeid": nodeid,
+                "category": category,
+                "proto_type": type(proto).__name__,
+                "proto": _strip_coverage_model(proto).SerializeToString(),
+                "passed": nodeid in passed_tests,
+            }
+        )
+    return serialized_marks
+
+
+def _strip_coverage_model(proto):
+    """Return copy of the model with only the data used by the ONNX coverage report.
+
+    The report counts operators and their attribute values in graphs of models,
+    so the graph name, nodes and opsets are kept. Initializers (weights of real
+    models), value infos and doc strings are dropped, also in subgraphs.
+
+    :param proto: Model of the onnx_coverage mark.
+    :type proto: onnx.ModelProto
+    :return: Stripped copy of the model, other protos are returned as they are.
+    :rtype: onnx.ModelProto
+    """
+    if not isinstance(proto, onnx.ModelProto):
+        return proto
+    model = onnx.ModelProto()
+    model.ir_version = proto.ir_version
+    model.opset_import.extend(proto.opset_import)
+    model.graph.name = proto.graph.name
+    model.graph.node.extend(proto.graph.node)
+    _strip_graph_nodes(model.graph)
+    return model
+
+
+def _strip_graph_nodes(graph):
+    """Drop doc strings of the graph nodes and weights of their subgraphs.
+
+    :param graph: Graph with nodes to strip.
+    :type graph: onnx.GraphProto
+    """
+    for node in graph.node:
+        node.ClearField("doc_string")
+        for attribute in node.attribute:
+            attribute.ClearField("doc_string")
+            subgraphs = list(attribute.graphs)
+            if attribute.HasField("g"):
+                subgraphs.append(attribute.g)
+            for subgraph in subgraphs:
+                for field in ["doc_string", "initializer", "value_info"]:
+                    subgraph.ClearField(field)
+                _strip_graph_nodes(subgraph)
+
+
+def _merge_coverage_marks(serialized_marks):
+    """Merge ONNX coverage marks sent by pytest-xdist worker.
+
+    Marks are added to the onnx.backend.test.report plugin of the controller process,
+    so nodes.csv generated at the end of the session contains results of all workers.
+
+    :param serialized_marks: List of marks returned by _dump_coverage_marks.
+    :type serialized_marks: list
+    """
+    for serialized_mark in serialized_marks:
+        proto = getattr(onnx, serialized_mark.get("proto_type"))()
+        proto.ParseFromString(serialized_mark.get("proto"))
+        mark = pytest.mark.onnx_coverage(proto, serialized_mark.get("category")).mark
+        onnx_report._marks[serialized_mark.get("nodeid")] = mark
+        if serialized_mark.get("passed"):
+            onnx_report._add_mark(mark, "passed")
+
+
 def _prepare_summary(report, package_versions=None):
     """Return tests summary including number of failed and passed tests.
 
@@ -135,106 +998,12 @@ def _save_report(report, results_dir, file_name="report.json"):
         json.dump(report, report_file, sort_keys=True, indent=4)
 
 
-def _save_trend(trend, results_dir, file_name="trend.json"):
-    """Save trend data to the json file.
-
-    Save trend data to the json file.
-    Trend is a list of report summaries per date.
-    This enable tracking number of failed and passed tests.
-    Trend example:
-    [
-        {
-            "date": "08/06/2019 09:37:45",
-            "failed": 61,
-            "passed": 497,
-            "skipped": 0,
-            "versions": [
-                {
-                    "name": "onnx",
-                    "version": "1.5.0"
-                }
-            ]
-        },
-        {
-            "date": "08/08/2019 08:34:18",
-            "failed": 51,
-            "passed": 507,
-            "skipped": 0,
-            "versions": [
-                {
-                    "name": "onnx",
-                    "version": "1.6.0"
-                }
-            ]
-        }
-    ]
-
-    :param trend: List of summaries.
-    :type trend: list
-    :param results_dir: Path to direcotry with results.
-    :type results_dir: str
-    :param file_name: Name of trend file, defaults to "trend.json"
-    :type file_name: str, optional
-    """
-    with open(os.path.join(results_dir, file_name), "w") as trend_file:
-        json.dump(trend, trend_file, sort_keys=True, indent=4)
-
-
-def _load_trend(results_dir, file_name="trend.json"):
-    """Load and return trend list from json file.
-
-    Return list of summaries loaded from tests trend json file.
-    If file is broken, empty or not found create and return new trend list.
-    Trend is a list of report summaries per date.
-    This enable tracking number of failed and passed tests.
-    Trend example:
-    [
-        {
-            "date": "08/06/2019 09:37:45",
-            "failed": 61,
-            "passed": 497,
-            "skipped": 0,
-            "versions": [
-                {
-                    "name": "onnx",
-                    "pversion": "1.5.0"
-                }
-            ]
-        },
-        {
-            "date": "08/08/2019 08:34:18",
-            "failed": 51,
-            "passed": 507,
-            "skipped": 0,
-            "versions": [
-                {
-                    "name": "onnx",
-                    "version": "1.6.0"
-                }
-            ]
-        }
-    ]
-
-    :param results_dir: Path to directory with results.
-    :type results_dir: str
-    :param file_name: Name of trend file, defaults to "trend.json".
-    :type file_name: str, optional
-    :return: List of summaries.
-    :rtype: list
-    """
-    try:
-        with open(os.path.join(results_dir, file_name), "r") as trend_file:
-            trend = json.load(trend_file)
-    except (IOError, json.decoder.JSONDecodeError):
-        trend = []
-    return trend
-
-
 def _update_trend(summary, trend):
     """Return updated trend.
 
     Append result summary to the trend list if the last one result is
-    different than current, otherwise replace last summary. Trend is a list of report
+    different than current, otherwise replace last summary with the range of repeated
+    runs (first run date and number of runs are added). Trend is a list of report
     summaries per date. This enable tracking number of failed and passed tests.
     Summary example:
     {
@@ -295,20 +1064,330 @@ def _update_trend(summary, trend):
     # otherwise append the new summary to the trend list.
     min_length = 2
     valid_length = len(trend) >= min_length and (
-        len(summary.keys()) == len(trend[-1].keys())
+        len(set(summary) - set(TREND_RANGE_KEYS))
+        == len(set(trend[-1]) - set(TREND_RANGE_KEYS))
     )
     equal_values = trend and all(
         summary.get(key) == trend[-1].get(key)
         for key in summary.keys()
-        if key != "date"
+        if key not in TREND_IGNORED_KEYS
     )
     if valid_length and equal_values:
+        summary["first_date"] = trend[-1].get("first_date", trend[-1].get("date"))
+        summary["runs"] = trend[-1].get("runs", 1) + 1
         trend[-1] = summary
     else:
         trend.append(summary)
     return trend
 
 
+def _save_benchmark(mode, results, results_dir, package_versions=None):
+    """Save benchmark results and append their summary to the benchmark trend log.
+
+    Results are saved in the "<mode>.json" file
+    and the trend is saved in the "<mode>_trend.jsonl" file.
+
+    :param mode: Benchmark mode (see benchmark.MODES).
+    :type mode: str
+    :param results: Dictionary with test name as a key and test result as a value.
+    :type results: dict
+    :param results_dir: Path to directory with results.
+    :type results_dir: str
+    :param package_versions: List of core packages installed by pip.
+    :type package_versions: list
+    """
+    summary = benchmark.MODES[mode]["summarize"](results)
+    summary["date"] = datetime.now().strftime("%m/%d/%Y %H:%M:%S")
+    summary["versions"] = package_versions or []
+    _save_report(summary, results_dir, file_name="{0}.json".format(mode))
+
+    trend_entry = {
+        "date": summary["date"],
+        "versions": summary["versions"],
+        mode: benchmark.MODES[mode]["summarize_trend"](summary),
+    }
+    trend_path = os.path.join(results_dir, "{0}_trend.jsonl".format(mode))
+    trend_log.append_entry(trend_path, trend_entry)
+
+
+def _merge_repeated_summary(summary, trend):
+    """Return the summary replacing the last one in the trend if results didn't change.
+
+    :param summary: Contain length of each list in report.
+    :type summary: dict
+    :param trend: List of the last report summaries.
+    :type trend: list
+    :return: Summary with the range of repeated runs (as in _update_trend)
+             or None if the summary is appended.
+    :rtype: dict
+    """
+    updated_trend = _update_trend(dict(summary), list(trend))
+    return updated_trend[-1] if len(updated_trend) == len(trend) else None
+
+
+def _append_trend(summary, results_dir, file_name=trend_log.TREND_LOG_FILE):
+    """Append summary to the trend log.
+
+    Trend log is a line-delimited JSON file with a report summary per line.
+    Repeated summaries are collapsed into a range of runs (see _update_trend).
+    Existing trend.json file is migrated to the trend log before the first update.
+
+    :param summary: Contain length of each list in report.
+    :type summary: dict
+    :param results_dir: Path to directory with results.
+    :type results_dir: str
+    :param file_name: Name of trend log file, defaults to "trend.jsonl"
+    :type file_name: str, optional
+    """
+    trend_log.migrate(results_dir, log_name=file_name)
+    trend_log.append_entry(
+        os.path.join(results_dir, file_name),
+        summary,
+        merge_last=_merge_repeated_summary,
+    )
+
+
+def _configure_impacted_ops(config):
+    """Set operators failing in the previous run as the impacted operators.
+
+    Workers get the options from the controller, which can read nodes.csv.
+
+    :param config: Pytest config object.
+    :type config: _pytest.config.Config
+    """
+    if not config.getvalue("impacted_ops"):
+        csv_dir = os.environ.get("CSVDIR", os.getcwd())
+        config.option.impacted_ops = ",".join(impacted.load_failing_ops(csv_dir))
+
+
+def _init_result_log(config, is_worker):
+    """Open the results log of the session.
+
+    The resumed run appends to the log of the interrupted run of the same backend
+    and its finished tests are skipped. Their ONNX coverage is restored from the log.
+    Workers get names of the finished tests from the controller. Benchmark runs
+    and runs restored from the result cache don't log results.
+
+    :param config: Pytest config object.
+    :type config: _pytest.config.Config
+    :param is_worker: Whether the process is a pytest-xdist worker.
+    :type is_worker: bool
+    """
+    if is_worker:
+        _result_log["finished"] = set(config.workerinput.get("finished_tests", []))
+        return
+    if test.BENCHMARK or _result_cache.get("entry"):
+        return
+    results_dir = os.environ.get("RESULTS_DIR", os.getcwd())
+    log_path = os.path.join(results_dir, result_log.RESULT_LOG_FILE)
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    session = {"backend": test.ONNX_BACKEND_MODULE, "impacted": test.IMPACTED}
+    records = {}
+    if config.getvalue("resume"):
+        logged_session, records = result_log.load(log_path)
+        logged_session = logged_session or {}
+        if any(logged_session.get(key) != value for key, value in session.items()):
+            records = {}
+    for record in records.values():
+        _merge_coverage_marks(result_log.decode_coverage(record.get("coverage", [])))
+
+    session["date"] = datetime.now().strftime("%m/%d/%Y %H:%M:%S")
+    _result_log.update(
+        log=result_log.ResultLog(log_path, session, append=bool(records)),
+        path=log_path,
+        config=config,
+        records=records,
+        running={},
+        finished=set(records),
+    )
+
+
+def _log_test_report(report):
+    """Collect the test phase report and log the test result when the test finished.
+
+    :param report: Pytest test report.
+    :type report: _pytest.reports.TestReport
+    """
+    record = _result_log["running"].setdefault(
+        report.nodeid,
+        {"test": _get_test_name(report.nodeid), "durations": {}, "properties": {}},
+    )
+    record["durations"][report.when] = report.duration
+    for name, value in report.user_properties:
+        if name == COVERAGE_PROPERTY:
+            record["coverage"] = result_log.encode_coverage(value)
+        elif name in LOGGED_PROPERTIES:
+            record["properties"][name] = value
+    config = _result_log["config"]
+    status = config.hook.pytest_report_teststatus(report=report, config=config)[0]
+    if status in REPORT_KEYS:
+        record["status"] = status
+    if report.when == "teardown" or isolation.is_crash_report(report):
+        _finish_test_record(_result_log["running"].pop(report.nodeid))
+
+
+def _finish_test_record(record):
+    """Write result of the finished test to the results log.
+
+    :param record: Test record collected by _log_test_report.
+    :type record: dict
+    """
+    # Coverage of the passed test is counted when it's restored by the resumed run
+    for mark in record.get("coverage", []):
+        mark["passed"] = record.get("status") == "passed"
+    _result_log["log"].append(record)
+    _result_log["records"][record["test"]] = record
+
+
+def _close_result_log():
+    """Close the results log and load results of all finished tests from it.
+
+    :return: Dictionary with test name as a key and results log record as a value.
+    :rtype: dict
+    """
+    _result_log["log"].close()
+    _, records = result_log.load(_result_log["path"])
+    return records
+
+
+def _configure_isolation(config, is_worker):
+    """Prepare the crash logs dir of the isolated mode.
+
+    Controller creates the dir and passes it to the workers with the worker input,
+    each worker logs its fatal errors and timeouts to its own file.
+
+    :param config: Pytest config object.
+    :type config: _pytest.config.Config
+    :param is_worker: True in pytest-xdist worker process.
+    :type is_worker: bool
+    """
+    if is_worker:
+        workerinput = config.workerinput
+        isolation.enable(workerinput["crash_log_dir"], workerinput["workerid"])
+    else:
+        config.option.crash_log_dir = tempfile.mkdtemp(prefix="onnx-crash-logs-")
+
+
+def _report_crash_logs(terminalreporter, config):
+    """Write path to the crash logs dir if any test crashed or timed out.
+
+    :param terminalreporter: Pytest terminal reporter.
+    :type terminalreporter: _pytest.terminal.TerminalReporter
+    :param config: Pytest config object.
+    :type config: _pytest.config.Config
+    """
+    log_dir = getattr(config.option, "crash_log_dir", None)
+    stats = terminalreporter.stats
+    crashes = [isolation.CRASHED_STATUS, isolation.TIMEOUT_STATUS]
+    if log_dir and any(stats.get(status) for status in crashes):
+        terminalreporter.write_line("Crash logs of workers: {0}".format(log_dir))
+
+
+def _init_data_cache(config, is_worker):
+    """Open the pre-decoded test data cache, build it first if it doesn't exist.
+
+    Cache is built by the controller process before pytest-xdist workers start,
+    so the workers only open it.
+
+    :param config: Pytest config object.
+    :type config: _pytest.config.Config
+    :param is_worker: True in pytest-xdist worker process.
+    :type is_worker: bool
+    """
+    cache_dir = os.environ.get("TEST_DATA_CACHE_DIR", data_cache.CACHE_DIR)
+    refresh = config.getvalue("refresh_data_cache") and not is_worker
+    if refresh or not data_cache.load(cache_dir):
+        if not is_worker:
+            data_cache.build(cache_dir)
+            data_cache.load(cache_dir)
+
+
+def _init_result_cache(config):
+    """Compute the result cache key of the run and find the cached results.
+
+    Key is computed from versions of all installed packages (a development build
+    of the backend may not change the version of any core package),
+    ONNX backend module, tests selection and the test harness files.
+    Cached results are not used with the --refresh_results option.
+    Cache hit disables pytest-xdist workers, because there are no tests to run.
+
+    :param config: Pytest config object.
+    :type config: _pytest.config.Config
+    """
+    results_dir = os.environ.get("RESULTS_DIR", os.getcwd())
+    key_data = result_cache.get_key_data(
+        _load_versions(results_dir),
+        config.getvalue("onnx_backend"),
+        result_cache.hash_harness(os.path.dirname(os.path.abspath(__file__))),
+        {
+            "keyword": config.getvalue("keyword"),
+            "markexpr": config.getvalue("markexpr"),
+            "memory": config.getvalue("memory"),
+        },
+    )
+    cache_dir = os.environ.get(
+        "RESULT_CACHE_DIR", os.path.join(results_dir, result_cache.CACHE_DIR)
+    )
+    key = result_cache.get_key(key_data)
+    _result_cache.update(
+        key=key,
+        key_data=key_data,
+        cache_dir=cache_dir,
+        csv_dir=os.environ.get("CSVDIR"),
+        size=config.getvalue("result_cache_size"),
+    )
+    if not config.getvalue("refresh_results"):
+        _result_cache["entry"] = result_cache.load_entry(cache_dir, key)
+    if _result_cache.get("entry") and hasattr(config.option, "dist"):
+        config.option.dist = "no"
+        config.option.numprocesses = 0
+
+
+def _restore_cached_results(cache, results_dir):
+    """Restore cached results files and load the report, durations, profile and memory.
+
+    Restored report gets the current date, so the trend summary of the run
+    is dated by the run and not by the cached one.
+
+    :param cache: Result cache state initialized by _init_result_cache.
+    :type cache: dict
+    :param results_dir: Path to directory with results.
+    :type results_dir: str
+    :return: Report, tests durations, backend profile and tests memory.
+    :rtype: tuple
+    """
+    result_cache.restore_entry(cache["entry"], results_dir, cache.get("csv_dir"))
+    results = []
+    for file_name in result_cache.RESULT_FILES:
+        try:
+            with open(os.path.join(results_dir, file_name), "r") as results_file:
+                results.append(json.load(results_file))
+        except (IOError, json.decoder.JSONDecodeError):
+            results.append({})
+    report = results[0]
+    report["date"] = datetime.now().strftime("%m/%d/%Y %H:%M:%S")
+    _save_report(report, results_dir)
+    return tuple(results)
+
+
+def _store_cached_results(cache):
+    """Store results of the run in the result cache and remove the oldest entries.
+
+    :param cache: Result cache state initialized by _init_result_cache.
+    :type cache: dict
+    """
+    results_dir = os.environ.get("RESULTS_DIR", os.getcwd())
+    os.makedirs(cache["cache_dir"], exist_ok=True)
+    result_cache.store_entry(
+        cache["cache_dir"],
+        cache["key"],
+        cache["key_data"],
+        results_dir,
+        cache["csv_dir"],
+    )
+    result_cache.prune(cache["cache_dir"], cache["size"])
+
+
 def _load_versions(versions_dir, file_name="pip-list.json"):
     """Load and return python packages versions from json file.
 
@@ -0,0 +1,328 @@
+"""Pre-decoded cache of the ONNX backend test data.
+
+Test data of ONNX backend tests stored in test directories (model.onnx and
+test_data_set_*/input_*.pb, output_*.pb files) is decoded once per onnx version
+and saved in contiguous files:
+    <cache_dir>/onnx-<version>/index.json  - offset, dtype and shape of each array
+                                             and offset and size of each model
+    <cache_dir>/onnx-<version>/arrays.bin  - raw data of all tensors
+    <cache_dir>/onnx-<version>/models.bin  - serialized models
+Data files are memory mapped (copy-on-write), so loading a tensor doesn't read
+or decode anything and pytest-xdist workers share the same pages.
+Tensors which can't be stored as raw arrays (sequences, optionals, strings)
+are loaded from their protobuf files as before.
+
+CachedBackendTest uses private hooks of the onnx test runner (RUNNER_HOOKS),
+the cache isn't used with a warning if the installed onnx doesn't have them.
+
+The cache dir can be changed with the TEST_DATA_CACHE_DIR variable.
+"""
+
+import contextlib
+import functools
+import glob
+import json
+import os
+import shutil
+import warnings
+
+import numpy as np
+import onnx
+import onnx.backend.test
+import onnx.backend.test.loader
+import onnx.backend.test.runner
+import onnx.external_data_helper
+
+from onnx import numpy_helper
+
+
+# Default cache dir in the ONNX home dir
+CACHE_DIR = os.path.join(
+    os.path.expanduser(os.getenv("ONNX_HOME", os.path.join("~", ".onnx"))),
+    "test_data_cache",
+)
+
+# Kinds of ONNX backend test cases
+TEST_KINDS = ["node", "real", "simple", "pytorch-converted", "pytorch-operator"]
+
+# Alignment of arrays in the data file in bytes
+ALIGNMENT = 64
+
+# Methods of onnx.backend.test.runner.Runner overridden by CachedBackendTest
+RUNNER_HOOKS = ["_add_test", "_load_proto"]
+
+# Index and memory mapped data of the cache loaded in the current process
+_cache = {}
+
+# Model loader of onnx, used for models which are not cached
+_load_onnx_model = onnx.load
+
+
+def get_version_dir(cache_dir):
+    """Return path to the cache of the installed onnx version.
+
+    :param cache_dir: Path to the cache dir.
+    :type cache_dir: str
+    :return: Path to the version dir.
+    :rtype: str
+    """
+    return os.path.join(cache_dir, "onnx-{0}".format(onnx.__version__))
+
+
+def _get_models_dir():
+    """Return path to the dir with downloaded ONNX real models.
+
+    :return: Path to the models dir (as in onnx.backend.test.runner).
+    :rtype: str
+    """
+    onnx_home = os.path.expanduser(os.getenv("ONNX_HOME", os.path.join("~", ".onnx")))
+    return os.getenv("ONNX_MODELS", os.path.join(onnx_home, "models"))
+
+
+def get_test_dirs():
+    """Return test directories of all ONNX backend test cases.
+
+    Real models are included only if they were already downloaded.
+
+    :return: Sorted list of paths to dirs with model.onnx file.
+    :rtype: list
+    """
+    test_dirs = set()
+    for kind in TEST_KINDS:
+        for test_case in onnx.backend.test.loader.load_model_tests(kind=kind):
+            model_dir = test_case.model_dir
+            if model_dir is None and test_case.url:
+                model_dir = os.path.join(_get_models_dir(), test_case.model_name)
+            if model_dir and os.path.isfile(os.path.join(model_dir, "model.onnx")):
+                test_dirs.add(os.path.realpath(model_dir))
+    return sorted(test_dirs)
+
+
+def _decode_tensor(file_path, type_proto):
+    """Decode tensor file to array which can be stored as raw data.
+
+    :param file_path: Path to the TensorProto file.
+    :type file_path: str
+    :param type_proto: Type of the model input or output.
+    :type type_proto: onnx.TypeProto
+    :return: Array or None if the data is not a numeric tensor.
+    :rtype: numpy.ndarray
+    """
+    if not type_proto.HasField("tensor_type"):
+        return None
+    tensor = onnx.TensorProto()
+    with open(file_path, "rb") as tensor_file:
+        tensor.ParseFromString(tensor_file.read())
+    array = numpy_helper.to_array(tensor)
+    if array.dtype.kind not in "biufc":
+        return None
+    return array
+
+
+def _get_test_data(test_dir):
+    """Return serialized model and decoded tensors of the test directory.
+
+    :param test_dir: Path to the test dir with model.onnx file.
+    :type test_dir: str
+    :return: Serialized model and list of tensor file paths with their arrays.
+    :rtype: tuple
+    """
+    with open(os.path.join(test_dir, "model.onnx"), "rb") as model_file:
+        model_bytes = model_file.read()
+    graph = onnx.load_model_from_string(model_bytes).graph
+    tensors = []
+    for data_dir in sorted(glob.glob(os.path.join(test_dir, "test_data_set*"))):
+        for kind, values in [("input", graph.input), ("output", graph.output)]:
+            file_count = len(glob.glob(os.path.join(data_dir, "{0}_*.pb".format(kind))))
+            for idx in range(min(file_count, len(values))):
+                file_path = os.path.join(data_dir, "{0}_{1}.pb".format(kind, idx))
+                array = _decode_tensor(file_path, values[idx].type)
+                if array is not None:
+                    tensors.append((file_path, array))
+    return model_bytes, tensors
+
+
+def _write_aligned(data_file, data):
+    """Write data at the next aligned offset of the file.
+
+    :param data_file: File opened for binary writing.
+    :type data_file: file
+    :param data: Data to write.
+    :type data: bytes
+    :return: Offset of the data.
+    :rtype: int
+    """
+    padding = -data_file.tell() % ALIGNMENT
+    data_file.write(b"\0" * padding)
+    offset = data_file.tell()
+    data_file.write(data)
+    return offset
+
+
+def build(cache_dir):
+    """Decode test data of the installed onnx version and save it in the cache.
+
+    Cache is prepared in a temporary directory and renamed,
+    so an interrupted build never leaves an incomplete cache.
+
+    :param cache_dir: Path to the cache dir.
+    :type cache_dir: str
+    :return: Path to the version dir.
+    :rtype: str
+    """
+    version_dir = get_version_dir(cache_dir)
+    temp_dir = "{0}.tmp{1}".format(version_dir, os.getpid())
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    os.makedirs(temp_dir)
+    index = {"arrays": {}, "models": {}}
+    arrays_path = os.path.join(temp_dir, "arrays.bin")
+    models_path = os.path.join(temp_dir, "models.bin")
+    with open(arrays_path, "wb") as arrays_file, open(models_path, "wb") as models_file:
+        for test_dir in get_test_dirs():
+            model_bytes, tensors = _get_test_data(test_dir)
+            index["models"][os.path.join(test_dir, "model.onnx")] = {
+                "offset": _write_aligned(models_file, model_bytes),
+                "size": len(model_bytes),
+            }
+            for file_path, array in tensors:
+                index["arrays"][file_path] = {
+                    "offset": _write_aligned(arrays_file, array.tobytes()),
+                    "dtype": array.dtype.str,
+                    "shape": list(array.shape),
+                }
+    with open(os.path.join(temp_dir, "index.json"), "w") as index_file:
+        json.dump(index, index_file)
+
+    shutil.rmtree(version_dir, ignore_errors=True)
+    os.replace(temp_dir, version_dir)
+    return version_dir
+
+
+def _map_file(file_path):
+    """Return file memory mapped as bytes (copy-on-write).
+
+    :param file_path: Path to the data file.
+    :type file_path: str
+    :return: Mapped data or empty array for an empty file.
+    :rtype: numpy.ndarray
+    """
+    if os.path.getsize(file_path) == 0:
+        return np.empty(0, dtype=np.uint8)
+    return np.memmap(file_path, dtype=np.uint8, mode="c")
+
+
+def load(cache_dir):
+    """Open the cache of the installed onnx version in the current process.
+
+    :param cache_dir: Path to the cache dir.
+    :type cache_dir: str
+    :return: True if the cache was opened.
+    :rtype: bool
+    """
+    version_dir = get_version_dir(cache_dir)
+    try:
+        with open(os.path.join(version_dir, "index.json"), "r") as index_file:
+            index = json.load(index_file)
+        arrays = _map_file(os.path.join(version_dir, "arrays.bin"))
+        models = _map_file(os.path.join(version_dir, "models.bin"))
+    except (IOError, ValueError):
+        return False
+    _cache.update(index=index, arrays=arrays, models=models)
+    return True
+
+
+def get_array(file_path):
+    """Return cached array of the tensor file.
+
+    :param file_path: Path to the TensorProto file.
+    :type file_path: str
+    :return: Array view of the mapped data or None if the file is not cached.
+    :rtype: numpy.ndarray
+    """
+    if not _cache:
+        return None
+    entry = _cache["index"]["arrays"].get(os.path.realpath(file_path))
+    if entry is None:
+        return None
+    dtype = np.dtype(entry["dtype"])
+    count = int(np.prod(entry["shape"], dtype=np.int64))
+    start = entry["offset"]
+    data = _cache["arrays"][start:start + count * dtype.itemsize]
+    return data.view(dtype).reshape(entry["shape"])
+
+
+def load_model(file_path, *args, **kwargs):
+    """Return model loaded from the cached bytes or from the file.
+
+    Arguments are the same as of onnx.load, models loaded with other arguments
+    than the model path are not cached.
+
+    :param file_path: Path to the model.onnx file.
+    :type file_path: str
+    :return: ONNX model.
+    :rtype: onnx.ModelProto
+    """
+    entry = None
+    if _cache and isinstance(file_path, str) and not (args or kwargs):
+        entry = _cache["index"]["models"].get(os.path.realpath(file_path))
+    if entry is None:
+        return _load_onnx_model(file_path, *args, **kwargs)
+    start = entry["offset"]
+    data = _cache["models"][start:start + entry["size"]]
+    model = onnx.load_model_from_string(data.tobytes())
+    onnx.external_data_helper.load_external_data_for_model(
+        model, os.path.dirname(file_path)
+    )
+    return model
+
+
+@contextlib.contextmanager
+def cached_model_loading():
+    """Load models with onnx.load from the cache within the context."""
+    onnx.load = load_model
+    try:
+        yield
+    finally:
+        onnx.load = _load_onnx_model
+
+
+class CachedBackendTest(onnx.backend.test.BackendTest):
+    """ONNX backend test loading models and test data from the cache.
+
+    Test functions of onnx load models with onnx.load, which loads them
+    from the cache while the test runs.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Create test cases, warn if the cache can't be used by the onnx runner."""
+        missing_hooks = [
+            hook
+            for hook in RUNNER_HOOKS
+            if not hasattr(onnx.backend.test.runner.Runner, hook)
+        ]
+        if _cache and missing_hooks:
+            warnings.warn(
+                "Test data cache is not used, onnx {0} test runner has no {1}".format(
+                    onnx.__version__, ", ".join(missing_hooks)
+                ),
+                stacklevel=2,
+            )
+        super().__init__(*args, **kwargs)
+
+    def _add_test(self, category, test_name, test_func, *args, **kwargs):
+        """Add test function loading models from the cache."""
+
+        @functools.wraps(test_func)
+        def cached_test_func(*func_args, **func_kwargs):
+            with cached_model_loading():
+                return test_func(*func_args, **func_kwargs)
+
+        super()._add_test(category, test_name, cached_test_func, *args, **kwargs)
+
+    def _load_proto(self, proto_filename, target_list, model_type_proto):
+        """Append cached array of the test data file to the target list."""
+        array = get_array(proto_filename)
+        if array is None:
+            super()._load_proto(proto_filename, target_list, model_type_proto)
+        else:
+            target_list.append(array)
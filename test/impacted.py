@@ -0,0 +1,208 @@
+"""Selection of impacted tests for quick partial runs.
+
+Impacted mode (pytest option `--impacted=<mode>`) runs only a subset of tests
+selected with the previous results and merges their outcome into the last
+full report.json.
+
+Selection modes:
+    failed - tests which failed, crashed or timed out in the previous report.
+    ops    - node tests of the operators listed with --impacted_ops,
+             by default operators which didn't pass in the previous nodes.csv.
+    sample - stratified sample of all tests with a fixed seed, the same fraction
+             of tests is sampled from each test case and previous outcome.
+"""
+
+import benchmark
+import csv
+import json
+import math
+import os
+import random
+
+import onnx.backend.test.loader
+
+
+# Keys of the report lists (as REPORT_KEYS in conftest.py)
+REPORT_KEYS = ["passed", "failed", "skipped", "crashed", "timeout"]
+
+# Keys of the report lists with tests which didn't pass
+FAILED_KEYS = ["failed", "crashed", "timeout"]
+
+# Status of the fully covered operator in nodes.csv
+PASSED_STATUS = "Passed!"
+
+
+def load_report(results_dir, file_name="report.json"):
+    """Load the previous report.
+
+    :param results_dir: Path to directory with results.
+    :type results_dir: str
+    :param file_name: Name of report file, defaults to "report.json"
+    :type file_name: str, optional
+    :return: Report with REPORT_KEYS and lists of tests names, empty if not found.
+    :rtype: dict
+    """
+    try:
+        with open(os.path.join(results_dir, file_name), "r") as report_file:
+            return json.load(report_file)
+    except (IOError, json.decoder.JSONDecodeError):
+        return {}
+
+
+def load_failing_ops(csv_dir, file_name="nodes.csv"):
+    """Load operators which didn't pass all their tests in the previous run.
+
+    :param csv_dir: Path to directory with ONNX coverage CSV files.
+    :type csv_dir: str
+    :param file_name: Name of the operators coverage file, defaults to "nodes.csv"
+    :type file_name: str, optional
+    :return: Set of operators names.
+    :rtype: set
+    """
+    ops = set()
+    try:
+        with open(os.path.join(csv_dir, file_name), newline="") as csv_file:
+            for row in csv.DictReader(csv_file):
+                if row.get("None") != PASSED_STATUS:
+                    ops.add(row["Op"])
+    except IOError:
+        pass  # Return empty set
+    return ops
+
+
+def get_node_tests_ops():
+    """Return operators used by each ONNX node test.
+
+    :return: Dictionary with test name as a key and list of operators as a value.
+    :rtype: dict
+    """
+    tests_ops = {}
+    for test_case in onnx.backend.test.loader.load_model_tests(kind="node"):
+        test_name = "OnnxBackendNodeModelTest::{0}_{1}".format(
+            test_case.name, benchmark.DEVICE.lower()
+        )
+        model, _, _ = benchmark.load_test_case(test_case)
+        tests_ops[test_name] = benchmark.get_model_ops(model)
+    return tests_ops
+
+
+def select_failed(test_names, report):
+    """Return tests which failed, crashed or timed out in the previous report.
+
+    :param test_names: Names of collected tests.
+    :type test_names: list
+    :param report: Previous report.
+    :type report: dict
+    :return: Set of selected tests names.
+    :rtype: set
+    """
+    failed_tests = set()
+    for key in FAILED_KEYS:
+        failed_tests.update(report.get(key, []))
+    return set(test_names) & failed_tests
+
+
+def select_ops(test_names, ops, tests_ops):
+    """Return tests of the specified operators.
+
+    :param test_names: Names of collected tests.
+    :type test_names: list
+    :param ops: Operators names.
+    :type ops: set
+    :param tests_ops: Dictionary with test name as a key and list of operators
+                      as a value.
+    :type tests_ops: dict
+    :return: Set of selected tests names.
+    :rtype: set
+    """
+    return {
+        test_name
+        for test_name in test_names
+        if set(tests_ops.get(test_name, [])) & set(ops)
+    }
+
+
+def select_sample(test_names, report, fraction, seed=0):
+    """Return stratified sample of tests.
+
+    Tests are grouped by the test case and the previous outcome,
+    the same fraction (at least one test) is sampled from each group.
+
+    :param test_names: Names of collected tests.
+    :type test_names: list
+    :param report: Previous report.
+    :type report: dict
+    :param fraction: Fraction of tests to sample.
+    :type fraction: float
+    :param seed: Seed of the random sample, defaults to 0
+    :type seed: int, optional
+    :return: Set of selected tests names.
+    :rtype: set
+    """
+    outcomes = {}
+    for key in REPORT_KEYS:
+        outcomes.update((test_name, key) for test_name in report.get(key, []))
+
+    strata = {}
+    for test_name in sorted(test_names):
+        test_case = test_name.split("::")[0]
+        stratum = (test_case, outcomes.get(test_name, "new"))
+        strata.setdefault(stratum, []).append(test_name)
+
+    random_state = random.Random(seed)
+    selected = set()
+    for stratum in sorted(strata):
+        stratum_tests = strata[stratum]
+        count = max(1, math.ceil(len(stratum_tests) * fraction))
+        count = min(count, len(stratum_tests))
+        selected.update(random_state.sample(stratum_tests, count))
+    return selected
+
+
+def merge_report(full_report, partial_report):
+    """Return the full report updated with outcomes of the partial run.
+
+    :param full_report: Report of the last full run (possibly merged before).
+    :type full_report: dict
+    :param partial_report: Report of the partial run.
+    :type partial_report: dict
+    :return: Merged report.
+    :rtype: dict
+    """
+    run_tests = set()
+    for key in REPORT_KEYS:
+        run_tests.update(partial_report.get(key, []))
+
+    merged_report = dict(full_report)
+    for key in REPORT_KEYS:
+        previous = [name for name in full_report.get(key, []) if name not in run_tests]
+        merged_report[key] = sorted(previous + partial_report.get(key, []))
+    merged_report["date"] = partial_report.get("date", full_report.get("date"))
+    return merged_report
+
+
+def merge_durations(full_durations, partial_durations, tests_ops):
+    """Return the full run durations updated with durations of the partial run.
+
+    Operators durations are updated with the difference
+    between the new and the previous duration of each run test.
+
+    :param full_durations: Tests and operators durations of the last full run.
+    :type full_durations: dict
+    :param partial_durations: Tests and operators durations of the partial run.
+    :type partial_durations: dict
+    :param tests_ops: Dictionary with test name as a key and list of operators
+                      as a value.
+    :type tests_ops: dict
+    :return: Merged durations.
+    :rtype: dict
+    """
+    tests = dict(full_durations.get("tests", {}))
+    ops = dict(full_durations.get("ops", {}))
+    for test_name, test_durations in partial_durations.get("tests", {}).items():
+        previous_total = tests.get(test_name, {}).get("total", 0.0)
+        tests[test_name] = test_durations
+        for op in tests_ops.get(test_name, []):
+            op_duration = ops.get(op, 0.0) + test_durations["total"] - previous_total
+            ops[op] = round(op_duration, 4)
+    return {"tests": tests, "ops": ops}
@@ -0,0 +1,109 @@
+"""Crash isolation of the backend tests.
+
+Isolated mode (pytest option `--isolate`) runs tests in pytest-xdist workers,
+long-lived processes which import the backend once and run many tests.
+A test which crashes its worker (e.g. segmentation fault or abort)
+or runs longer than the timeout (the worker is killed by faulthandler)
+is reported with the "crashed" or "timeout" status and the worker is replaced,
+so results of the whole run are still saved.
+
+Each worker writes Python tracebacks of fatal errors and timeouts to its log file
+in the crash logs dir, the controller reads it to tell a timeout from a crash.
+"""
+
+import faulthandler
+import os
+
+
+# Statuses of tests which killed their worker
+CRASHED_STATUS = "crashed"
+TIMEOUT_STATUS = "timeout"
+
+# Timeout of a single test in seconds
+TEST_TIMEOUT = 600
+
+# Maximal number of replaced workers (pytest-xdist --max-worker-restart)
+MAX_WORKER_RESTARTS = 1000
+
+# Message of the pytest-xdist report of a test which crashed its worker
+CRASH_MESSAGE = "crashed while running"
+
+# Line written by faulthandler when the timeout expires, e.g. "Timeout (0:10:00)!"
+TIMEOUT_MESSAGE = "Timeout ("
+
+# Log file of the current worker
+_log_file = None
+
+
+def get_log_path(log_dir, worker_id):
+    """Return path to the fatal errors log of the worker.
+
+    :param log_dir: Path to the crash logs dir.
+    :type log_dir: str
+    :param worker_id: pytest-xdist worker id, e.g. "gw0".
+    :type worker_id: str
+    :return: Path to the log file.
+    :rtype: str
+    """
+    return os.path.join(log_dir, "{0}.log".format(worker_id))
+
+
+def enable(log_dir, worker_id):
+    """Log tracebacks of fatal errors of the current worker.
+
+    :param log_dir: Path to the crash logs dir.
+    :type log_dir: str
+    :param worker_id: pytest-xdist worker id, e.g. "gw0".
+    :type worker_id: str
+    """
+    global _log_file
+    _log_file = open(get_log_path(log_dir, worker_id), "w")
+    faulthandler.enable(file=_log_file)
+
+
+def start_timeout(timeout):
+    """Kill the current worker if the test doesn't finish before the timeout.
+
+    :param timeout: Timeout in seconds, 0 disables the timeout.
+    :type timeout: float
+    """
+    if _log_file and timeout > 0:
+        faulthandler.dump_traceback_later(timeout, exit=True, file=_log_file)
+
+
+def cancel_timeout():
+    """Cancel the timeout of the finished test."""
+    if _log_file:
+        faulthandler.cancel_dump_traceback_later()
+
+
+def is_crash_report(report):
+    """Check if the report is a pytest-xdist report of a test which crashed its worker.
+
+    :param report: Pytest test report.
+    :type report: _pytest.reports.TestReport
+    :return: True if the test crashed its worker.
+    :rtype: bool
+    """
+    return report.when == "???" and CRASH_MESSAGE in str(report.longrepr)
+
+
+def get_crash_status(log_dir, worker_id):
+    """Return status of the test which crashed the worker.
+
+    :param log_dir: Path to the crash logs dir.
+    :type log_dir: str
+    :param worker_id: pytest-xdist worker id, e.g. "gw0".
+    :type worker_id: str
+    :return: TIMEOUT_STATUS if the worker was killed by the timeout,
+             CRASHED_STATUS otherwise.
+    :rtype: str
+    """
+    try:
+        with open(get_log_path(log_dir, worker_id), "r") as log_file:
+            for line in log_file:
+                if line.startswith(TIMEOUT_MESSAGE):
+                    return TIMEOUT_STATUS
+    except IOError:
+        pass  # Worker log is not available
+    return CRASHED_STATUS
@@ -0,0 +1,105 @@
+"""Peak memory of tests.
+
+Memory is measured during the call phase of each test with the --memory option:
+    rss_peak    - growth of the process resident set size peak over the RSS
+                  at the test start (in bytes),
+    python_peak - peak size of memory blocks allocated by Python (in bytes),
+                  traced with tracemalloc.
+
+Peak RSS is reset before each test through /proc/self/clear_refs on Linux,
+otherwise only growth of the process lifetime peak (ru_maxrss) is detected.
+Allocations tracing slows the tests down, so the measurement is opt-in.
+"""
+
+import resource
+import tracemalloc
+
+
+# Measurements of the test run in the current process
+CURRENT_TEST = {}
+
+# Process status file with the current (VmRSS) and peak (VmHWM) RSS in kB
+PROC_STATUS = "/proc/self/status"
+
+# Writing "5" to this file resets the peak RSS of the process
+CLEAR_REFS = "/proc/self/clear_refs"
+
+
+def _read_status():
+    """Return current and peak RSS of the process.
+
+    :return: Dictionary with "VmRSS" and "VmHWM" in bytes, empty if not available.
+    :rtype: dict
+    """
+    status = {}
+    try:
+        with open(PROC_STATUS, "r") as status_file:
+            for line in status_file:
+                key, _, value = line.partition(":")
+                if key in ["VmRSS", "VmHWM"]:
+                    status[key] = int(value.split()[0]) * 1024
+    except (IOError, ValueError):
+        pass  # Return empty status
+    return status
+
+
+def _reset_peak_rss():
+    """Reset peak RSS of the process.
+
+    :return: True if the peak was reset.
+    :rtype: bool
+    """
+    try:
+        with open(CLEAR_REFS, "w") as clear_refs_file:
+            clear_refs_file.write("5")
+    except IOError:
+        return False
+    return True
+
+
+def _get_max_rss():
+    """Return peak RSS of the process lifetime in bytes.
+
+    :return: Peak RSS.
+    :rtype: int
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def start():
+    """Start memory measurement of the current test."""
+    CURRENT_TEST.clear()
+    CURRENT_TEST["rss"] = _read_status().get("VmRSS")
+    if CURRENT_TEST["rss"] is None or not _reset_peak_rss():
+        CURRENT_TEST["rss"] = _get_max_rss()
+        CURRENT_TEST["max_rss"] = True
+    tracemalloc.start()
+
+
+def stop():
+    """Stop memory measurement of the current test."""
+    if "rss" not in CURRENT_TEST:
+        return
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if CURRENT_TEST.get("max_rss"):
+        rss_peak = _get_max_rss()
+    else:
+        rss_peak = _read_status().get("VmHWM", CURRENT_TEST["rss"])
+    rss_growth = max(0, rss_peak - CURRENT_TEST["rss"])
+    CURRENT_TEST.clear()
+    CURRENT_TEST.update(rss_peak=rss_growth, python_peak=python_peak)
+
+
+def pop_test_memory():
+    """Return memory measurement of the current test and reset it.
+
+    :return: Dictionary with "rss_peak" and "python_peak" in bytes,
+             empty if the memory wasn't measured.
+    :rtype: dict
+    """
+    memory = {}
+    if "rss_peak" in CURRENT_TEST:
+        memory = {key: CURRENT_TEST[key] for key in ["rss_peak", "python_peak"]}
+    CURRENT_TEST.clear()
+    return memory
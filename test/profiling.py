@@ -0,0 +1,174 @@
+"""ONNX backend profiling.
+
+The backend used by the tests is wrapped with ProfiledBackend, which measures
+the time of model preparation (graph compilation) and inference runs
+of the current test separately. The first inference run is measured
+separately from the steady-state runs: after the first run of a prepared model
+the same inputs are run STEADY_STATE_RUNS more times (outputs of these runs
+are dropped, their errors are recorded instead of failing the test; no additional
+runs by default). Cold import time of the backend module is measured by import_backend.
+
+Measurements of the current test are saved in CURRENT_TEST,
+they are attached to the pytest report and saved by conftest.py
+in the results directory.
+"""
+
+import importlib
+import sys
+import time
+
+
+# Measurements of the test run in the current process
+CURRENT_TEST = {}
+
+# Backend module import measurement
+IMPORT = {}
+
+# Number of additional inference runs measuring the steady-state run time
+STEADY_STATE_RUNS = 0
+
+# Errors of failed inference runs (recorded in the steady-state runs)
+RUN_ERRORS = (
+    ArithmeticError,
+    AssertionError,
+    LookupError,
+    MemoryError,
+    OSError,
+    RuntimeError,
+    TypeError,
+    ValueError,
+)
+
+
+def import_backend(onnx_backend_module):
+    """Import ONNX backend module and measure the import time.
+
+    Import is cold, if the module wasn't imported before in the current process.
+
+    :param onnx_backend_module: ONNX backend module to import.
+    :type onnx_backend_module: str
+    :return: The ONNX backend module.
+    :rtype: class 'module'
+    """
+    cold = onnx_backend_module not in sys.modules
+    start = time.perf_counter()
+    backend = importlib.import_module(onnx_backend_module)
+    IMPORT.update(
+        module=onnx_backend_module,
+        time=round(time.perf_counter() - start, 4),
+        cold=cold,
+    )
+    return backend
+
+
+def _record(key, duration):
+    """Add measured duration to the current test measurements.
+
+    :param key: Measurement name, e.g. "compile".
+    :type key: str
+    :param duration: Duration in seconds.
+    :type duration: float
+    """
+    CURRENT_TEST.setdefault(key, []).append(duration)
+
+
+class ProfiledBackendRep:
+    """Prepared model (backend representation) measuring its runs."""
+
+    def __init__(self, backend_rep):
+        """Wrap prepared model.
+
+        :param backend_rep: Model prepared by the backend.
+        :type backend_rep: onnx.backend.base.BackendRep
+        """
+        self._backend_rep = backend_rep
+        self._runs = 0
+
+    def __getattr__(self, name):
+        """Return attribute of the wrapped prepared model."""
+        return getattr(self._backend_rep, name)
+
+    def run(self, inputs, **kwargs):
+        """Run inference and measure first or steady-state run time."""
+        start = time.perf_counter()
+        outputs = self._backend_rep.run(inputs, **kwargs)
+        duration = time.perf_counter() - start
+        self._runs += 1
+        if self._runs > 1:
+            _record("steady_run", duration)
+            return outputs
+
+        _record("first_run", duration)
+        for _ in range(STEADY_STATE_RUNS):
+            start = time.perf_counter()
+            try:
+                self._backend_rep.run(inputs, **kwargs)
+            except RUN_ERRORS as err:
+                _record("steady_run_errors", "{0}: {1}".format(type(err).__name__, err))
+                break
+            _record("steady_run", time.perf_counter() - start)
+        return outputs
+
+
+class ProfiledBackend:
+    """ONNX backend measuring model preparation and inference of the current test."""
+
+    def __init__(self, backend):
+        """Wrap ONNX backend.
+
+        :param backend: ONNX backend module.
+        :type backend: module
+        """
+        self._backend = backend
+
+    def __getattr__(self, name):
+        """Return attribute of the wrapped backend."""
+        return getattr(self._backend, name)
+
+    def prepare(self, model, device="CPU", **kwargs):
+        """Prepare model and measure the preparation (compile) time."""
+        start = time.perf_counter()
+        backend_rep = self._backend.prepare(model, device, **kwargs)
+        _record("compile", time.perf_counter() - start)
+        return ProfiledBackendRep(backend_rep)
+
+    def run_model(self, model, inputs, device="CPU", **kwargs):
+        """Prepare and run model and measure the total time."""
+        start = time.perf_counter()
+        outputs = self._backend.run_model(model, inputs, device, **kwargs)
+        _record("run_model", time.perf_counter() - start)
+        return outputs
+
+
+def pop_test_profile():
+    """Return measurements of the current test and reset them.
+
+    Profile example:
+    {
+        "compile": 0.0123,
+        "first_run": 0.0021,
+        "steady_run": 0.0004,
+        "runs": 2
+    }
+
+    :return: Dictionary with total compile time, first run time, median of
+             steady-state run times (in seconds), number of steady-state runs
+             and errors of the failed steady-state run,
+             empty if the test didn't use the backend.
+    :rtype: dict
+    """
+    measurements = dict(CURRENT_TEST)
+    CURRENT_TEST.clear()
+    profile = {}
+    for key in ["compile", "run_model"]:
+        if key in measurements:
+            profile[key] = round(sum(measurements[key]), 6)
+    if "first_run" in measurements:
+        profile["first_run"] = round(measurements["first_run"][0], 6)
+    steady_runs = sorted(measurements.get("steady_run", []))
+    if steady_runs:
+        profile["steady_run"] = round(steady_runs[len(steady_runs) // 2], 6)
+        profile["runs"] = len(steady_runs)
+    if "steady_run_errors" in measurements:
+        profile["steady_run_errors"] = measurements["steady_run_errors"]
+    return profile
@@ -0,0 +1,187 @@
+"""Version-keyed cache of test results.
+
+Results of a test run (report.json, durations.json, profile.json, memory.json and ONNX
+coverage CSV files) are stored under a key computed from the installed packages
+versions, the ONNX backend module, the tests selection and a hash of the test harness
+files.
+Next run with the same key restores the stored results instead of running the tests.
+
+Each cache entry is a directory named with its key:
+    <cache_dir>/<key>/entry.json      - key data, written last
+    <cache_dir>/<key>/results/...     - files from RESULTS_DIR
+    <cache_dir>/<key>/csv/...         - files from CSVDIR
+Least recently used entries are removed when the cache grows over its size.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import shutil
+import time
+
+
+# Name of the cache dir in the results dir (can be changed with RESULT_CACHE_DIR)
+CACHE_DIR = ".cache"
+
+# Maximal number of cached results
+CACHE_SIZE = 5
+
+# Name of the file with entry key data, entry is complete when it exists
+ENTRY_FILE = "entry.json"
+
+# Cached files from the results dir and the ONNX coverage CSV dir
+RESULT_FILES = ["report.json", "durations.json", "profile.json", "memory.json"]
+CSV_FILES = ["nodes.csv", "models.csv", "metadata.csv"]
+
+
+def hash_harness(harness_dir):
+    """Return digest of the test harness Python files.
+
+    :param harness_dir: Path to the directory with the test harness.
+    :type harness_dir: str
+    :return: Hex digest.
+    :rtype: str
+    """
+    digest = hashlib.sha256()
+    for file_path in sorted(glob.glob(os.path.join(harness_dir, "*.py"))):
+        digest.update(os.path.basename(file_path).encode())
+        with open(file_path, "rb") as harness_file:
+            digest.update(harness_file.read())
+    return digest.hexdigest()
+
+
+def get_key_data(package_versions, backend_module, harness_digest, selection=None):
+    """Return data identifying the test run.
+
+    :param package_versions: List of packages installed by pip.
+    :type package_versions: list
+    :param backend_module: ONNX backend module name.
+    :type backend_module: str
+    :param harness_digest: Digest of the test harness files.
+    :type harness_digest: str
+    :param selection: Tests selection options (e.g. -k expression), defaults to None
+    :type selection: dict, optional
+    :return: Dictionary with the key data.
+    :rtype: dict
+    """
+    versions = sorted(
+        (package.get("name"), package.get("version")) for package in package_versions
+    )
+    return {
+        "versions": [{"name": name, "version": version} for name, version in versions],
+        "backend": backend_module,
+        "harness": harness_digest,
+        "selection": selection or {},
+    }
+
+
+def get_key(key_data):
+    """Return cache key of the key data.
+
+    :param key_data: Dictionary returned by get_key_data.
+    :type key_data: dict
+    :return: Hex digest.
+    :rtype: str
+    """
+    content = json.dumps(key_data, sort_keys=True).encode()
+    return hashlib.sha256(content).hexdigest()[:16]
+
+
+def load_entry(cache_dir, key):
+    """Return path to the complete cache entry and mark it as recently used.
+
+    :param cache_dir: Path to the cache directory.
+    :type cache_dir: str
+    :param key: Cache key.
+    :type key: str
+    :return: Path to the entry directory or None if there is no such entry.
+    :rtype: str
+    """
+    entry_dir = os.path.join(cache_dir, key)
+    entry_file = os.path.join(entry_dir, ENTRY_FILE)
+    if not os.path.isfile(entry_file):
+        return None
+    os.utime(entry_file)
+    return entry_dir
+
+
+def _copy_files(file_names, src_dir, dst_dir):
+    """Copy existing files between directories.
+
+    :param file_names: Names of files to copy.
+    :type file_names: list
+    :param src_dir: Path to the source directory.
+    :type src_dir: str
+    :param dst_dir: Path to the destination directory.
+    :type dst_dir: str
+    """
+    os.makedirs(dst_dir, exist_ok=True)
+    for file_name in file_names:
+        src_path = os.path.join(src_dir, file_name)
+        if os.path.isfile(src_path):
+            shutil.copy2(src_path, os.path.join(dst_dir, file_name))
+
+
+def restore_entry(entry_dir, results_dir, csv_dir=None):
+    """Copy cached files to the results directories.
+
+    :param entry_dir: Path to the entry directory returned by load_entry.
+    :type entry_dir: str
+    :param results_dir: Path to the results directory.
+    :type results_dir: str
+    :param csv_dir: Path to the ONNX coverage CSV directory, defaults to None
+    :type csv_dir: str, optional
+    """
+    _copy_files(RESULT_FILES, os.path.join(entry_dir, "results"), results_dir)
+    if csv_dir:
+        _copy_files(CSV_FILES, os.path.join(entry_dir, "csv"), csv_dir)
+
+
+def store_entry(cache_dir, key, key_data, results_dir, csv_dir=None):
+    """Store results files in the cache.
+
+    Entry is prepared in a temporary directory and renamed,
+    so an interrupted run never leaves an incomplete entry.
+
+    :param cache_dir: Path to the cache directory.
+    :type cache_dir: str
+    :param key: Cache key.
+    :type key: str
+    :param key_data: Dictionary returned by get_key_data.
+    :type key_data: dict
+    :param results_dir: Path to the results directory.
+    :type results_dir: str
+    :param csv_dir: Path to the ONNX coverage CSV directory, defaults to None
+    :type csv_dir: str, optional
+    """
+    entry_dir = os.path.join(cache_dir, key)
+    temp_dir = "{0}.tmp{1}".format(entry_dir, os.getpid())
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    _copy_files(RESULT_FILES, results_dir, os.path.join(temp_dir, "results"))
+    if csv_dir:
+        _copy_files(CSV_FILES, csv_dir, os.path.join(temp_dir, "csv"))
+    with open(os.path.join(temp_dir, ENTRY_FILE), "w") as entry_file:
+        json.dump(dict(key_data, key=key, time=time.time()), entry_file, indent=4)
+
+    shutil.rmtree(entry_dir, ignore_errors=True)
+    os.replace(temp_dir, entry_dir)
+
+
+def prune(cache_dir, size=CACHE_SIZE):
+    """Remove least recently used entries over the cache size.
+
+    :param cache_dir: Path to the cache directory.
+    :type cache_dir: str
+    :param size: Maximal number of entries, defaults to CACHE_SIZE
+    :type size: int, optional
+    :return: Number of removed entries.
+    :rtype: int
+    """
+    entries = []
+    for entry_file in glob.glob(os.path.join(cache_dir, "*", ENTRY_FILE)):
+        entries.append((os.path.getmtime(entry_file), os.path.dirname(entry_file)))
+    entries.sort(reverse=True)
+    for _, entry_dir in entries[size:]:
+        shutil.rmtree(entry_dir, ignore_errors=True)
+    return max(0, len(entries) - size)
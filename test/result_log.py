@@ -0,0 +1,165 @@
+"""Streaming log of test results.
+
+Result of each test is appended to the line-delimited results log
+(.cache/results.jsonl in the results dir) as soon as the test finishes,
+so results of an interrupted run are not lost and a run can be watched
+while it's in progress. The first line describes the session:
+    {"session": {"backend": "onnxruntime.backend.backend", "date": "..."}}
+    {"test": "OnnxBackendNodeModelTest::test_abs_cpu", "status": "passed",
+     "durations": {"setup": 0.0002, "call": 0.0123, "teardown": 0.0001},
+     "properties": {"profile": {...}}, "coverage": [...]}
+Lines are written right away, but synced to the disk in batches
+(every FSYNC_BATCH lines or FSYNC_INTERVAL seconds), so the log doesn't
+slow down short tests. Report of the run is built from the log and a run
+with the `--resume` option skips tests already finished in the log.
+"""
+
+import base64
+import json
+import os
+import time
+
+
+# Path to the results log file relative to the results directory,
+# the cache dir isn't committed with the results
+RESULT_LOG_FILE = os.path.join(".cache", "results.jsonl")
+
+# Maximal number of lines and time in seconds between syncs of the log to the disk
+FSYNC_BATCH = 100
+FSYNC_INTERVAL = 5.0
+
+
+class ResultLog:
+    """Append-only log of test results of the session."""
+
+    def __init__(self, file_path, session, append=False):
+        """Open the log.
+
+        :param file_path: Path to the log file.
+        :type file_path: str
+        :param session: Description of the session written in the first line.
+        :type session: dict
+        :param append: Append to the existing log of the same session,
+                       defaults to False (start a new log)
+        :type append: bool, optional
+        """
+        self._log_file = open(file_path, "a" if append else "w")
+        self._pending = 0
+        self._synced = time.monotonic()
+        if not append:
+            self.append({"session": session})
+            self.sync()
+
+    def append(self, record):
+        """Write record to the log, sync the log if the batch is full.
+
+        :param record: JSON serializable record.
+        :type record: dict
+        """
+        self._log_file.write(json.dumps(record, sort_keys=True) + "\n")
+        self._log_file.flush()
+        self._pending += 1
+        if (
+            self._pending >= FSYNC_BATCH
+            or time.monotonic() - self._synced >= FSYNC_INTERVAL
+        ):
+            self.sync()
+
+    def sync(self):
+        """Sync written records to the disk."""
+        os.fsync(self._log_file.fileno())
+        self._pending = 0
+        self._synced = time.monotonic()
+
+    def close(self):
+        """Sync and close the log."""
+        if not self._log_file.closed:
+            self.sync()
+            self._log_file.close()
+
+
+def load(file_path):
+    """Load the session and finished tests from the log.
+
+    Broken lines (e.g. the last line of a killed run) are skipped.
+    If a test is logged more than once, its last record is used.
+
+    :param file_path: Path to the log file.
+    :type file_path: str
+    :return: Session description (None if there is no log)
+             and dictionary with test name as a key and test record as a value.
+    :rtype: tuple
+    """
+    session, records = None, {}
+    for record in _read_lines(file_path):
+        if "session" in record:
+            session = record["session"]
+        elif "test" in record:
+            records[record["test"]] = record
+    return session, records
+
+
+def _read_lines(file_path):
+    """Yield valid JSON lines of the log.
+
+    :param file_path: Path to the log file.
+    :type file_path: str
+    :return: Generator of decoded lines, empty if there is no log.
+    :rtype: generator
+    """
+    try:
+        with open(file_path, "rb") as log_file:
+            for line in log_file:
+                try:
+                    yield json.loads(line.decode())
+                except (UnicodeDecodeError, json.decoder.JSONDecodeError):
+                    continue
+    except IOError:
+        return
+
+
+def get_report(records, report_keys):
+    """Return names of tests with each status.
+
+    :param records: Dictionary with test name as a key and test record as a value.
+    :type records: dict
+    :param report_keys: Statuses included in the report.
+    :type report_keys: list
+    :return: Dictionary with status as a key and sorted list of test names as a value.
+    :rtype: dict
+    """
+    report = {key: [] for key in report_keys}
+    for test_name, record in records.items():
+        if record.get("status") in report:
+            report[record["status"]].append(test_name)
+    for test_names in report.values():
+        test_names.sort()
+    return report
+
+
+def encode_coverage(serialized_marks):
+    """Return ONNX coverage marks with protos encoded as base64 strings.
+
+    :param serialized_marks: List of marks with serialized protos (bytes).
+    :type serialized_marks: list
+    :return: List of marks which can be saved as JSON.
+    :rtype: list
+    """
+    return [
+        dict(mark, proto=base64.b64encode(mark["proto"]).decode())
+        for mark in serialized_marks
+    ]
+
+
+def decode_coverage(encoded_marks):
+    """Return ONNX coverage marks with protos decoded from base64 strings.
+
+    :param encoded_marks: List of marks returned by encode_coverage.
+    :type encoded_marks: list
+    :return: List of marks with serialized protos (bytes).
+    :rtype: list
+    """
+    return [
+        dict(mark, proto=base64.b64decode(mark["proto"].encode()))
+        for mark in encoded_marks
+    ]
@@ -0,0 +1,214 @@
+"""Synthetic ONNX models of configurable size.
+
+Models are chains of layers built from a mix of operators
+(convolution, matrix multiplication or elementwise operations) with deterministic
+random weights, so backends can be benchmarked on growing graphs without
+downloading any model zoo. Width is the number of parallel chains joined
+by the Sum operator at the end of the graph.
+
+All tensors have [1, CHANNELS, size, size] shape, so any layers can be mixed.
+
+Models can be saved locally with:
+    python3 test/synthetic_models.py --mix conv,matmul --depth 8 --width 2 --size 32
+"""
+
+import os
+
+import numpy as np
+import onnx
+
+from argparse import ArgumentParser
+from onnx import helper, numpy_helper, TensorProto
+
+
+# Number of channels of all tensors in the graph
+CHANNELS = 4
+
+# Operator set and IR version supported by all scoreboard backends
+OPSET_VERSION = 9
+IR_VERSION = 4
+
+# Layer types: Conv+Relu, MatMul+Relu and Mul+Add+Relu
+LAYERS = ("conv", "matmul", "elementwise")
+
+# Named operator mixes, layers of the mix are repeated along the chain
+OP_MIXES = {
+    "conv": ["conv"],
+    "matmul": ["matmul"],
+    "elementwise": ["elementwise"],
+    "mixed": ["conv", "matmul", "elementwise"],
+}
+
+
+def _make_weight(random_state, name, shape, fan_in):
+    """Return initializer with normally distributed weights.
+
+    Weights are scaled by fan-in, so values don't grow along deep chains.
+
+    :param random_state: Random numbers generator.
+    :type random_state: numpy.random.RandomState
+    :param name: Initializer name.
+    :type name: str
+    :param shape: Weight tensor shape.
+    :type shape: list
+    :param fan_in: Number of inputs of a single output value.
+    :type fan_in: int
+    :return: Weight tensor.
+    :rtype: onnx.TensorProto
+    """
+    values = random_state.standard_normal(shape) / np.sqrt(fan_in)
+    return numpy_helper.from_array(values.astype(np.float32), name)
+
+
+def _make_layer(layer, input_name, prefix, size, random_state):
+    """Return nodes and initializers of a single layer.
+
+    :param layer: Layer type, one of LAYERS.
+    :type layer: str
+    :param input_name: Name of the layer input.
+    :type input_name: str
+    :param prefix: Prefix of names of the layer nodes and tensors.
+    :type prefix: str
+    :param size: Height and width of the tensors.
+    :type size: int
+    :param random_state: Random numbers generator.
+    :type random_state: numpy.random.RandomState
+    :return: List of nodes, list of initializers and name of the layer output.
+    :rtype: tuple
+    """
+    weight_name, hidden_name = prefix + "_w", prefix + "_h"
+    output_name = prefix + "_y"
+    if layer == "conv":
+        shape, fan_in = [CHANNELS, CHANNELS, 3, 3], CHANNELS * 9
+        node = helper.make_node(
+            "Conv", [input_name, weight_name], [hidden_name], pads=[1, 1, 1, 1]
+        )
+        nodes = [node]
+    elif layer == "matmul":
+        shape, fan_in = [size, size], size
+        nodes = [helper.make_node("MatMul", [input_name, weight_name], [hidden_name])]
+    else:
+        shape, fan_in = [1, CHANNELS, 1, 1], 1
+        bias_name, scaled_name = prefix + "_b", prefix + "_s"
+        nodes = [
+            helper.make_node("Mul", [input_name, weight_name], [scaled_name]),
+            helper.make_node("Add", [scaled_name, bias_name], [hidden_name]),
+        ]
+    initializers = [_make_weight(random_state, weight_name, shape, fan_in)]
+    if layer == "elementwise":
+        initializers.append(_make_weight(random_state, bias_name, shape, fan_in))
+    nodes.append(helper.make_node("Relu", [hidden_name], [output_name]))
+    return nodes, initializers, output_name
+
+
+def make_model(mix, depth, width=1, size=32, seed=0):
+    """Build synthetic model with chains of layers.
+
+    :param mix: List of layer types (see LAYERS) repeated along each chain.
+    :type mix: list
+    :param depth: Number of layers in each chain.
+    :type depth: int
+    :param width: Number of parallel chains, defaults to 1
+    :type width: int, optional
+    :param size: Height and width of the tensors, defaults to 32
+    :type size: int, optional
+    :param seed: Seed of the weights generator, defaults to 0
+    :type seed: int, optional
+    :raises ValueError: Unknown layer type in the mix.
+    :return: ONNX model.
+    :rtype: onnx.ModelProto
+    """
+    unknown_layers = set(mix) - set(LAYERS)
+    if unknown_layers:
+        raise ValueError("Unknown layer types: {0}".format(sorted(unknown_layers)))
+    random_state = np.random.RandomState(seed)
+    nodes, initializers, chain_outputs = [], [], []
+    for chain in range(width):
+        tensor_name = "x"
+        for idx in range(depth):
+            layer_nodes, layer_initializers, tensor_name = _make_layer(
+                mix[idx % len(mix)],
+                tensor_name,
+                "c{0}_l{1}".format(chain, idx),
+                size,
+                random_state,
+            )
+            nodes.extend(layer_nodes)
+            initializers.extend(layer_initializers)
+        chain_outputs.append(tensor_name)
+    nodes.append(helper.make_node("Sum", chain_outputs, ["y"]))
+
+    shape = [1, CHANNELS, size, size]
+    graph = helper.make_graph(
+        nodes,
+        "synthetic_{0}".format("_".join(mix)),
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, shape)],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, shape)],
+        initializer=initializers,
+    )
+    model = helper.make_model(
+        graph, opset_imports=[helper.make_opsetid("", OPSET_VERSION)]
+    )
+    model.ir_version = IR_VERSION
+    onnx.checker.check_model(model)
+    return model
+
+
+def make_inputs(model, seed=0):
+    """Return deterministic random inputs of the synthetic model.
+
+    :param model: Synthetic model returned by make_model.
+    :type model: onnx.ModelProto
+    :param seed: Seed of the inputs generator, defaults to 0
+    :type seed: int, optional
+    :return: List of input arrays.
+    :rtype: list
+    """
+    random_state = np.random.RandomState(seed)
+    inputs = []
+    for graph_input in model.graph.input:
+        shape = [dim.dim_value for dim in graph_input.type.tensor_type.shape.dim]
+        inputs.append(random_state.standard_normal(shape).astype(np.float32))
+    return inputs
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument(
+        "--mix",
+        dest="mix",
+        help="Comma separated layer types ({0}) or a mix name ({1})".format(
+            ", ".join(sorted(LAYERS)), ", ".join(sorted(OP_MIXES))
+        ),
+        default="mixed",
+        type=str,
+    )
+    parser.add_argument(
+        "--depth", dest="depth", help="Number of layers", default=4, type=int
+    )
+    parser.add_argument(
+        "--width", dest="width", help="Number of parallel chains", default=1, type=int
+    )
+    parser.add_argument(
+        "--size", dest="size", help="Height and width of tensors", default=32, type=int
+    )
+    parser.add_argument(
+        "--seed", dest="seed", help="Seed of the weights", default=0, type=int
+    )
+    parser.add_argument(
+        "--output_dir",
+        dest="output_dir",
+        help="Directory to save the model",
+        default="./",
+        type=str,
+    )
+    args = parser.parse_args()
+
+    mix = OP_MIXES.get(args.mix, args.mix.split(","))
+    model = make_model(mix, args.depth, args.width, args.size, args.seed)
+    file_name = "synthetic_{mix}_d{depth}_w{width}_s{size}.onnx".format(
+        mix="_".join(mix), depth=args.depth, width=args.width, size=args.size
+    )
+    os.makedirs(args.output_dir, exist_ok=True)
+    onnx.save(model, os.path.join(args.output_dir, file_name))
+    print(os.path.join(args.output_dir, file_name))
@@ -1,11 +1,13 @@
 """ONNX backend test initialization."""
 
-import importlib
+import benchmark
+import data_cache
+import json
+import os
+import profiling
 import test
 import unittest
 
-import onnx.backend.test
-
 
 def import_backend(onnx_backend_module):
     """Import ONNX backend module.
@@ -16,7 +18,7 @@ def import_backend(onnx_backend_module):
     :return: The ONNX backend module.
     :rtype: class 'module'
     """
-    backend = importlib.import_module(onnx_backend_module)
+    backend = profiling.import_backend(onnx_backend_module)
     if not hasattr(backend, "run_model") and not hasattr(backend, "run"):
         raise ValueError("%s is not a valid ONNX backend", onnx_backend_module)
     return backend
@@ -28,13 +30,34 @@ backend = import_backend(test.ONNX_BACKEND_MODULE)
 # Set backend device name to be used
 backend.backend_name = "CPU"
 
-# This is a pytest variable to load extra plugins
-# Enable the ONNX compatibility report
-pytest_plugins = "onnx.backend.test.report"
+
+def load_passed_tests(results_dir, file_name="report.json"):
+    """Load names of tests passed in the latest report.
+
+    :param results_dir: Path to directory with results.
+    :type results_dir: str
+    :param file_name: Name of report file, defaults to "report.json"
+    :type file_name: str, optional
+    :return: Set of passed tests names or None if the report can't be loaded.
+    :rtype: set
+    """
+    try:
+        with open(os.path.join(results_dir, file_name), "r") as report_file:
+            return set(json.load(report_file).get("passed", []))
+    except (IOError, json.decoder.JSONDecodeError):
+        return None
+
 
 # Import all test cases at global scope to make them visible to python.unittest
-backend_test = onnx.backend.test.BackendTest(backend, __name__)
-globals().update(backend_test.enable_report().test_cases)
+if test.BENCHMARK:
+    passed_tests = load_passed_tests(os.environ.get("RESULTS_DIR", os.getcwd()))
+    globals().update(benchmark.create_test_cases(backend, test.BENCHMARK, passed_tests))
+else:
+    # Measure compile and run times of each test, load test data from the cache
+    backend_test = data_cache.CachedBackendTest(
+        profiling.ProfiledBackend(backend), __name__
+    )
+    globals().update(backend_test.enable_report().test_cases)
 
 
 if __name__ == "__main__":
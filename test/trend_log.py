@@ -0,0 +1,190 @@
+"""Append-only trend log.
+
+Trend log is a line-delimited JSON file (trend.jsonl) with one report summary
+per line. New summaries are appended under an exclusive file lock, so the log
+never has to be loaded and rewritten as a whole and it's safe to update it
+from concurrent processes. Only the last entry can be replaced, which keeps
+the trend.json semantics of replacing a summary equal to the previous one.
+
+The website generator reads the last entries of the log with read_tail.
+
+Existing trend.json files can be migrated with:
+    python3 test/trend_log.py <results_dir> [<results_dir> ...]
+"""
+
+import fcntl
+import json
+import os
+import sys
+
+
+# Name of the trend log file in the results directory
+TREND_LOG_FILE = "trend.jsonl"
+
+# Size of the chunks read from the end of the log
+BLOCK_SIZE = 8192
+
+
+def _read_tail_lines(log_file, count):
+    """Return offsets and content of the last complete lines in the file.
+
+    An incomplete last line (e.g. left by an interrupted write) is skipped.
+
+    :param log_file: File opened in binary mode.
+    :type log_file: file
+    :param count: Number of lines to return.
+    :type count: int
+    :return: List of (offset, line) tuples ordered from the oldest line.
+    :rtype: list
+    """
+    if count <= 0:
+        return []
+    log_file.seek(0, os.SEEK_END)
+    position = log_file.tell()
+    data = b""
+    # Read one line more than needed, because the first read line can be incomplete
+    while position > 0 and data.count(b"\n") <= count:
+        read_size = min(BLOCK_SIZE, position)
+        position -= read_size
+        log_file.seek(position)
+        data = log_file.read(read_size) + data
+
+    # Drop the incomplete last line
+    lines = data[: data.rfind(b"\n") + 1].splitlines(keepends=True)
+    offset = position
+    if position > 0:
+        offset += len(lines[0])
+        lines = lines[1:]
+
+    tail = []
+    for line in lines:
+        tail.append((offset, line))
+        offset += len(line)
+    return tail[-count:]
+
+
+def _parse_line(line):
+    """Return trend entry parsed from the log line or None if the line is broken.
+
+    :param line: Line of the trend log.
+    :type line: bytes
+    :return: Trend entry.
+    :rtype: dict
+    """
+    try:
+        return json.loads(line.decode())
+    except (UnicodeDecodeError, json.decoder.JSONDecodeError):
+        return None
+
+
+def iter_entries(file_path):
+    """Yield trend entries from the log one by one.
+
+    Broken lines are skipped.
+
+    :param file_path: Path to the trend log.
+    :type file_path: str
+    :return: Generator of trend entries.
+    :rtype: generator
+    """
+    try:
+        with open(file_path, "rb") as log_file:
+            for line in log_file:
+                entry = _parse_line(line)
+                if entry is not None:
+                    yield entry
+    except IOError:
+        return
+
+
+def read_tail(file_path, count):
+    """Return the last entries of the trend log without reading the whole file.
+
+    :param file_path: Path to the trend log.
+    :type file_path: str
+    :param count: Number of entries to return.
+    :type count: int
+    :return: List of trend entries ordered from the oldest one.
+    :rtype: list
+    """
+    try:
+        with open(file_path, "rb") as log_file:
+            lines = _read_tail_lines(log_file, count)
+    except IOError:
+        return []
+    entries = (_parse_line(line) for _, line in lines)
+    return [entry for entry in entries if entry is not None]
+
+
+def append_entry(file_path, entry, merge_last=None):
+    """Append entry to the trend log.
+
+    The log is locked for the time of the update.
+    If merge_last function returns an entry for the new entry and the last entries
+    of the log, the returned entry replaces the last one instead.
+
+    :param file_path: Path to the trend log.
+    :type file_path: str
+    :param entry: Trend entry, e.g. report summary.
+    :type entry: dict
+    :param merge_last: Function called with entry and list of the last two entries,
+                       defaults to None (always append)
+    :type merge_last: function, optional
+    """
+    with open(file_path, "a+b") as log_file:
+        fcntl.flock(log_file, fcntl.LOCK_EX)
+        try:
+            tail = _read_tail_lines(log_file, 2)
+            end = tail[-1][0] + len(tail[-1][1]) if tail else 0
+            tail_entries = [_parse_line(tail_line) for _, tail_line in tail]
+            tail_entries = [item for item in tail_entries if item is not None]
+            merged_entry = None
+            if tail and merge_last:
+                merged_entry = merge_last(entry, tail_entries)
+            if merged_entry is not None:
+                end = tail[-1][0]
+                entry = merged_entry
+            log_file.truncate(end)
+            log_file.write((json.dumps(entry, sort_keys=True) + "\n").encode())
+            log_file.flush()
+            os.fsync(log_file.fileno())
+        finally:
+            fcntl.flock(log_file, fcntl.LOCK_UN)
+
+
+def migrate(results_dir, json_name="trend.json", log_name=TREND_LOG_FILE):
+    """Create trend log from the existing trend JSON file.
+
+    Nothing is done if the trend log already exists or there is no trend JSON file.
+    The trend JSON file is left unchanged.
+
+    :param results_dir: Path to the directory with results.
+    :type results_dir: str
+    :param json_name: Name of the trend JSON file, defaults to "trend.json"
+    :type json_name: str, optional
+    :param log_name: Name of the trend log file, defaults to "trend.jsonl"
+    :type log_name: str, optional
+    :return: True if the trend log was created.
+    :rtype: bool
+    """
+    log_path = os.path.join(results_dir, log_name)
+    if os.path.exists(log_path):
+        return False
+    try:
+        with open(os.path.join(results_dir, json_name), "r") as trend_file:
+            trend = json.load(trend_file)
+    except (IOError, json.decoder.JSONDecodeError):
+        return False
+
+    temp_path = "{0}.tmp".format(log_path)
+    with open(temp_path, "w") as log_file:
+        for entry in trend:
+            log_file.write(json.dumps(entry, sort_keys=True) + "\n")
+    os.replace(temp_path, log_path)
+    return True
+
+
+if __name__ == "__main__":
+    for results_dir in sys.argv[1:]:
+        migrated = migrate(results_dir)
+        print("{0}: {1}".format(results_dir, "migrated" if migrated else "skipped"))
@@ -0,0 +1,175 @@
+"""Incremental build support for the static page generator.
+
+Build manifest stores a digest of all inputs (results files, templates,
+configuration and generator code) of each generated page,
+so unchanged pages can be skipped by the next build.
+"""
+
+import filecmp
+import hashlib
+import json
+import os
+import shutil
+
+
+class FileHashes:
+    """Cache of file content hashes computed during a single build."""
+
+    def __init__(self):
+        """Create empty cache."""
+        self._hashes = {}
+
+    def get(self, file_path):
+        """Return SHA-256 hex digest of the file content.
+
+        :param file_path: Path to the file.
+        :type file_path: str
+        :return: Hex digest or empty string if the file doesn't exist.
+        :rtype: str
+        """
+        file_path = os.path.abspath(file_path)
+        if file_path not in self._hashes:
+            self._hashes[file_path] = hash_file(file_path)
+        return self._hashes[file_path]
+
+    def digest(self, file_paths):
+        """Return a single digest of all the specified files.
+
+        :param file_paths: Paths to the files.
+        :type file_paths: list
+        :return: Hex digest.
+        :rtype: str
+        """
+        digest = hashlib.sha256()
+        for file_path in sorted(set(map(os.path.abspath, file_paths))):
+            digest.update(file_path.encode())
+            digest.update(self.get(file_path).encode())
+        return digest.hexdigest()
+
+
+def hash_file(file_path):
+    """Return SHA-256 hex digest of the file content.
+
+    :param file_path: Path to the file.
+    :type file_path: str
+    :return: Hex digest or empty string if the file doesn't exist.
+    :rtype: str
+    """
+    digest = hashlib.sha256()
+    try:
+        with open(file_path, "rb") as input_file:
+            for chunk in iter(lambda: input_file.read(65536), b""):
+                digest.update(chunk)
+    except IOError:
+        return ""
+    return digest.hexdigest()
+
+
+def list_files(dir_path, recursive=False):
+    """Return paths to all files in the directory.
+
+    :param dir_path: Path to the directory.
+    :type dir_path: str
+    :param recursive: Include files from subdirectories, defaults to False
+    :type recursive: bool, optional
+    :return: List of file paths, empty if the directory doesn't exist.
+    :rtype: list
+    """
+    if not dir_path or not os.path.isdir(dir_path):
+        return []
+    if not recursive:
+        return [
+            os.path.join(dir_path, name)
+            for name in sorted(os.listdir(dir_path))
+            if os.path.isfile(os.path.join(dir_path, name))
+        ]
+    file_paths = []
+    for root, _, file_names in os.walk(dir_path):
+        file_paths.extend(os.path.join(root, name) for name in file_names)
+    return sorted(file_paths)
+
+
+def load_manifest(file_path):
+    """Load build manifest from JSON file.
+
+    Manifest contains output file path as a key and digest of its inputs as a value.
+
+    :param file_path: Path to the manifest file.
+    :type file_path: str
+    :return: Build manifest, empty if the file is broken or not found.
+    :rtype: dict
+    """
+    try:
+        with open(file_path, "r") as manifest_file:
+            manifest = json.load(manifest_file)
+    except (IOError, json.decoder.JSONDecodeError):
+        manifest = {}
+    return manifest
+
+
+def save_manifest(manifest, file_path):
+    """Save build manifest to JSON file.
+
+    :param manifest: Dictionary with output path as a key and inputs digest as a value.
+    :type manifest: dict
+    :param file_path: Path to the manifest file.
+    :type file_path: str
+    """
+    with open(file_path, "w") as manifest_file:
+        json.dump(manifest, manifest_file, sort_keys=True, indent=4)
+
+
+def is_up_to_date(output_path, digest, manifest):
+    """Check if the output file was generated from inputs with the same digest.
+
+    :param output_path: Path to the output file.
+    :type output_path: str
+    :param digest: Current digest of the output inputs.
+    :type digest: str
+    :param manifest: Build manifest of the previous build.
+    :type manifest: dict
+    :return: True if the output file doesn't have to be generated again.
+    :rtype: bool
+    """
+    return os.path.isfile(output_path) and manifest.get(output_path) == digest
+
+
+def sync_dir(src_dir, dst_dir, exclude=()):
+    """Make the destination directory a copy of the source directory.
+
+    Only new and changed files are copied,
+    files that don't exist in the source directory are removed.
+
+    :param src_dir: Path to the source directory.
+    :type src_dir: str
+    :param dst_dir: Path to the destination directory.
+    :type dst_dir: str
+    :param exclude: Destination subdirectories left untouched, defaults to ()
+    :type exclude: tuple, optional
+    :return: List of copied files relative paths.
+    :rtype: list
+    """
+    src_files = {
+        os.path.relpath(path, src_dir) for path in list_files(src_dir, recursive=True)
+    }
+    dst_files = {
+        os.path.relpath(path, dst_dir) for path in list_files(dst_dir, recursive=True)
+    }
+    excluded_files = {
+        path
+        for path in dst_files
+        if any(path.startswith(subdir + os.sep) for subdir in exclude)
+    }
+
+    for path in dst_files - src_files - excluded_files:
+        os.remove(os.path.join(dst_dir, path))
+
+    copied_files = []
+    for path in sorted(src_files):
+        src_path, dst_path = os.path.join(src_dir, path), os.path.join(dst_dir, path)
+        if path in dst_files and filecmp.cmp(src_path, dst_path, shallow=False):
+            continue
+        os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+        shutil.copy2(src_path, dst_path)
+        copied_files.append(path)
+    return copied_files
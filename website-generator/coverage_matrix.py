@@ -0,0 +1,177 @@
+"""Cross-framework coverage matrix for the comparison page.
+
+Statuses of tests (or operators) of all frameworks are stored in a single
+NumPy matrix with interned test names as rows, frameworks as columns
+and small integer status codes as values. Rows with the same statuses are
+collapsed into agreement groups, so the comparison page size depends on
+the number of distinct results, not on the number of tests times frameworks.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+
+# Status codes are indices of this list, "missing" - not run by the framework
+STATUSES = ["missing", "passed", "failed", "skipped", "crashed", "timeout"]
+
+# Statuses of tests which didn't pass
+FAILING_STATUSES = ["failed", "crashed", "timeout"]
+
+_codes = {status: code for code, status in enumerate(STATUSES)}
+_failing_codes = [_codes[status] for status in FAILING_STATUSES]
+
+
+def build_matrix(database, key):
+    """Return statuses of all frameworks as a matrix.
+
+    Statuses not listed in STATUSES (e.g. operators summary row) are ignored.
+
+    :param database: Dictionary with results data for frameworks listed in the config.
+    :type database: dict
+    :param key: Database key with dictionary of names and statuses ("report" or "ops").
+    :type key: str
+    :return: Dictionary with sorted names ("ids"), framework ids ("frameworks")
+             and uint8 matrix of status codes ("matrix") of shape (ids, frameworks).
+    :rtype: dict
+    """
+    frameworks = list(database.keys())
+    results = [
+        {name: status for name, status in data.get(key, {}).items() if status in _codes}
+        for data in database.values()
+    ]
+    ids = sorted(set().union(*results))
+    index = {name: row for row, name in enumerate(ids)}
+    matrix = np.zeros((len(ids), len(frameworks)), dtype=np.uint8)
+    for column, statuses in enumerate(results):
+        rows = np.fromiter((index[name] for name in statuses), np.intp, len(statuses))
+        codes = [_codes[status] for status in statuses.values()]
+        matrix[rows, column] = np.array(codes, dtype=np.uint8)
+    return {"ids": ids, "frameworks": frameworks, "matrix": matrix}
+
+
+def get_agreement_groups(coverage):
+    """Return groups of rows with the same statuses in all frameworks.
+
+    :param coverage: Matrix returned by build_matrix.
+    :type coverage: dict
+    :return: List of groups with statuses of frameworks and names,
+             sorted from the largest group.
+    :rtype: list
+    """
+    matrix = coverage["matrix"]
+    if not matrix.size:
+        return []
+    patterns, inverse, counts = np.unique(
+        matrix, axis=0, return_inverse=True, return_counts=True
+    )
+    ids = np.array(coverage["ids"], dtype=object)
+    groups = []
+    for group in np.argsort(-counts, kind="stable"):
+        groups.append(
+            {
+                "statuses": [STATUSES[code] for code in patterns[group]],
+                "count": int(counts[group]),
+                "ids": list(ids[inverse.ravel() == group]),
+            }
+        )
+    return groups
+
+
+def get_only_failing(coverage):
+    """Return rows which fail only in a single framework.
+
+    Row fails only in the framework if it doesn't pass there
+    and passes in all other frameworks which ran it (at least one).
+
+    :param coverage: Matrix returned by build_matrix.
+    :type coverage: dict
+    :return: Dictionary with framework id as a key and list of names as a value.
+    :rtype: OrderedDict
+    """
+    matrix = coverage["matrix"]
+    failing = np.isin(matrix, _failing_codes)
+    passing = matrix == _codes["passed"]
+    passing_or_missing = passing | (matrix == _codes["missing"])
+    ids = np.array(coverage["ids"], dtype=object)
+    only_failing = OrderedDict()
+    for column, framework in enumerate(coverage["frameworks"]):
+        others = np.arange(matrix.shape[1]) != column
+        selected = (
+            failing[:, column]
+            & passing_or_missing[:, others].all(axis=1)
+            & passing[:, others].any(axis=1)
+        )
+        only_failing[framework] = list(ids[selected])
+    return only_failing
+
+
+def get_status_counts(coverage):
+    """Return number of rows with each status per framework.
+
+    :param coverage: Matrix returned by build_matrix.
+    :type coverage: dict
+    :return: Dictionary with framework id as a key and dictionary
+             with status as a key and number of rows as a value.
+    :rtype: OrderedDict
+    """
+    # Shape (frameworks, statuses)
+    counts = (coverage["matrix"][:, :, np.newaxis] == np.arange(len(STATUSES))).sum(0)
+    return OrderedDict(
+        (framework, dict(zip(STATUSES, counts[column].tolist())))
+        for column, framework in enumerate(coverage["frameworks"])
+    )
+
+
+def get_row_aggregates(coverage):
+    """Return number of passing frameworks and failing frameworks of each row.
+
+    :param coverage: Matrix returned by build_matrix.
+    :type coverage: dict
+    :return: List of rows with name, number of frameworks which passed
+             and list of frameworks which didn't pass.
+    :rtype: list
+    """
+    matrix = coverage["matrix"]
+    passed = (matrix == _codes["passed"]).sum(axis=1)
+    failing = np.isin(matrix, _failing_codes)
+    frameworks = np.array(coverage["frameworks"], dtype=object)
+    return [
+        {
+            "name": name,
+            "passed": int(passed[row]),
+            "failing": list(frameworks[failing[row]]),
+        }
+        for row, name in enumerate(coverage["ids"])
+    ]
+
+
+def prepare_comparison(database):
+    """Return collapsed coverage comparison of all frameworks.
+
+    :param database: Dictionary with results data for frameworks listed in the config.
+    :type database: dict
+    :return: Dictionary with framework names, tests status counts,
+             agreement groups and tests failing only in a single framework,
+             and operators aggregates.
+    :rtype: dict
+    """
+    tests = build_matrix(database, "report")
+    ops = build_matrix(database, "ops")
+    return {
+        "frameworks": OrderedDict(
+            (framework, data.get("name", framework))
+            for framework, data in database.items()
+        ),
+        "tests": {
+            "total": len(tests["ids"]),
+            "counts": get_status_counts(tests),
+            "groups": get_agreement_groups(tests),
+            "only_failing": get_only_failing(tests),
+        },
+        "ops": {
+            "total": len(ops["ids"]),
+            "counts": get_status_counts(ops),
+            "rows": get_row_aggregates(ops),
+        },
+    }
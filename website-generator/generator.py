@@ -19,26 +19,78 @@
 Jinja2 docs: https://jinja.palletsprojects.com/en/2.10.x/api/
 """
 
+import build_cache
+import coverage_matrix
 import csv
+import glob
+import hashlib
 import json
+import multiprocessing
 import os
-import shutil
+import production
+import table_data
+import tempfile
+import time
+import trend_history
+import watch
 
 from argparse import ArgumentParser
 from collections import OrderedDict
 from datetime import datetime
+from functools import partial
 from jinja2 import Environment, PackageLoader, select_autoescape
 
 
+# Name of the file with digests of pages inputs saved in the index deploy dir
+MANIFEST_FILE = ".build-manifest.json"
+
+# Path to the Jinja2 templates relative to the generator dir
+TEMPLATES_DIR = os.path.join("templates-module", "templates")
+
+# Number of the latest trend summaries displayed on the pages (see line_chart.js)
+TREND_LENGTH = 15
+
+# Path to the pages resources (CSS, JS) relative to the generator dir
+RESOURCES_DIR = "resources"
+
+# Subdirectory of the deploy resources dir with the database JSON assets
+DATA_DIR = "data"
+
+# Templates environment, pages and databases shared with render worker processes.
+# Set before the workers are forked, so they don't have to be pickled.
+_render_context = {}
+
+
 class ScoreboardError(Exception):
     """Base class for exceptions in this module."""
     pass
 
 
-def load_trend(file_dir, file_name="trend.json"):
-    """Load and return trend list from JSON file.
+def load_trend_log(file_dir, file_name="trend.jsonl", count=TREND_LENGTH):
+    """Load the last summaries from the line-delimited trend log.
+
+    Trend log contains a report summary per line and is appended by the test harness
+    (format is described in test/trend_log.py). Only the end of the file is read,
+    so the time doesn't depend on the trend length. Broken lines are skipped.
+
+    :param file_dir: Path to the dir with trend log file.
+    :type file_dir: str
+    :param file_name: Name of trend log file, defaults to "trend.jsonl"
+    :type file_name: str, optional
+    :param count: Number of the last summaries to load, defaults to TREND_LENGTH
+    :type count: int, optional
+    :return: List of summaries, empty if the file is not found.
+    :rtype: list
+    """
+    return trend_history.trend_log.read_tail(os.path.join(file_dir, file_name), count)
+
+
+def load_trend(file_dir, file_name="trend.json", log_name="trend.jsonl"):
+    """Load and return trend list from the trend log or JSON file.
 
-    Return list of summaries loaded from tests trend JSON file.
+    Return list of the last TREND_LENGTH summaries loaded from the trend log
+    if it exists, otherwise from the tests trend JSON file (the JSON file
+    has to be loaded whole, it's replaced by the log in the next tests run).
     If the file is broken, empty or not found then create and return a new dummy trend.
     Trend is a list of report summaries per date.
     This enables tracking of the number of failed and passed tests.
@@ -73,12 +125,19 @@ def load_trend(file_dir, file_name="trend.json"):
     :type path: str
     :param file_name: Name of trend file.
     :type path: str
+    :param log_name: Name of trend log file, defaults to "trend.jsonl".
+    :type log_name: str, optional
     :return: List of summaries.
     :rtype: list
     """
+    trend = load_trend_log(file_dir, log_name)
+    if trend:
+        return trend
+
+    # Dummy summary has the report date, so it's the same in every build
     dummy_trend = [
         {
-            "date": datetime.now().strftime("%m/%d/%Y %H:%M:%S"),
+            "date": load_report_date(file_dir),
             "failed": 0,
             "passed": 0,
             "skipped": 0,
@@ -87,7 +146,7 @@ def load_trend(file_dir, file_name="trend.json"):
 
     try:
         with open(os.path.join(file_dir, file_name), "r") as trend_file:
-            trend = json.load(trend_file)
+            trend = json.load(trend_file)[-TREND_LENGTH:]
         if not trend:
             raise IndexError
     except (IndexError, IOError, json.decoder.JSONDecodeError):
@@ -95,6 +154,23 @@ def load_trend(file_dir, file_name="trend.json"):
     return trend
 
 
+def load_report_date(file_dir, file_name="report.json"):
+    """Load date of the unit tests report.
+
+    :param file_dir: Path to the dir with report JSON file.
+    :type file_dir: str
+    :param file_name: Name of the report JSON file, defaults to "report.json".
+    :type file_name: str, optional
+    :return: Report date, empty if the report or its date is not found.
+    :rtype: str
+    """
+    try:
+        with open(os.path.join(file_dir, file_name), "r") as report_file:
+            return json.load(report_file).get("date", "")
+    except (IOError, json.decoder.JSONDecodeError, AttributeError):
+        return ""
+
+
 def mark_coverage(percentage):
     """Return a mark from A to F based on the passed tests percentage.
 
@@ -118,6 +194,8 @@ def mark_coverage(percentage):
 def get_coverage_percentage(trend):
     """Create and return a dict with passed and failed tests percentage.
 
+    Failed percentage includes tests which crashed or timed out.
+
     :param trend: Trend is a list of report summaries per date.
     :type trend: list
     :return: Dictionary with passed and failed tests percentage.
@@ -136,19 +214,17 @@ def get_coverage_percentage(trend):
         ]
         latest_result = trend[-1]
 
+    # Tests which crashed or timed out in the isolated mode didn't pass either
+    failed = sum(latest_result.get(key, 0) for key in trend_history.FAILED_KEYS)
     coverage = {}
     try:
         coverage["total"] = (
-            latest_result.get("failed", 0)
-            + latest_result.get("passed", 0)
-            + latest_result.get("skipped", 0)
+            failed + latest_result.get("passed", 0) + latest_result.get("skipped", 0)
         )
         coverage["passed"] = (
             latest_result.get("passed", 0) / coverage.get("total", 0) * 100
         )
-        coverage["failed"] = (
-            latest_result.get("failed", 0) / coverage.get("total", 0) * 100
-        )
+        coverage["failed"] = failed / coverage.get("total", 0) * 100
         coverage["skipped"] = (
             latest_result.get("skipped", 0) / coverage.get("total", 0) * 100
         )
@@ -188,8 +264,9 @@ def load_ops_csv(file_dir, file_name="nodes.csv"):
 def load_report(file_dir, file_name="report.json"):
     """Load unit tests report from the specified JSON file.
 
-    Report is a dictionary that contains test status ("failed"/"passed"/"skipped")
-    as a key and list of test names as a value.
+    Report is a dictionary that contains test status ("failed"/"passed"/"skipped",
+    "crashed"/"timeout" in the isolated mode) as a key and list of test names
+    as a value.
 
     :param file_dir: Path to the dir with report JSON file.
     :type file_dir: str
@@ -218,6 +295,257 @@ def load_report(file_dir, file_name="report.json"):
     return swapped_report
 
 
+def get_previous_ops_durations(trend):
+    """Return operators durations of the latest trend summary with other versions.
+
+    :param trend: Trend is a list of report summaries per date.
+    :type trend: list
+    :return: Dictionary with operator name as a key and duration as a value
+             and list of packages versions of the summary.
+    :rtype: tuple
+    """
+    latest_versions = trend[-1].get("versions") if trend else None
+    for summary in reversed(trend):
+        if summary.get("durations") and summary.get("versions") != latest_versions:
+            return summary["durations"].get("ops", {}), summary.get("versions", [])
+    return {}, []
+
+
+def load_durations(file_dir, trend, file_name="durations.json"):
+    """Load tests and operators durations from the specified JSON file.
+
+    Durations JSON file is saved by the test harness next to the report.
+    Tests and operators are sorted from the slowest one. Operators durations
+    are compared with the latest trend summary with different packages versions.
+
+    :param file_dir: Path to the dir with durations JSON file.
+    :type file_dir: str
+    :param trend: Trend is a list of report summaries per date.
+    :type trend: list
+    :param file_name: Name of the durations JSON file, defaults to "durations.json".
+    :type file_name: str, optional
+    :return: Dictionary with lists of tests and operators durations.
+    :rtype: dict
+    """
+    try:
+        with open(os.path.join(file_dir, file_name), "r") as durations_file:
+            durations = json.load(durations_file)
+    except (IOError, json.decoder.JSONDecodeError):
+        durations = {}
+
+    tests = [
+        dict(test_durations, name=test_name)
+        for test_name, test_durations in durations.get("tests", {}).items()
+    ]
+    previous_ops, previous_versions = get_previous_ops_durations(trend)
+    ops = []
+    for op_name, total in durations.get("ops", {}).items():
+        previous = previous_ops.get(op_name)
+        change = (total - previous) / previous * 100 if previous else None
+        ops.append(
+            {"name": op_name, "total": total, "previous": previous, "change": change}
+        )
+    return {
+        "tests": sorted(tests, key=lambda test: test.get("total", 0), reverse=True),
+        "ops": sorted(ops, key=lambda op: op["total"], reverse=True),
+        "previous_versions": previous_versions,
+    }
+
+
+def load_latency(file_dir, file_name="latency.json", trend_name="latency_trend.jsonl"):
+    """Load operators latency benchmark results and their trend.
+
+    Latency JSON file and trend log are saved by the test harness
+    run with the "--benchmark=latency" option.
+    Operators are sorted by name.
+
+    :param file_dir: Path to the dir with latency JSON file.
+    :type file_dir: str
+    :param file_name: Name of the latency JSON file, defaults to "latency.json".
+    :type file_name: str, optional
+    :param trend_name: Name of the latency trend log, defaults to "latency_trend.jsonl".
+    :type trend_name: str, optional
+    :return: Dictionary with operators latency statistics, date and trend.
+    :rtype: dict
+    """
+    try:
+        with open(os.path.join(file_dir, file_name), "r") as latency_file:
+            latency = json.load(latency_file)
+    except (IOError, json.decoder.JSONDecodeError):
+        latency = {}
+
+    ops = OrderedDict(sorted(latency.get("ops", {}).items()))
+    return {
+        "ops": ops,
+        "date": latency.get("date"),
+        "trend": load_trend_log(file_dir, trend_name),
+    }
+
+
+def load_scaling(file_dir, file_name="scaling.json"):
+    """Load scaling benchmark results of synthetic models.
+
+    Scaling JSON file is saved by the test harness run with
+    the "--benchmark=scaling" option. Curves contain results of models
+    which differ from the base model only in a single dimension.
+
+    :param file_dir: Path to the dir with scaling JSON file.
+    :type file_dir: str
+    :param file_name: Name of the scaling JSON file, defaults to "scaling.json".
+    :type file_name: str, optional
+    :return: Dictionary with scaling curves per operators mix and dimension and date.
+    :rtype: dict
+    """
+    try:
+        with open(os.path.join(file_dir, file_name), "r") as scaling_file:
+            scaling = json.load(scaling_file)
+    except (IOError, json.decoder.JSONDecodeError):
+        scaling = {}
+
+    curves = OrderedDict(sorted(scaling.get("curves", {}).items()))
+    return {"curves": curves, "date": scaling.get("date")}
+
+
+def load_threads(file_dir, file_name="threads.json"):
+    """Load intra-op thread scaling benchmark results.
+
+    Threads JSON file is saved by the test harness run with
+    the "--benchmark=threads" option. Curves contain latency, speedup
+    and parallel efficiency of each model with each thread setting.
+
+    :param file_dir: Path to the dir with threads JSON file.
+    :type file_dir: str
+    :param file_name: Name of the threads JSON file, defaults to "threads.json".
+    :type file_name: str, optional
+    :return: Dictionary with curves per model, median curve, thread settings and date.
+    :rtype: dict
+    """
+    try:
+        with open(os.path.join(file_dir, file_name), "r") as threads_file:
+            threads = json.load(threads_file)
+    except (IOError, json.decoder.JSONDecodeError):
+        threads = {}
+
+    tests = OrderedDict(
+        (test_name.split("::")[-1], test_result.get("curve", []))
+        for test_name, test_result in sorted(threads.get("tests", {}).items())
+    )
+    return {
+        "tests": tests,
+        "curve": threads.get("curve", []),
+        "threads": threads.get("threads", []),
+        "date": threads.get("date"),
+    }
+
+
+def load_concurrency(file_dir, file_name="concurrency.json"):
+    """Load concurrent inference benchmark results.
+
+    Concurrency JSON file is saved by the test harness run with
+    the "--benchmark=concurrency" option. Failures list tests of each mode
+    with wrong outputs, errors or crashed processes.
+
+    :param file_dir: Path to the dir with concurrency JSON file.
+    :type file_dir: str
+    :param file_name: Name of the concurrency JSON file,
+                      defaults to "concurrency.json".
+    :type file_name: str, optional
+    :return: Dictionary with summaries of modes, failures, concurrency and date.
+    :rtype: dict
+    """
+    try:
+        with open(os.path.join(file_dir, file_name), "r") as concurrency_file:
+            concurrency = json.load(concurrency_file)
+    except (IOError, json.decoder.JSONDecodeError):
+        concurrency = {}
+
+    tests = concurrency.get("tests", {})
+    modes = OrderedDict(sorted(concurrency.get("modes", {}).items()))
+    failures = []
+    for mode, mode_summary in modes.items():
+        for test_name in mode_summary.get("failed", []):
+            stats = tests.get(test_name, {}).get(mode, {})
+            failures.append(
+                {
+                    "test": test_name.split("::")[-1],
+                    "mode": mode,
+                    "wrong_outputs": stats.get("wrong_outputs", 0),
+                    "errors": stats.get("errors", 0),
+                    "crashed": stats.get("crashed", False),
+                }
+            )
+    return {
+        "modes": modes,
+        "failures": failures,
+        "concurrency": concurrency.get("concurrency"),
+        "date": concurrency.get("date"),
+    }
+
+
+def load_profile(file_dir, file_name="profile.json"):
+    """Load backend import time and compile and run times of tests.
+
+    Profile JSON file is saved by the test harness next to the report.
+    Tests are sorted from the slowest compilation.
+
+    :param file_dir: Path to the dir with profile JSON file.
+    :type file_dir: str
+    :param file_name: Name of the profile JSON file, defaults to "profile.json".
+    :type file_name: str, optional
+    :return: Dictionary with backend import time, list of tests profiles and totals.
+    :rtype: dict
+    """
+    try:
+        with open(os.path.join(file_dir, file_name), "r") as profile_file:
+            profile = json.load(profile_file)
+    except (IOError, json.decoder.JSONDecodeError):
+        profile = {}
+
+    tests = [
+        dict(test_profile, name=test_name)
+        for test_name, test_profile in profile.get("tests", {}).items()
+    ]
+    return {
+        "import": profile.get("import", {}),
+        "tests": sorted(tests, key=lambda test: test.get("compile", 0), reverse=True),
+        "totals": profile.get("totals", {}),
+    }
+
+
+def load_memory(file_dir, file_name="memory.json"):
+    """Load peak memory of tests and operators.
+
+    Memory JSON file is saved by the test harness run with the "--memory" option.
+
+    :param file_dir: Path to the dir with memory JSON file.
+    :type file_dir: str
+    :param file_name: Name of the memory JSON file, defaults to "memory.json".
+    :type file_name: str, optional
+    :return: Dictionary with tests and operators peak memory in bytes.
+    :rtype: dict
+    """
+    try:
+        with open(os.path.join(file_dir, file_name), "r") as memory_file:
+            memory = json.load(memory_file)
+    except (IOError, json.decoder.JSONDecodeError):
+        memory = {}
+    return {"tests": memory.get("tests", {}), "ops": memory.get("ops", {})}
+
+
+def get_latency_ops(database):
+    """Return names of operators benchmarked by any of the frameworks.
+
+    :param database: Dictionary with results data for frameworks listed in the config.
+    :type database: dict
+    :return: Sorted list of operators names.
+    :rtype: list
+    """
+    ops = set()
+    for framework_data in database.values():
+        ops.update(framework_data.get("latency", {}).get("ops", {}).keys())
+    return sorted(ops)
+
+
 def load_config(file_path="./setup/config.json"):
     """Load scoreboard configuration file.
 
@@ -253,30 +581,80 @@ def prepare_database(config, state="stable"):
     :return: Dictionary with results data for the listed in the config frameworks.
     :rtype: OrderedDict
     """
+    trend_points = config.get("trend_points", trend_history.TREND_POINTS)
     config = config.get(state, {})
     database = OrderedDict()
 
     for framework_id, framework_config in config.items():
-        results_dir = framework_config.get("results_dir")
-        name = framework_config.get("name", framework_id)
-        trend = load_trend(results_dir)
-        coverage = get_coverage_percentage(trend)
-        ops = load_ops_csv(results_dir)
-        report = load_report(results_dir)
-
-        database[framework_id] = {
-            "name": name,
-            "trend": trend,
-            "coverage": coverage,
-            "ops": ops,
-            "report": report,
-        }
+        database[framework_id] = prepare_framework_data(
+            framework_id, framework_config, trend_points
+        )
 
     database = sort_by_score(database)
     return database
 
 
-def generate_page(template, output_dir, name, **template_args):
+def prepare_framework_data(
+    framework_id, framework_config, trend_points=trend_history.TREND_POINTS
+):
+    """Load all results data of the framework.
+
+    Coverage and durations use the latest trend summaries, the trend passed
+    to the pages is the compacted and downsampled history (see trend_history.py),
+    both are loaded in one pass of the trend.
+    Each history summary has the passed tests percentage drawn by the trend chart,
+    computed as the coverage (crashed and timed out tests didn't pass).
+
+    :param framework_id: Framework id (key in the scoreboard config).
+    :type framework_id: str
+    :param framework_config: Framework config with the results dir and name.
+    :type framework_config: dict
+    :param trend_points: Maximal number of trend summaries passed to the pages,
+                         defaults to trend_history.TREND_POINTS
+    :type trend_points: int, optional
+    :return: Dictionary with results data of the framework.
+    :rtype: dict
+    """
+    results_dir = framework_config.get("results_dir")
+    name = framework_config.get("name", framework_id)
+    trend, history = trend_history.load_trend_and_history(
+        results_dir, TREND_LENGTH, trend_points
+    )
+    # Dummy trend is loaded, if the framework has no trend yet
+    trend = trend or load_trend(results_dir)
+    history = history or trend
+    coverage = get_coverage_percentage(trend)
+    ops = load_ops_csv(results_dir)
+    report = load_report(results_dir)
+    durations = load_durations(results_dir, trend)
+    latency = load_latency(results_dir)
+    scaling = load_scaling(results_dir)
+    threads = load_threads(results_dir)
+    concurrency = load_concurrency(results_dir)
+    profile = load_profile(results_dir)
+    memory = load_memory(results_dir)
+    history = [
+        dict(summary, percentage=round(get_coverage_percentage([summary])["passed"], 2))
+        for summary in history
+    ]
+
+    return {
+        "name": name,
+        "trend": history,
+        "coverage": coverage,
+        "ops": ops,
+        "report": report,
+        "durations": durations,
+        "latency": latency,
+        "scaling": scaling,
+        "threads": threads,
+        "concurrency": concurrency,
+        "profile": profile,
+        "memory": memory,
+    }
+
+
+def generate_page(template, output_dir, name, optimize=False, **template_args):
     """Generate HTML page based on the passed template.
 
     :param template: Jinja2 HTML template.
@@ -285,34 +663,721 @@ def generate_page(template, output_dir, name, **template_args):
     :type output_dir: str
     :param name: Name of the output file.
     :type name: str
+    :param optimize: Save minified and precompressed page, defaults to False
+    :type optimize: bool, optional
     :param **template_args: Variables that should be visible in the template.
     """
     page = template.render(template_args)
+    page_path = os.path.join(output_dir, name)
+    if optimize:
+        production.write_page(page, page_path)
+        return
 
     # Save HTML page to file
-    with open(os.path.join(output_dir, name), "w") as f:
+    with open(page_path, "w") as f:
         f.write(page)
+    production.remove_compressed(page_path)
 
 
-def generate_pages(template, database, suffix):
-    """Generate HTML page for each framework in the specified database.
+def get_pages(config):
+    """Return list of pages to generate.
+
+    Page is described by the template name, output path and database state.
+    Details pages contain data of a single framework.
+    Page example:
+    {
+        "template": "details.html",
+        "output_dir": "./docs",
+        "name": "ngraph_details_stable.html",
+        "state": "stable",
+        "framework": "ngraph",
+        "args": {}
+    }
+
+    :param config: Dictionary with the scoreboard config (documented in README.md).
+    :type config: dict
+    :return: List of pages.
+    :rtype: list
+    """
+    deploy_paths = config.get("deploy_paths", {})
+    index_dir = deploy_paths.get("index", "./")
+    subpages_dir = deploy_paths.get("subpages", "./")
+    pages = [
+        {
+            "template": "index.html",
+            "output_dir": index_dir,
+            "name": "index.html",
+            "state": "stable",
+            "args": {},
+        },
+        {
+            "template": "index.html",
+            "output_dir": subpages_dir,
+            "name": "index_dev.html",
+            "state": "development",
+            "args": {"development_versions_selected": True},
+        },
+        {
+            "template": "frameworks_comparison.html",
+            "output_dir": subpages_dir,
+            "name": "frameworks_comparison_stable.html",
+            "state": "stable",
+            "args": {},
+        },
+        {
+            "template": "latency_comparison.html",
+            "output_dir": subpages_dir,
+            "name": "latency_comparison_stable.html",
+            "state": "stable",
+            "args": {},
+        },
+    ]
+
+    # Details page for each framework
+    details_suffixes = {
+        "stable": "details_stable.html",
+        "development": "details_dev.html",
+    }
+    for state, suffix in details_suffixes.items():
+        for framework in config.get(state, {}).keys():
+            pages.append(
+                {
+                    "template": "details.html",
+                    "output_dir": subpages_dir,
+                    "name": "{name}_{suffix}".format(name=framework, suffix=suffix),
+                    "state": state,
+                    "framework": framework,
+                    "args": {},
+                }
+            )
+    return pages
+
+
+def get_page_inputs(page, config, config_path):
+    """Return paths to all files used to generate the page.
+
+    :param page: Page description returned by get_pages.
+    :type page: dict
+    :param config: Dictionary with the scoreboard config (documented in README.md).
+    :type config: dict
+    :param config_path: Path to the scoreboard config file.
+    :type config_path: str
+    :return: List of file paths.
+    :rtype: list
+    """
+    generator_dir = os.path.dirname(os.path.abspath(__file__))
+    input_paths = [config_path]
+    input_paths.extend(glob.glob(os.path.join(generator_dir, "*.py")))
+    input_paths.extend(
+        build_cache.list_files(os.path.join(generator_dir, TEMPLATES_DIR), True)
+    )
+    input_paths.extend(
+        build_cache.list_files(os.path.join(generator_dir, RESOURCES_DIR), True)
+    )
+
+    frameworks = config.get(page.get("state"), {})
+    if page.get("framework"):
+        frameworks = {page["framework"]: frameworks.get(page["framework"], {})}
+    for framework_config in frameworks.values():
+        input_paths.extend(build_cache.list_files(framework_config.get("results_dir")))
+    return input_paths
+
+
+def render_page(env, page, databases, optimize=False):
+    """Generate HTML page described by the page dictionary.
+
+    :param env: Jinja2 templates environment.
+    :type env: jinja2.Environment
+    :param page: Page description returned by get_pages.
+    :type page: dict
+    :param databases: Dictionary with state as a key and database as a value.
+    :type databases: dict
+    :param optimize: Save minified and precompressed page, defaults to False
+    :type optimize: bool, optional
+    """
+    database = databases.get(page["state"])
+    if page.get("framework"):
+        framework = page["framework"]
+        template_args = {
+            "framework_data": OrderedDict({framework: database.get(framework)})
+        }
+    else:
+        template_args = {"database": database}
+    template_args.update(page.get("args", {}))
+
+    template = env.get_template(page["template"])
+    generate_page(
+        template, page["output_dir"], page["name"], optimize=optimize, **template_args
+    )
+
+
+def _write_asset(assets_dir, name, data):
+    """Save data as a content-addressed JSON asset.
+
+    Keys are sorted, so the same data always gives the same asset name.
+
+    :param assets_dir: Path to the assets dir.
+    :type assets_dir: str
+    :param name: Asset name prefix, e.g. framework id.
+    :type name: str
+    :param data: JSON serializable data.
+    :type data: object
+    :return: Path to the asset, e.g. "<assets_dir>/<name>.0123456789abcdef.json".
+    :rtype: str
+    """
+    content = json.dumps(data, sort_keys=True, separators=(",", ":")).encode()
+    asset_name = "{name}.{digest}.json".format(
+        name=name, digest=hashlib.sha256(content).hexdigest()[:16]
+    )
+    asset_path = os.path.join(assets_dir, asset_name)
+    if not os.path.isfile(asset_path):
+        with open(asset_path, "wb") as asset_file:
+            asset_file.write(content)
+    return asset_path
+
+
+def _write_table_assets(assets_dir, framework, framework_data, table):
+    """Save chunked data of the virtualized table of the framework.
+
+    Chunks are saved first, so the table index can refer to them
+    by their asset names (see table_data.py).
+
+    :param assets_dir: Path to the assets dir.
+    :type assets_dir: str
+    :param framework: Framework id.
+    :type framework: str
+    :param framework_data: Results data of the framework.
+    :type framework_data: dict
+    :param table: Table name (key of table_data.TABLES).
+    :type table: str
+    :return: Path to the table index asset and paths to all table assets.
+    :rtype: tuple
+    """
+    index, chunks = table_data.prepare_table(framework_data, table)
+    prefix = "{0}.{1}".format(framework, table)
+    paths = [
+        _write_asset(assets_dir, "{0}.{1}".format(prefix, idx), chunk)
+        for idx, chunk in enumerate(chunks)
+    ]
+    index["chunks"] = [os.path.basename(path) for path in paths]
+    index_path = _write_asset(assets_dir, prefix, index)
+    return index_path, paths + [index_path]
+
+
+def write_data_assets(database, state, resources_dir, optimize=False):
+    """Save database as content-addressed JSON assets.
+
+    Data of each framework is saved once in a separate file named with its
+    content hash, e.g. "data/stable/ngraph.0123456789abcdef.json",
+    so it can be loaded by all pages and cached by the browser until it changes.
+    Tables of tests and operators are saved as chunked assets,
+    e.g. "data/stable/ngraph.tests.0123456789abcdef.json" (table index),
+    their rows aren't duplicated in the framework data asset.
+    Outdated assets of the state are removed.
 
-    :param template: Jinja2 HTML template, generated from jinja2.Environment.
-    :type template: jinja2.Template
     :param database: Dictionary with results data for frameworks listed in the config.
     :type database: dict
-    :param suffix: File name suffix for the output, e.g. "details_stable.html".
-    :type suffix: str
-    """
-    for framework, _ in database.items():
-        framework_data = OrderedDict({framework: database.get(framework)})
-        output_name = "{name}_{suffix}".format(name=framework, suffix=suffix)
-        generate_page(
-            template,
-            deploy_paths.get("subpages", "./"),
-            output_name,
-            framework_data=framework_data,
+    :param state: Database state ("stable" or "development").
+    :type state: str
+    :param resources_dir: Path to the deploy resources dir.
+    :type resources_dir: str
+    :param optimize: Write precompressed variants of assets, defaults to False
+    :type optimize: bool, optional
+    :return: Dictionary with framework id as a key and dictionary with
+             asset kind ("data" or table name) as a key and asset path as a value.
+    :rtype: OrderedDict
+    """
+    assets_dir = os.path.join(resources_dir, DATA_DIR, state)
+    os.makedirs(assets_dir, exist_ok=True)
+    assets = OrderedDict()
+    current_assets = set()
+    for framework, framework_data in database.items():
+        page_data = {
+            key: value
+            for key, value in framework_data.items()
+            if key not in table_data.TABLES.values()
+        }
+        data_path = _write_asset(assets_dir, framework, page_data)
+        assets[framework] = {"data": data_path}
+        current_assets.add(os.path.basename(data_path))
+        for table in table_data.TABLES:
+            index_path, table_paths = _write_table_assets(
+                assets_dir, framework, framework_data, table
+            )
+            assets[framework][table] = index_path
+            current_assets.update(map(os.path.basename, table_paths))
+
+    for asset_name in os.listdir(assets_dir):
+        if production.get_source_name(asset_name) not in current_assets:
+            os.remove(os.path.join(assets_dir, asset_name))
+    for asset_name in current_assets:
+        production.sync_compressed(os.path.join(assets_dir, asset_name), optimize)
+    return assets
+
+
+def get_page_assets(page, assets, kind="data"):
+    """Return URLs of the database assets used by the page.
+
+    :param page: Page description returned by get_pages.
+    :type page: dict
+    :param assets: Dictionary returned by write_data_assets.
+    :type assets: dict
+    :param kind: Asset kind ("data" or table name), defaults to "data"
+    :type kind: str, optional
+    :return: Dictionary with framework id as a key and asset URL as a value.
+    :rtype: OrderedDict
+    """
+    page_assets = OrderedDict()
+    for framework, framework_assets in assets.items():
+        if page.get("framework", framework) == framework:
+            asset_url = os.path.relpath(framework_assets[kind], page["output_dir"])
+            page_assets[framework] = asset_url.replace(os.sep, "/")
+    return page_assets
+
+
+def _render_page_job(page_index):
+    """Generate page with the specified index in the shared render context.
+
+    :param page_index: Index of the page in the render context pages list.
+    :type page_index: int
+    :return: Name of the generated page.
+    :rtype: str
+    """
+    page = _render_context["pages"][page_index]
+    render_page(
+        _render_context["env"],
+        page,
+        _render_context["databases"],
+        _render_context["optimize"],
+    )
+    return page["name"]
+
+
+def render_pages(env, pages, databases, workers=1, optimize=False):
+    """Generate HTML pages using a pool of worker processes.
+
+    Templates are compiled before the workers are forked, so each worker
+    shares the templates environment and databases of the parent process.
+    Pages are rendered exactly the same way as in the serial mode.
+
+    :param env: Jinja2 templates environment.
+    :type env: jinja2.Environment
+    :param pages: List of pages returned by get_pages.
+    :type pages: list
+    :param databases: Dictionary with state as a key and database as a value.
+    :type databases: dict
+    :param workers: Number of worker processes, defaults to 1 (serial rendering)
+    :type workers: int, optional
+    :param optimize: Save minified and precompressed pages, defaults to False
+    :type optimize: bool, optional
+    """
+    workers = min(workers, len(pages))
+    if workers <= 1:
+        for page in pages:
+            render_page(env, page, databases, optimize)
+        return
+
+    for template_name in {page["template"] for page in pages}:
+        env.get_template(template_name)
+    _render_context.update(
+        env=env, pages=pages, databases=databases, optimize=optimize
+    )
+    try:
+        with multiprocessing.get_context("fork").Pool(workers) as pool:
+            pool.map(_render_page_job, range(len(pages)))
+    finally:
+        _render_context.clear()
+
+
+def create_environment(resources=None):
+    """Create Jinja2 templates environment with the scoreboard filters.
+
+    :param resources: Fingerprinted resources returned by production.build_resources,
+                      defaults to None (resources are used as they are)
+    :type resources: dict, optional
+    :return: Templates environment.
+    :rtype: jinja2.Environment
+    """
+    env = Environment(
+        loader=PackageLoader("templates-module", "templates"),
+        autoescape=select_autoescape(["html"]),
+    )
+    env.filters["latency_ops"] = get_latency_ops
+    env.filters["coverage_comparison"] = coverage_matrix.prepare_comparison
+    env.filters["resource"] = partial(production.get_resource_url, resources or {})
+    return env
+
+
+def get_stale_pages(pages, config, config_path, manifest, optimize=False):
+    """Return pages which inputs changed since the previous build.
+
+    :param pages: List of pages returned by get_pages.
+    :type pages: list
+    :param config: Dictionary with the scoreboard config (documented in README.md).
+    :type config: dict
+    :param config_path: Path to the scoreboard config file.
+    :type config_path: str
+    :param manifest: Build manifest of the previous build, updated with current digests.
+    :type manifest: dict
+    :param optimize: Pages are built in the production mode, defaults to False
+    :type optimize: bool, optional
+    :return: List of pages to generate.
+    :rtype: list
+    """
+    file_hashes = build_cache.FileHashes()
+    stale_pages = []
+    for page in pages:
+        output_path = os.path.join(page["output_dir"], page["name"])
+        digest = file_hashes.digest(get_page_inputs(page, config, config_path))
+        if optimize:
+            digest += ":production"
+        if not build_cache.is_up_to_date(output_path, digest, manifest):
+            stale_pages.append(page)
+        manifest[output_path] = digest
+    return stale_pages
+
+
+def generate_website(
+    config, config_path, incremental=False, workers=1, optimize=False
+):
+    """Generate all pages and copy resources to the deploy directory.
+
+    In the incremental mode only pages which inputs changed since the previous build
+    are generated and only databases used by these pages are prepared.
+    In the production mode pages and resources are minified and precompressed
+    and resources are fingerprinted (see production.py).
+
+    :param config: Dictionary with the scoreboard config (documented in README.md).
+    :type config: dict
+    :param config_path: Path to the scoreboard config file.
+    :type config_path: str
+    :param incremental: Generate only pages with changed inputs, defaults to False
+    :type incremental: bool, optional
+    :param workers: Number of processes rendering pages, defaults to 1
+    :type workers: int, optional
+    :param optimize: Build pages in the production mode, defaults to False
+    :type optimize: bool, optional
+    """
+    deploy_paths = config.get("deploy_paths", {})
+    manifest_path = os.path.join(deploy_paths.get("index", "./"), MANIFEST_FILE)
+    previous_manifest = build_cache.load_manifest(manifest_path) if incremental else {}
+    manifest = dict(previous_manifest)
+
+    all_pages = get_pages(config)
+    pages = get_stale_pages(all_pages, config, config_path, manifest, optimize)
+
+    # Copy new and changed resources to deploy dir
+    deploy_resources_path = os.path.abspath(
+        deploy_paths.get("resources", "./docs/resources")
+    )
+    resources = sync_resources(deploy_resources_path, optimize)
+
+    # Prepare data for templates and save it as assets loaded by the pages
+    states = {page["state"] for page in pages}
+    databases = {state: prepare_database(config, state=state) for state in states}
+    write_pages_assets(all_pages, databases, deploy_resources_path, optimize)
+    pages = get_outdated_pages(all_pages, pages, states)
+
+    env = create_environment(resources)
+    render_pages(env, pages, databases, workers, optimize)
+    build_cache.save_manifest(manifest, manifest_path)
+
+
+def sync_resources(deploy_resources_path, optimize=False):
+    """Copy new and changed resources to the deploy dir.
+
+    :param deploy_resources_path: Path to the deploy resources dir.
+    :type deploy_resources_path: str
+    :param optimize: Build resources in the production mode, defaults to False
+    :type optimize: bool, optional
+    :return: Fingerprinted resources returned by production.build_resources,
+             empty in the default mode.
+    :rtype: dict
+    """
+    resources_path = os.path.abspath("./website-generator/resources")
+    resources = {}
+    if optimize:
+        with tempfile.TemporaryDirectory() as build_dir:
+            resources = production.build_resources(resources_path, build_dir)
+            build_cache.sync_dir(build_dir, deploy_resources_path, exclude=[DATA_DIR])
+    else:
+        build_cache.sync_dir(resources_path, deploy_resources_path, exclude=[DATA_DIR])
+    return resources
+
+
+def write_pages_assets(pages, databases, deploy_resources_path, optimize=False):
+    """Save databases as assets and pass their URLs to the pages.
+
+    :param pages: List of pages returned by get_pages.
+    :type pages: list
+    :param databases: Dictionary with state as a key and database as a value.
+    :type databases: dict
+    :param deploy_resources_path: Path to the deploy resources dir.
+    :type deploy_resources_path: str
+    :param optimize: Write precompressed variants of assets, defaults to False
+    :type optimize: bool, optional
+    """
+    for state, database in databases.items():
+        assets = write_data_assets(database, state, deploy_resources_path, optimize)
+        for page in pages:
+            if page["state"] == state:
+                page["args"]["assets"] = get_page_assets(page, assets)
+                page["args"]["tables"] = {
+                    table: get_page_assets(page, assets, table)
+                    for table in table_data.TABLES
+                }
+
+
+def refers_to_assets(page):
+    """Check if the generated page refers to the current assets of its database.
+
+    Assets of the whole state are written again when any of its pages
+    is generated and outdated assets are removed, so pages which were up to date
+    have to be generated again if their assets changed.
+
+    :param page: Page description with assets passed by write_pages_assets.
+    :type page: dict
+    :return: True if the page file contains URLs of all its current assets.
+    :rtype: bool
+    """
+    asset_urls = list(page["args"].get("assets", {}).values())
+    for table_assets in page["args"].get("tables", {}).values():
+        asset_urls.extend(table_assets.values())
+    try:
+        with open(os.path.join(page["output_dir"], page["name"]), "r") as page_file:
+            content = page_file.read()
+    except IOError:
+        return False
+    return all(asset_url in content for asset_url in asset_urls)
+
+
+def get_outdated_pages(pages, stale_pages, states):
+    """Return stale pages and pages which refer to assets of previous builds.
+
+    :param pages: List of all pages returned by get_pages.
+    :type pages: list
+    :param stale_pages: List of pages with changed inputs.
+    :type stale_pages: list
+    :param states: States with assets written by the build.
+    :type states: set
+    :return: List of pages to generate.
+    :rtype: list
+    """
+    outdated_pages = list(stale_pages)
+    for page in pages:
+        if page["state"] not in states or page in outdated_pages:
+            continue
+        if not refers_to_assets(page):
+            outdated_pages.append(page)
+    return outdated_pages
+
+
+def _contains_files(dir_path, file_paths):
+    """Check if any of the files is in the directory or its subdirectories.
+
+    :param dir_path: Path to the directory.
+    :type dir_path: str
+    :param file_paths: Absolute paths to the files.
+    :type file_paths: set
+    :return: True if the directory contains any of the files.
+    :rtype: bool
+    """
+    dir_path = os.path.abspath(dir_path) + os.sep
+    return any(file_path.startswith(dir_path) for file_path in file_paths)
+
+
+class WatchedWebsite:
+    """Website kept up to date with the results in the watch mode.
+
+    The config, databases of both states and the templates environment
+    (with compiled templates) are kept in memory between the updates.
+    """
+
+    def __init__(self, config_path, workers=1, optimize=False):
+        """Generate all pages.
+
+        :param config_path: Path to the scoreboard config file.
+        :type config_path: str
+        :param workers: Number of processes rendering pages, defaults to 1
+        :type workers: int, optional
+        :param optimize: Build pages in the production mode, defaults to False
+        :type optimize: bool, optional
+        """
+        self.config_path = os.path.abspath(config_path)
+        self.workers = workers
+        self.optimize = optimize
+        generator_dir = os.path.dirname(os.path.abspath(__file__))
+        self.templates_dir = os.path.join(generator_dir, TEMPLATES_DIR)
+        self.resources_dir = os.path.join(generator_dir, RESOURCES_DIR)
+        self.env = create_environment()
+        self.build()
+
+    def build(self):
+        """Load the config and all databases and generate all pages.
+
+        :return: List of generated pages.
+        :rtype: list
+        """
+        self.config = load_config(self.config_path)
+        deploy_paths = self.config.get("deploy_paths", {})
+        self.deploy_resources_path = os.path.abspath(
+            deploy_paths.get("resources", "./docs/resources")
+        )
+        self.pages = get_pages(self.config)
+        self.databases = {
+            state: prepare_database(self.config, state=state)
+            for state in {page["state"] for page in self.pages}
+        }
+        self._update_resources()
+        return self._render(self.pages, self.databases)
+
+    def list_inputs(self):
+        """Return paths to the config, templates, resources and results files.
+
+        :return: List of watched file paths.
+        :rtype: list
+        """
+        input_paths = [self.config_path]
+        input_paths.extend(build_cache.list_files(self.templates_dir, True))
+        input_paths.extend(build_cache.list_files(self.resources_dir, True))
+        for state in self.databases:
+            for framework_config in self.config.get(state, {}).values():
+                results_dir = framework_config.get("results_dir")
+                input_paths.extend(build_cache.list_files(results_dir))
+        return input_paths
+
+    def update(self, changed_files):
+        """Generate pages affected by the changed files.
+
+        Changed results reload data of their framework only and generate
+        pages showing the framework. Changed templates generate all pages
+        (compiled templates are reloaded by Jinja2 when their source changes),
+        changed config builds the whole website again.
+
+        :param changed_files: Absolute paths to the changed files.
+        :type changed_files: set
+        :return: List of generated pages.
+        :rtype: list
+        """
+        if self.config_path in changed_files:
+            return self.build()
+        pages = []
+        if _contains_files(self.resources_dir, changed_files):
+            self._update_resources()
+            # Pages refer to the fingerprinted resources in the production mode
+            pages = self.pages if self.optimize else []
+        if _contains_files(self.templates_dir, changed_files):
+            pages = self.pages
+        changed_frameworks = self._reload_frameworks(changed_files)
+        changed_states = {state for state, _ in changed_frameworks}
+        pages = pages or [
+            page
+            for page in self.pages
+            if (page["state"], page.get("framework")) in changed_frameworks
+            or (page["state"] in changed_states and not page.get("framework"))
+        ]
+        databases = {state: self.databases[state] for state in changed_states}
+        return self._render(pages, databases)
+
+    def _reload_frameworks(self, changed_files):
+        """Load data of frameworks with changed results files again.
+
+        :param changed_files: Absolute paths to the changed files.
+        :type changed_files: set
+        :return: Set of (state, framework id) tuples of the reloaded frameworks.
+        :rtype: set
+        """
+        changed_dirs = {os.path.dirname(file_path) for file_path in changed_files}
+        trend_points = self.config.get("trend_points", trend_history.TREND_POINTS)
+        changed_frameworks = set()
+        for state, database in self.databases.items():
+            for framework_id, framework_config in self.config.get(state, {}).items():
+                results_dir = framework_config.get("results_dir")
+                if results_dir and os.path.abspath(results_dir) in changed_dirs:
+                    database[framework_id] = prepare_framework_data(
+                        framework_id, framework_config, trend_points
+                    )
+                    changed_frameworks.add((state, framework_id))
+            self.databases[state] = sort_by_score(database)
+        return changed_frameworks
+
+    def _update_resources(self):
+        """Copy resources to the deploy dir and pass them to the templates."""
+        resources = sync_resources(self.deploy_resources_path, self.optimize)
+        self.env.filters["resource"] = partial(production.get_resource_url, resources)
+        # Resource URLs are constant folded into the compiled templates
+        self.env.cache.clear()
+
+    def _render(self, pages, databases):
+        """Save the databases as assets and generate the pages.
+
+        :param pages: List of pages to generate.
+        :type pages: list
+        :param databases: Dictionary with state as a key and changed database
+                          as a value.
+        :type databases: dict
+        :return: List of generated pages.
+        :rtype: list
+        """
+        write_pages_assets(
+            self.pages, databases, self.deploy_resources_path, self.optimize
         )
+        pages = get_outdated_pages(self.pages, pages, set(databases))
+        render_pages(self.env, pages, self.databases, self.workers, self.optimize)
+        return pages
+
+
+def watch_website(config_path, workers=1, optimize=False, port=None):
+    """Generate all pages and update them when results or templates change.
+
+    Runs until interrupted (Ctrl+C).
+
+    :param config_path: Path to the scoreboard config file.
+    :type config_path: str
+    :param workers: Number of processes rendering pages, defaults to 1
+    :type workers: int, optional
+    :param optimize: Build pages in the production mode, defaults to False
+    :type optimize: bool, optional
+    :param port: Serve the index deploy dir on the port, defaults to None (no server)
+    :type port: int, optional
+    """
+    website = WatchedWebsite(config_path, workers, optimize)
+    watcher = watch.FileWatcher(website.list_inputs)
+    server = None
+    if port is not None:
+        index_dir = website.config.get("deploy_paths", {}).get("index", "./")
+        server = watch.serve(index_dir, port)
+        print("Serving {0} at http://localhost:{1}/".format(index_dir, port))
+    print("Watching {0} pages inputs, press Ctrl+C to stop".format(len(website.pages)))
+    try:
+        while True:
+            _update_watched_website(website, watcher.wait())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server:
+            server.shutdown()
+
+
+def _update_watched_website(website, changed_files):
+    """Generate pages affected by the changed files and print the update summary.
+
+    :param website: Website generated in the watch mode.
+    :type website: WatchedWebsite
+    :param changed_files: Absolute paths to the changed files.
+    :type changed_files: set
+    """
+    start = time.monotonic()
+    try:
+        pages = website.update(changed_files)
+    except ScoreboardError as err:
+        print("Pages not updated: {0}".format(err))
+        return
+    print(
+        "{0} changed files, {1} pages generated in {2:.2f} s".format(
+            len(changed_files), len(pages), time.monotonic() - start
+        )
+    )
 
 
 def sort_by_score(database):
@@ -342,62 +1407,51 @@ if __name__ == "__main__":
         default="./setup/config.json",
         type=str,
     )
-    args = parser.parse_args()
-
-    # Load configuration from file
-    config = load_config(args.config)
-    deploy_paths = config.get("deploy_paths")
-
-    # Prepare data for templates
-    database_stable = prepare_database(config, state="stable")
-    database_dev = prepare_database(config, state="development")
-
-    # Website
-    # Create Jinja2 templates environment
-    env = Environment(
-        loader=PackageLoader("templates-module", "templates"),
-        autoescape=select_autoescape(["html"]),
+    parser.add_argument(
+        "--incremental",
+        dest="incremental",
+        help="Generate only pages which results, templates or config changed",
+        action="store_true",
     )
-
-    # Create index.html file
-    template = env.get_template("index.html")
-    generate_page(
-        template,
-        deploy_paths.get("index", "./"),
-        "index.html",
-        database=database_stable,
+    parser.add_argument(
+        "--production",
+        dest="production",
+        help="Minify, fingerprint and precompress pages and resources",
+        action="store_true",
     )
-
-    # Create dev subpage
-    template = env.get_template("index.html")
-    generate_page(
-        template,
-        deploy_paths.get("subpages", "./"),
-        "index_dev.html",
-        database=database_dev,
-        development_versions_selected=True,
+    parser.add_argument(
+        "--watch",
+        dest="watch",
+        help="Keep generating pages affected by changed results or templates",
+        action="store_true",
     )
-
-    # Create framework_comparison subpage
-    template = env.get_template("frameworks_comparison.html")
-    generate_page(
-        template,
-        deploy_paths.get("subpages", "./"),
-        "frameworks_comparison_stable.html",
-        database=database_stable,
+    parser.add_argument(
+        "--port",
+        dest="port",
+        help="Serve the index deploy dir on the port in the watch mode",
+        default=None,
+        type=int,
     )
-
-    # Create details page for each framework
-    template = env.get_template("details.html")
-    generate_pages(template, database_stable, "details_stable.html")
-    generate_pages(template, database_dev, "details_dev.html")
-
-    # Copy resources to deploy dir
-    # shutil.copytree function raises error if destination path exists
-    resources_path = os.path.abspath("./website-generator/resources")
-    deploy_resources_path = os.path.abspath(
-        deploy_paths.get("resources", "./docs/resources")
+    parser.add_argument(
+        "--workers",
+        dest="workers",
+        help="Number of processes rendering pages, defaults to 1",
+        default=1,
+        type=int,
     )
-    if os.path.exists(deploy_resources_path):
-        shutil.rmtree(deploy_resources_path)
-    shutil.copytree(resources_path, deploy_resources_path)
+    args = parser.parse_args()
+
+    if args.watch:
+        watch_website(
+            args.config, workers=args.workers, optimize=args.production, port=args.port
+        )
+    else:
+        # Load configuration from file
+        config = load_config(args.config)
+        generate_website(
+            config,
+            args.config,
+            incremental=args.incremental,
+            workers=args.workers,
+            optimize=args.production,
+        )
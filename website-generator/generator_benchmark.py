@@ -0,0 +1,480 @@
+# ******************************************************************************
+# Copyright 2017-2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+
+"""Benchmark of the static page generator on synthetic results.
+
+Synthetic results dirs (report.json, nodes.csv and trend.jsonl) are created
+for the specified number of frameworks, tests, operators and trend entries.
+The trend log is created by the harness trend_log module, so the trend stage
+measures the same tail read and streamed history as the real results
+(legacy trend.json is written instead with --legacy_trend).
+Each generator stage is timed (median of repeated runs) and its peak memory
+allocated by Python is measured in a separate run traced with tracemalloc.
+Results are saved as JSON and can be compared with results of a previous run:
+    python3 website-generator/generator_benchmark.py --frameworks 30 --trend 1000
+        --output benchmark.json --baseline previous_benchmark.json
+The benchmark fails (exit code 1) if any stage is slower or uses more memory
+than in the baseline by more than the threshold.
+"""
+
+import csv
+import generator
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from argparse import ArgumentParser
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+
+# Generator stages in the order they run
+STAGES = [
+    "load_trend",
+    "load_report",
+    "load_ops_csv",
+    "prepare_database",
+    "sort_by_score",
+    "write_data_assets",
+    "render_pages",
+]
+
+# Allowed relative growth of the stage time or peak memory over the baseline
+THRESHOLD = 0.25
+
+# Time and memory differences below these values are treated as noise
+MIN_TIME_DELTA = 0.01
+MIN_MEMORY_DELTA = 1048576
+
+# Synthetic test statuses and their probability
+STATUS_WEIGHTS = OrderedDict([("passed", 0.8), ("failed", 0.15), ("skipped", 0.05)])
+
+# Number of trend entries with the same packages versions
+VERSION_PERIOD = 30
+
+
+def _write_report(results_dir, tests, ops, rng):
+    """Write synthetic report.json with statuses of tests of the operators.
+
+    :param results_dir: Path to the results dir.
+    :type results_dir: str
+    :param tests: Number of tests.
+    :type tests: int
+    :param ops: Number of operators.
+    :type ops: int
+    :param rng: Random numbers generator.
+    :type rng: random.Random
+    :return: Number of tests with each status.
+    :rtype: dict
+    """
+    report = {status: [] for status in STATUS_WEIGHTS}
+    statuses = rng.choices(
+        list(STATUS_WEIGHTS.keys()), list(STATUS_WEIGHTS.values()), k=tests
+    )
+    for idx, status in enumerate(statuses):
+        test_name = "OnnxBackendNodeModelTest::test_op{0}_{1}_cpu".format(
+            idx % ops, idx
+        )
+        report[status].append(test_name)
+    with open(os.path.join(results_dir, "report.json"), "w") as report_file:
+        date = datetime.now().strftime("%m/%d/%Y %H:%M:%S")
+        json.dump(dict(report, date=date), report_file)
+    return {status: len(test_names) for status, test_names in report.items()}
+
+
+def _write_ops_csv(results_dir, ops, rng):
+    """Write synthetic nodes.csv with operators coverage.
+
+    :param results_dir: Path to the results dir.
+    :type results_dir: str
+    :param ops: Number of operators.
+    :type ops: int
+    :param rng: Random numbers generator.
+    :type rng: random.Random
+    """
+    with open(os.path.join(results_dir, "nodes.csv"), "w", newline="") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(["Op", "None"])
+        for idx in range(ops):
+            status = "Passed!" if rng.random() < STATUS_WEIGHTS["passed"] else "Failed!"
+            writer.writerow(["Op{0}".format(idx), status])
+
+
+def _write_trend(results_dir, entries, summary, rng, legacy=False):
+    """Write synthetic trend log with daily summaries.
+
+    The log is migrated from trend.json by the harness trend_log module.
+
+    :param results_dir: Path to the results dir.
+    :type results_dir: str
+    :param entries: Number of trend entries.
+    :type entries: int
+    :param summary: Number of tests with each status of the latest entry.
+    :type summary: dict
+    :param rng: Random numbers generator.
+    :type rng: random.Random
+    :param legacy: Keep legacy trend.json instead of the log, defaults to False
+    :type legacy: bool, optional
+    """
+    start_date = datetime.now() - timedelta(days=entries)
+    trend = []
+    for idx in range(entries):
+        date = start_date + timedelta(days=idx)
+        passed = summary["passed"] - rng.randint(0, summary["failed"])
+        trend.append(
+            {
+                "date": date.strftime("%m/%d/%Y %H:%M:%S"),
+                "failed": summary["passed"] + summary["failed"] - passed,
+                "passed": passed,
+                "skipped": summary["skipped"],
+                "versions": [
+                    {"name": "onnx", "version": "1.{0}.0".format(idx // VERSION_PERIOD)}
+                ],
+            }
+        )
+    trend[-1].update(summary)
+    json_path = os.path.join(results_dir, "trend.json")
+    with open(json_path, "w") as trend_file:
+        json.dump(trend, trend_file)
+    if not legacy:
+        generator.trend_history.trend_log.migrate(results_dir)
+        os.remove(json_path)
+
+
+def create_results(work_dir, frameworks, tests, ops, trend, seed=0, legacy=False):
+    """Create synthetic results dirs and the scoreboard config.
+
+    :param work_dir: Path to the empty dir for results and generated pages.
+    :type work_dir: str
+    :param frameworks: Number of frameworks.
+    :type frameworks: int
+    :param tests: Number of tests of each framework.
+    :type tests: int
+    :param ops: Number of operators of each framework.
+    :type ops: int
+    :param trend: Number of trend entries of each framework.
+    :type trend: int
+    :param seed: Seed of the random results, defaults to 0
+    :type seed: int, optional
+    :param legacy: Write legacy trend.json instead of the log, defaults to False
+    :type legacy: bool, optional
+    :return: Dictionary with the scoreboard config.
+    :rtype: dict
+    """
+    rng = random.Random(seed)
+    config = {
+        "stable": OrderedDict(),
+        "deploy_paths": {
+            "index": os.path.join(work_dir, "docs"),
+            "subpages": os.path.join(work_dir, "docs"),
+            "resources": os.path.join(work_dir, "docs", "resources"),
+        },
+    }
+    for idx in range(frameworks):
+        framework = "framework{0}".format(idx)
+        results_dir = os.path.join(work_dir, "results", framework)
+        os.makedirs(results_dir)
+        summary = _write_report(results_dir, tests, ops, rng)
+        _write_ops_csv(results_dir, ops, rng)
+        _write_trend(results_dir, trend, summary, rng, legacy)
+        config["stable"][framework] = {
+            "name": "Framework {0}".format(idx),
+            "results_dir": results_dir,
+        }
+    os.makedirs(config["deploy_paths"]["index"])
+    return config
+
+
+def _load_all(loader, config):
+    """Run the results loader for all frameworks."""
+    for framework_config in config["stable"].values():
+        loader(framework_config["results_dir"])
+
+
+def _load_trend(results_dir):
+    """Load the last trend summaries and the chart history as the generator does."""
+    return generator.trend_history.load_trend_and_history(
+        results_dir, generator.TREND_LENGTH
+    )
+
+
+def _run_stages(config):
+    """Run generator stages once and yield name of each finished stage.
+
+    :param config: Dictionary with the scoreboard config.
+    :type config: dict
+    :return: Generator of stage names, yielded when the stage is finished.
+    :rtype: generator
+    """
+    _load_all(_load_trend, config)
+    yield "load_trend"
+    _load_all(generator.load_report, config)
+    yield "load_report"
+    _load_all(generator.load_ops_csv, config)
+    yield "load_ops_csv"
+    database = generator.prepare_database(config, state="stable")
+    yield "prepare_database"
+    database = generator.sort_by_score(database)
+    yield "sort_by_score"
+    resources_dir = config["deploy_paths"]["resources"]
+    assets = generator.write_data_assets(database, "stable", resources_dir)
+    yield "write_data_assets"
+    pages = [page for page in generator.get_pages(config) if page["state"] == "stable"]
+    for page in pages:
+        page["args"]["assets"] = generator.get_page_assets(page, assets)
+        page["args"]["tables"] = {
+            table: generator.get_page_assets(page, assets, table)
+            for table in generator.table_data.TABLES
+        }
+    generator.render_pages(generator.create_environment(), pages, {"stable": database})
+    yield "render_pages"
+
+
+def measure_times(config, repeat):
+    """Return median time of each stage.
+
+    :param config: Dictionary with the scoreboard config.
+    :type config: dict
+    :param repeat: Number of runs.
+    :type repeat: int
+    :return: Dictionary with stage name as a key and time in seconds as a value.
+    :rtype: dict
+    """
+    times = {stage: [] for stage in STAGES}
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        for stage in _run_stages(config):
+            end_time = time.perf_counter()
+            times[stage].append(end_time - start_time)
+            start_time = time.perf_counter()
+    return {stage: statistics.median(values) for stage, values in times.items()}
+
+
+def measure_memory(config):
+    """Return peak memory allocated by Python during each stage.
+
+    :param config: Dictionary with the scoreboard config.
+    :type config: dict
+    :return: Dictionary with stage name as a key and peak memory in bytes as a value.
+    :rtype: dict
+    """
+    peaks = {}
+    tracemalloc.start()
+    try:
+        for stage in _run_stages(config):
+            _, peaks[stage] = tracemalloc.get_traced_memory()
+            # Restart tracing, so the next stage peak is measured from zero
+            tracemalloc.stop()
+            tracemalloc.start()
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+
+def run_benchmark(params, work_dir):
+    """Create synthetic results and measure all generator stages.
+
+    :param params: Benchmark parameters (frameworks, tests, ops, trend, repeat, seed
+                   and legacy_trend).
+    :type params: dict
+    :param work_dir: Path to the empty work dir.
+    :type work_dir: str
+    :return: Benchmark results with parameters, stages time and peak memory
+             and peak RSS of the process.
+    :rtype: dict
+    """
+    config = create_results(
+        work_dir,
+        params["frameworks"],
+        params["tests"],
+        params["ops"],
+        params["trend"],
+        params["seed"],
+        params["legacy_trend"],
+    )
+    times = measure_times(config, params["repeat"])
+    peaks = measure_memory(config)
+    return {
+        "date": datetime.now().strftime("%m/%d/%Y %H:%M:%S"),
+        "params": params,
+        "stages": OrderedDict(
+            (stage, {"time": times[stage], "peak_memory": peaks[stage]})
+            for stage in STAGES
+        ),
+        "max_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+    }
+
+
+def find_regressions(results, baseline, threshold=THRESHOLD):
+    """Return stages which time or peak memory grew over the threshold.
+
+    :param results: Benchmark results returned by run_benchmark.
+    :type results: dict
+    :param baseline: Benchmark results of the previous run.
+    :type baseline: dict
+    :param threshold: Allowed relative growth, defaults to THRESHOLD
+    :type threshold: float, optional
+    :return: List of regression descriptions.
+    :rtype: list
+    """
+    min_deltas = {"time": MIN_TIME_DELTA, "peak_memory": MIN_MEMORY_DELTA}
+    regressions = []
+    for stage, stage_results in results["stages"].items():
+        baseline_results = baseline.get("stages", {}).get(stage, {})
+        for key, min_delta in min_deltas.items():
+            value, baseline_value = stage_results[key], baseline_results.get(key)
+            if baseline_value is None or value - baseline_value < min_delta:
+                continue
+            if value > baseline_value * (1 + threshold):
+                regressions.append(
+                    "{stage} {key}: {value:.4g} (baseline {baseline:.4g})".format(
+                        stage=stage, key=key, value=value, baseline=baseline_value
+                    )
+                )
+    return regressions
+
+
+def print_results(results):
+    """Print time and peak memory of the stages.
+
+    :param results: Benchmark results returned by run_benchmark.
+    :type results: dict
+    """
+    print("{0:<20}{1:>12}{2:>20}".format("Stage", "Time [s]", "Peak memory [MB]"))
+    for stage, stage_results in results["stages"].items():
+        print(
+            "{0:<20}{1:>12.4f}{2:>20.1f}".format(
+                stage, stage_results["time"], stage_results["peak_memory"] / 1048576
+            )
+        )
+    print("Peak RSS [MB]: {0:.1f}".format(results["max_rss"] / 1048576))
+
+
+def main(args):
+    """Run the benchmark, save results and compare them with the baseline.
+
+    :param args: Parsed command line arguments.
+    :type args: argparse.Namespace
+    :return: Exit code, 1 if there is a regression.
+    :rtype: int
+    """
+    params = OrderedDict(
+        (key, getattr(args, key))
+        for key in [
+            "frameworks",
+            "tests",
+            "ops",
+            "trend",
+            "repeat",
+            "seed",
+            "legacy_trend",
+        ]
+    )
+    with tempfile.TemporaryDirectory() as work_dir:
+        results = run_benchmark(params, work_dir)
+    print_results(results)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=4)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, "r") as baseline_file:
+        baseline = json.load(baseline_file)
+    if baseline.get("params") != results["params"]:
+        print("Baseline parameters differ: {0}".format(baseline.get("params")))
+    regressions = find_regressions(results, baseline, args.threshold)
+    for regression in regressions:
+        print("Regression: {0}".format(regression))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument(
+        "--frameworks",
+        dest="frameworks",
+        help="Number of frameworks, defaults to 5",
+        default=5,
+        type=int,
+    )
+    parser.add_argument(
+        "--tests",
+        dest="tests",
+        help="Number of tests of each framework, defaults to 1000",
+        default=1000,
+        type=int,
+    )
+    parser.add_argument(
+        "--ops",
+        dest="ops",
+        help="Number of operators of each framework, defaults to 150",
+        default=150,
+        type=int,
+    )
+    parser.add_argument(
+        "--trend",
+        dest="trend",
+        help="Number of trend entries of each framework, defaults to 365",
+        default=365,
+        type=int,
+    )
+    parser.add_argument(
+        "--repeat",
+        dest="repeat",
+        help="Number of timed runs of each stage, defaults to 3",
+        default=3,
+        type=int,
+    )
+    parser.add_argument(
+        "--seed",
+        dest="seed",
+        help="Seed of the synthetic results, defaults to 0",
+        default=0,
+        type=int,
+    )
+    parser.add_argument(
+        "--legacy_trend",
+        dest="legacy_trend",
+        help="Write legacy trend.json instead of the trend log",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--output",
+        dest="output",
+        help="Save results to the specified JSON file",
+        type=str,
+    )
+    parser.add_argument(
+        "--baseline",
+        dest="baseline",
+        help="Compare results with the specified JSON file of a previous run",
+        type=str,
+    )
+    parser.add_argument(
+        "--threshold",
+        dest="threshold",
+        help="Allowed relative growth over the baseline, defaults to 0.25",
+        default=THRESHOLD,
+        type=float,
+    )
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,232 @@
+"""Production build of the static pages.
+
+In the production mode (generator option `--production`) generated files
+are optimized for serving:
+    - HTML pages, CSS and JS resources are minified,
+    - resources are renamed with their content hash, e.g. "src/main.0123456789.js",
+      so they can be cached by the browser forever and the pages refer to them
+      through the "resource" template filter,
+    - gzip (.gz) and brotli (.br) variants are written next to each file
+      for web servers serving precompressed files.
+Minifiers are conservative (comments and indentation are removed),
+so the files behave exactly the same as the sources.
+"""
+
+import gzip
+import hashlib
+import io
+import os
+import re
+
+
+# Suffixes of the precompressed variants of files
+COMPRESSED_SUFFIXES = [".gz", ".br"]
+
+# Length of the content hash in the fingerprinted resource names
+HASH_LENGTH = 10
+
+# URL of the deployed resources dir relative to the pages
+RESOURCES_URL = "./resources/"
+
+
+def minify_css(text):
+    """Return CSS without comments and unnecessary whitespace.
+
+    :param text: CSS source.
+    :type text: str
+    :return: Minified CSS.
+    :rtype: str
+    """
+    text = re.sub(r"/\*.*?\*/", "", text, flags=re.DOTALL)
+    text = re.sub(r"\s+", " ", text)
+    text = re.sub(r"\s*([{;,>}])\s*", r"\1", text)
+    text = re.sub(r":\s+", ":", text)
+    return text.replace(";}", "}").strip()
+
+
+def _strip_lines(text, comment_prefix=None):
+    """Return text without comment lines, indentation and empty lines.
+
+    :param text: Source text.
+    :type text: str
+    :param comment_prefix: Prefix of whole line comments, defaults to None
+    :type comment_prefix: str, optional
+    :return: Stripped text.
+    :rtype: str
+    """
+    lines = (line.strip() for line in text.splitlines())
+    return "\n".join(
+        line
+        for line in lines
+        if line and not (comment_prefix and line.startswith(comment_prefix))
+    )
+
+
+def minify_js(text):
+    """Return JavaScript without comment lines, indentation and empty lines.
+
+    Line breaks are kept, because the sources don't use semicolons.
+
+    :param text: JavaScript source.
+    :type text: str
+    :return: Minified JavaScript.
+    :rtype: str
+    """
+    return _strip_lines(text, "//")
+
+
+def minify_html(text):
+    """Return HTML without comments, indentation and empty lines.
+
+    :param text: HTML source.
+    :type text: str
+    :return: Minified HTML.
+    :rtype: str
+    """
+    text = re.sub(r"<!--.*?-->", "", text, flags=re.DOTALL)
+    return _strip_lines(text)
+
+
+# Minifier of the resource file extension
+MINIFIERS = {".css": minify_css, ".js": minify_js, ".html": minify_html}
+
+
+def compress(file_path):
+    """Write gzip and brotli variants of the file.
+
+    Variants are written deterministically (gzip header has no timestamp),
+    so unchanged files produce unchanged variants. Brotli is imported here,
+    so the generator without the production build doesn't require it.
+
+    :param file_path: Path to the file.
+    :type file_path: str
+    :return: Paths to the compressed variants.
+    :rtype: list
+    """
+    import brotli
+
+    with open(file_path, "rb") as src_file:
+        content = src_file.read()
+    gzip_content = io.BytesIO()
+    with gzip.GzipFile(fileobj=gzip_content, mode="wb", compresslevel=9, mtime=0) as f:
+        f.write(content)
+    variants = {".gz": gzip_content.getvalue(), ".br": brotli.compress(content)}
+    paths = []
+    for suffix in COMPRESSED_SUFFIXES:
+        with open(file_path + suffix, "wb") as dst_file:
+            dst_file.write(variants[suffix])
+        paths.append(file_path + suffix)
+    return paths
+
+
+def remove_compressed(file_path):
+    """Remove compressed variants of the file, so they don't get outdated.
+
+    :param file_path: Path to the file.
+    :type file_path: str
+    """
+    for suffix in COMPRESSED_SUFFIXES:
+        if os.path.isfile(file_path + suffix):
+            os.remove(file_path + suffix)
+
+
+def get_source_name(file_name):
+    """Return name of the file which was compressed to the file.
+
+    :param file_name: File name, e.g. "main.js.gz".
+    :type file_name: str
+    :return: Name without the compression suffix, e.g. "main.js".
+    :rtype: str
+    """
+    root, ext = os.path.splitext(file_name)
+    return root if ext in COMPRESSED_SUFFIXES else file_name
+
+
+def write_page(content, file_path):
+    """Save minified and precompressed HTML page.
+
+    :param content: Rendered HTML page.
+    :type content: str
+    :param file_path: Path to the page file.
+    :type file_path: str
+    """
+    with open(file_path, "w") as page_file:
+        page_file.write(minify_html(content))
+    compress(file_path)
+
+
+def _build_resource(src_path, dst_dir):
+    """Write minified, fingerprinted and precompressed resource.
+
+    :param src_path: Path to the resource source file.
+    :type src_path: str
+    :param dst_dir: Path to the output dir.
+    :type dst_dir: str
+    :return: Name of the fingerprinted file.
+    :rtype: str
+    """
+    stem, ext = os.path.splitext(os.path.basename(src_path))
+    with open(src_path, "rb") as src_file:
+        content = src_file.read()
+    if ext in MINIFIERS:
+        content = MINIFIERS[ext](content.decode()).encode()
+    fingerprint = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+    dst_name = "{0}.{1}{2}".format(stem, fingerprint, ext)
+    os.makedirs(dst_dir, exist_ok=True)
+    with open(os.path.join(dst_dir, dst_name), "wb") as dst_file:
+        dst_file.write(content)
+    compress(os.path.join(dst_dir, dst_name))
+    return dst_name
+
+
+def build_resources(src_dir, dst_dir):
+    """Write minified, fingerprinted and precompressed resources.
+
+    :param src_dir: Path to the resources sources dir.
+    :type src_dir: str
+    :param dst_dir: Path to the empty dir for the built resources.
+    :type dst_dir: str
+    :return: Dictionary with source path as a key and fingerprinted path
+             as a value, both relative to the resources dir (with "/" separators).
+    :rtype: dict
+    """
+    resources = {}
+    for root, _, file_names in os.walk(src_dir):
+        rel_dir = os.path.relpath(root, src_dir)
+        for file_name in sorted(file_names):
+            dst_name = _build_resource(
+                os.path.join(root, file_name), os.path.join(dst_dir, rel_dir)
+            )
+            src_path = os.path.normpath(os.path.join(rel_dir, file_name))
+            dst_path = os.path.normpath(os.path.join(rel_dir, dst_name))
+            resources[src_path.replace(os.sep, "/")] = dst_path.replace(os.sep, "/")
+    return resources
+
+
+def get_resource_url(resources, path):
+    """Return URL of the resource used by the pages.
+
+    :param resources: Dictionary returned by build_resources, empty in the default mode.
+    :type resources: dict
+    :param path: Path relative to the resources dir, e.g. "src/main.js".
+    :type path: str
+    :return: URL of the resource, e.g. "./resources/src/main.0123456789.js".
+    :rtype: str
+    """
+    return RESOURCES_URL + resources.get(path, path)
+
+
+def sync_compressed(file_path, enabled):
+    """Write missing compressed variants of the file or remove them.
+
+    Used for content-addressed files, which variants never get outdated.
+
+    :param file_path: Path to the file.
+    :type file_path: str
+    :param enabled: Write variants if True, remove them otherwise.
+    :type enabled: bool
+    """
+    if not enabled:
+        remove_compressed(file_path)
+    elif not all(os.path.isfile(file_path + suffix) for suffix in COMPRESSED_SUFFIXES):
+        compress(file_path)
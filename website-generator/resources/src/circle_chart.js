@@ -1,5 +1,6 @@
 // Generate circle charts
-for (const framework in database) {
+loadDatabase().then(database => {
+  for (const framework in database) {
     const circleChart = document.getElementById('circle_' + database[framework].name)
     const trend = database[framework].trend
     const lastIdx = trend.length - 1
@@ -27,3 +28,4 @@ for (const framework in database) {
       }
     })
   }
+})
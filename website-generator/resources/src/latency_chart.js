@@ -0,0 +1,78 @@
+// Details latency trend chart
+const latencyTrend = document.getElementById('latency_trend')
+
+// Geometric mean of operators median latencies, so each operator has the same weight
+function meanLatency (opsLatency) {
+  const latencies = Object.values(opsLatency).filter(latency => latency > 0)
+  if (latencies.length === 0) {
+    return 0.0
+  }
+  const logSum = latencies.reduce((sum, latency) => sum + Math.log(latency), 0)
+  return Math.exp(logSum / latencies.length)
+}
+
+if (latencyTrend) {
+  loadDatabase().then(database => {
+    const trendData = database[latencyTrend.getAttribute('framework')].latency.trend
+
+    const labels = trendData.map(
+      summary => [
+        summary.date.split(' ')[0]
+      ].concat(
+        (summary.versions || []).map(
+          corePackage => '\n' + corePackage.name + ': ' + corePackage.version.toString()
+        )
+      )
+    )
+
+    const data = trendData.map(
+      summary => meanLatency(summary.latency || {}).toFixed(4)
+    )
+
+    new Chart(latencyTrend, {
+      type: 'line',
+      data: {
+        labels: labels,
+        datasets: [{
+          data: data,
+          label: 'Latency',
+          fill: true,
+          backgroundColor: 'transparent',
+          borderColor: palette.passed,
+          borderWidth: 2,
+          pointBackgroundColor: palette.passed
+        }]
+      },
+      options: {
+        responsive: false,
+        title: {
+          fontSize: 25,
+          display: true,
+          text: 'Operators latency trend'
+        },
+        legend: {
+          display: false,
+          position: 'bottom'
+        },
+        scales: {
+          xAxes: [{}],
+          yAxes: [{
+            ticks: {
+              beginAtZero: true
+            },
+            scaleLabel: {
+              fontSize: 20,
+              display: true,
+              labelString: 'geometric mean p50 [ms]'
+            }
+          }]
+        },
+        elements: {
+          line: {
+            tension: 0 // Disables bezier curves
+          }
+        }
+      }
+    })
+  })
+}
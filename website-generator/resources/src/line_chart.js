@@ -1,81 +1,85 @@
 // Details trend chart
 const lineTrend = document.getElementById('line_trend')
-const frameworkData = JSON.parse(lineTrend.getAttribute('framework_data'))
-const trendData = frameworkData.trend
 
-const labels = trendData.map(
-  summary => summary.versions ? [
-    summary.date.split(' ')[0]
-  ].concat(
-    summary.versions.map(
-      corePackage => '\n' + corePackage.name + ': ' + corePackage.version.toString()
-    )
-  ) : summary.date.split(' ')[0]
-)
-
-function percentage(summary) {
-  let total = summary.passed + summary.failed + summary.skipped;
-    if (total === 0) {
-      return 0.0
-    }
-    else {
-      return summary.passed / total * 100
-    }
+// Collapsed repeated runs are labeled with their first and last date
+function dateLabel (summary) {
+  const date = summary.date.split(' ')[0]
+  return summary.first_date ? summary.first_date.split(' ')[0] + ' - ' + date : date
 }
 
-const data = trendData.map(
-  summary => percentage(summary).toFixed(2)
-)
+loadDatabase().then(database => {
+  const frameworkData = database[lineTrend.getAttribute('framework')]
+  // Trend is compacted and downsampled by the generator (see trend_history.py)
+  const trendData = frameworkData.trend
 
-const displayDataCount = 15
-const lineChartData = {
-  labels: [
-    ['', '']
-  ].concat(labels.slice(-displayDataCount)).concat(['']),
-  datasets: [{
-    data: [0].concat(data.slice(-displayDataCount)),
-    label: 'Passed',
-    fill: true,
-    backgroundColor: 'transparent',
-    borderColor: palette.passed,
-    borderWidth: 2,
-    pointBackgroundColor: palette.passed
-  }]
-}
+  const labels = trendData.map(
+    summary => summary.versions ? [
+      dateLabel(summary) + (summary.partial ? ' (partial)' : '')
+    ].concat(
+      summary.versions.map(
+        corePackage => '\n' + corePackage.name + ': ' + corePackage.version.toString()
+      )
+    ) : dateLabel(summary)
+  )
 
-new Chart(lineTrend, {
-  type: 'line',
-  data: lineChartData,
-  options: {
-    responsive: false,
-    title: {
-      fontSize: 25,
-      display: true,
-      text: 'Passed unit tests trend'
-    },
-    legend: {
-      display: false,
-      position: 'bottom'
-    },
-    scales: {
-      xAxes: [{}],
-      yAxes: [{
-        ticks: {
-          beginAtZero: true,
-          suggestedMin: 0,
-          suggestedMax: 100
-        },
-        scaleLabel: {
-          fontSize: 20,
-          display: true,
-          labelString: 'unit tests %'
+  // Passed tests percentage is computed by the generator, as the coverage
+  const data = trendData.map(summary => summary.percentage)
+
+  // Partial (impacted tests) runs are marked with bigger triangle points
+  const partialRuns = [false].concat(
+    trendData.map(summary => Boolean(summary.partial))
+  )
+  const lineChartData = {
+    labels: [
+      ['', '']
+    ].concat(labels).concat(['']),
+    datasets: [{
+      data: [0].concat(data),
+      label: 'Passed',
+      fill: true,
+      backgroundColor: 'transparent',
+      borderColor: palette.passed,
+      borderWidth: 2,
+      pointBackgroundColor: palette.passed,
+      pointStyle: partialRuns.map(partial => partial ? 'triangle' : 'circle'),
+      pointRadius: partialRuns.map(partial => partial ? 6 : 3)
+    }]
+  }
+
+  new Chart(lineTrend, {
+    type: 'line',
+    data: lineChartData,
+    options: {
+      responsive: false,
+      title: {
+        fontSize: 25,
+        display: true,
+        text: 'Passed unit tests trend'
+      },
+      legend: {
+        display: false,
+        position: 'bottom'
+      },
+      scales: {
+        xAxes: [{}],
+        yAxes: [{
+          ticks: {
+            beginAtZero: true,
+            suggestedMin: 0,
+            suggestedMax: 100
+          },
+          scaleLabel: {
+            fontSize: 20,
+            display: true,
+            labelString: 'unit tests %'
+          }
+        }]
+      },
+      elements: {
+        line: {
+          tension: 0 // Disables bezier curves
         }
-      }]
-    },
-    elements: {
-      line: {
-        tension: 0 // Disables bezier curves
       }
     }
-  }
+  })
 })
@@ -1,6 +1,26 @@
-// Get scoreboard database
+// Get URLs of scoreboard database assets (one JSON file per framework)
 const content = document.getElementById('content')
-const database = JSON.parse(content.getAttribute('database'))
+const databaseAssets = content ? JSON.parse(content.getAttribute('data-assets')) : {}
+let databasePromise = null
+
+// Load scoreboard database assets once, when the data is needed for the first time
+function loadDatabase () {
+  if (databasePromise === null) {
+    const frameworks = Object.keys(databaseAssets)
+    databasePromise = Promise.all(
+      frameworks.map(framework => fetch(databaseAssets[framework]).then(
+        response => response.json()
+      ))
+    ).then(frameworksData => {
+      const database = {}
+      frameworks.forEach((framework, idx) => {
+        database[framework] = frameworksData[idx]
+      })
+      return database
+    })
+  }
+  return databasePromise
+}
 
 const palette = {
   passed: '#adff2f',
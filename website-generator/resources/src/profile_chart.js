@@ -0,0 +1,63 @@
+// Details chart of tests with the longest compile time
+const profileChart = document.getElementById('profile_chart')
+
+// Number of tests shown in the chart
+const profileChartTests = 15
+
+if (profileChart) {
+  loadDatabase().then(database => {
+    const tests = database[profileChart.getAttribute('framework')].profile.tests
+      .slice(0, profileChartTests)
+    const milliseconds = key => tests.map(test => ((test[key] || 0) * 1000).toFixed(3))
+
+    new Chart(profileChart, {
+      type: 'horizontalBar',
+      data: {
+        labels: tests.map(test => test.name.split('::').pop()),
+        datasets: [{
+          data: milliseconds('compile'),
+          backgroundColor: palette.failed,
+          label: 'Compile'
+        },
+        {
+          data: milliseconds('first_run'),
+          backgroundColor: palette.font,
+          label: 'First run'
+        },
+        {
+          data: milliseconds('steady_run'),
+          backgroundColor: palette.passed,
+          label: 'Steady run'
+        }]
+      },
+      options: {
+        responsive: false,
+        title: {
+          fontSize: 25,
+          display: true,
+          text: 'Slowest compiled tests'
+        },
+        legend: {
+          display: true,
+          position: 'bottom'
+        },
+        scales: {
+          xAxes: [{
+            stacked: true,
+            ticks: {
+              beginAtZero: true
+            },
+            scaleLabel: {
+              fontSize: 20,
+              display: true,
+              labelString: 'time [ms]'
+            }
+          }],
+          yAxes: [{
+            stacked: true
+          }]
+        }
+      }
+    })
+  })
+}
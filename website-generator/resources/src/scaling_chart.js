@@ -0,0 +1,69 @@
+// Details synthetic models scaling charts
+const scalingCharts = document.getElementsByClassName('scaling_chart')
+const scalingColors = ['#adff2f', '#e93d27', '#36a2eb', '#ffce56', '#c45eff']
+const scalingTitles = {
+  p50: 'Latency p50 [ms]',
+  compile_time: 'Compile time [ms]'
+}
+
+if (scalingCharts.length > 0) {
+  loadDatabase().then(database => {
+    Array.from(scalingCharts).forEach(scalingChart => {
+      const curves = database[scalingChart.getAttribute('framework')].scaling.curves
+      const dimension = scalingChart.getAttribute('dimension')
+      const metric = scalingChart.getAttribute('metric')
+
+      // Each operators mix is a separate line, points are sorted by the dimension value
+      const datasets = Object.keys(curves).map((mix, idx) => ({
+        data: (curves[mix][dimension] || []).map(point => ({ x: point.value, y: point[metric] })),
+        label: mix,
+        fill: false,
+        showLine: true,
+        backgroundColor: 'transparent',
+        borderColor: scalingColors[idx % scalingColors.length],
+        borderWidth: 2,
+        pointBackgroundColor: scalingColors[idx % scalingColors.length]
+      }))
+
+      new Chart(scalingChart, {
+        type: 'scatter',
+        data: { datasets: datasets },
+        options: {
+          responsive: false,
+          title: {
+            fontSize: 18,
+            display: true,
+            text: scalingTitles[metric] + ' vs ' + dimension
+          },
+          legend: {
+            display: true,
+            position: 'bottom'
+          },
+          scales: {
+            xAxes: [{
+              type: 'logarithmic',
+              scaleLabel: {
+                display: true,
+                labelString: dimension
+              }
+            }],
+            yAxes: [{
+              ticks: {
+                beginAtZero: true
+              },
+              scaleLabel: {
+                display: true,
+                labelString: scalingTitles[metric]
+              }
+            }]
+          },
+          elements: {
+            line: {
+              tension: 0 // Disables bezier curves
+            }
+          }
+        }
+      })
+    })
+  })
+}
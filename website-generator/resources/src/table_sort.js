@@ -0,0 +1,25 @@
+// Table sorting
+// Rows are sorted by "data-value" attribute of the cells in the clicked column,
+// numeric values are compared as numbers. Next click reverses the order.
+function onSort (tableId, columnIdx) {
+  const table = document.getElementById(tableId)
+  const body = table.tBodies[0]
+  const rows = Array.from(body.rows)
+  const sameColumn = table.getAttribute('sort-column') === String(columnIdx)
+  const descending = !(sameColumn && table.getAttribute('sort-order') === 'desc')
+
+  rows.sort((rowA, rowB) => {
+    const valueA = rowA.cells[columnIdx].getAttribute('data-value')
+    const valueB = rowB.cells[columnIdx].getAttribute('data-value')
+    const numberA = parseFloat(valueA)
+    const numberB = parseFloat(valueB)
+    const order = isNaN(numberA) || isNaN(numberB)
+      ? valueA.localeCompare(valueB)
+      : numberA - numberB
+    return descending ? -order : order
+  })
+  rows.forEach(row => body.appendChild(row))
+
+  table.setAttribute('sort-column', columnIdx)
+  table.setAttribute('sort-order', descending ? 'desc' : 'asc')
+}
@@ -0,0 +1,82 @@
+// Details intra-op thread scaling charts
+const threadsCharts = document.getElementsByClassName('threads_chart')
+const threadsColors = ['#adff2f', '#e93d27', '#36a2eb', '#ffce56', '#c45eff']
+const threadsTitles = {
+  p50: 'Latency p50 [ms]',
+  speedup: 'Speedup',
+  efficiency: 'Parallel efficiency'
+}
+
+if (threadsCharts.length > 0) {
+  loadDatabase().then(database => {
+    Array.from(threadsCharts).forEach(threadsChart => {
+      const threads = database[threadsChart.getAttribute('framework')].threads
+      const metric = threadsChart.getAttribute('metric')
+
+      // Each model is a separate line, the median of all models is drawn in black
+      const datasets = Object.keys(threads.tests).map((testName, idx) => ({
+        data: threads.tests[testName].map(point => ({ x: point.threads, y: point[metric] })),
+        label: testName,
+        fill: false,
+        showLine: true,
+        backgroundColor: 'transparent',
+        borderColor: threadsColors[idx % threadsColors.length],
+        borderWidth: 1,
+        pointBackgroundColor: threadsColors[idx % threadsColors.length]
+      }))
+      datasets.push({
+        data: threads.curve.map(point => ({ x: point.threads, y: point[metric] })),
+        label: 'median',
+        fill: false,
+        showLine: true,
+        backgroundColor: 'transparent',
+        borderColor: '#000000',
+        borderWidth: 3,
+        pointBackgroundColor: '#000000'
+      })
+
+      new Chart(threadsChart, {
+        type: 'scatter',
+        data: { datasets: datasets },
+        options: {
+          responsive: false,
+          title: {
+            fontSize: 18,
+            display: true,
+            text: threadsTitles[metric] + ' vs threads'
+          },
+          legend: {
+            display: true,
+            position: 'bottom'
+          },
+          scales: {
+            xAxes: [{
+              type: 'logarithmic',
+              ticks: {
+                callback: value => threads.threads.includes(value) ? value : null
+              },
+              scaleLabel: {
+                display: true,
+                labelString: 'threads'
+              }
+            }],
+            yAxes: [{
+              ticks: {
+                beginAtZero: true
+              },
+              scaleLabel: {
+                display: true,
+                labelString: threadsTitles[metric]
+              }
+            }]
+          },
+          elements: {
+            line: {
+              tension: 0 // Disables bezier curves
+            }
+          }
+        }
+      })
+    })
+  })
+}
@@ -0,0 +1,118 @@
+// Virtualized tables of tests and operators results
+// Table data is loaded from chunked JSON assets (see website-generator/table_data.py),
+// only rows in the visible window of the table viewport are rendered.
+const ROW_HEIGHT = 24
+const OVERSCAN_ROWS = 10
+
+function fetchJson (url) {
+  return fetch(url).then(response => response.json())
+}
+
+function formatStatus (status) {
+  const text = status.charAt(0).toUpperCase() + status.slice(1).toLowerCase()
+  return text.replace('node tests passed', '')
+}
+
+// Return rows which names contain the query
+function findRows (table, query) {
+  return table.allRows.filter(row => table.lowerNames[row].indexOf(query) >= 0)
+}
+
+function loadChunk (table, chunkIdx) {
+  if (!(chunkIdx in table.chunks)) {
+    table.chunks[chunkIdx] = null
+    fetchJson(table.resolve(table.index.chunks[chunkIdx])).then(chunk => {
+      table.chunks[chunkIdx] = chunk
+      scheduleRender(table)
+    })
+  }
+  return table.chunks[chunkIdx]
+}
+
+function createCell (row, text, className) {
+  const cell = row.insertCell()
+  cell.textContent = text
+  if (className) {
+    cell.className = className
+  }
+}
+
+function renderRow (table, rowIdx) {
+  const index = table.index
+  const row = document.createElement('tr')
+  row.style.height = ROW_HEIGHT + 'px'
+  createCell(row, index.names[rowIdx].replace(/::/g, ' :: '), 'name')
+  const chunk = loadChunk(table, Math.floor(rowIdx / index.chunk_size))
+  const chunkRow = rowIdx % index.chunk_size
+  if (chunk) {
+    const status = index.statuses[chunk.statuses[chunkRow]]
+    createCell(row, formatStatus(status), 'status ' + status)
+  } else {
+    createCell(row, '...', 'status')
+  }
+  if (index.memory) {
+    const rssPeak = chunk ? chunk.memory[chunkRow] : null
+    createCell(row, rssPeak === null ? '-' : rssPeak.toFixed(1), 'memory')
+  }
+  return row
+}
+
+function render (table) {
+  table.renderPending = false
+  const viewport = table.viewport
+  const height = viewport.clientHeight || window.innerHeight
+  const first = Math.max(0, Math.floor(viewport.scrollTop / ROW_HEIGHT) - OVERSCAN_ROWS)
+  const last = Math.min(
+    table.rows.length, Math.ceil((viewport.scrollTop + height) / ROW_HEIGHT) + OVERSCAN_ROWS
+  )
+  const body = document.createElement('tbody')
+  for (let idx = first; idx < last; idx++) {
+    body.appendChild(renderRow(table, table.rows[idx]))
+  }
+  table.body.parentNode.replaceChild(body, table.body)
+  table.body = body
+  table.spacer.style.height = table.rows.length * ROW_HEIGHT + 'px'
+  body.parentNode.style.transform = 'translateY(' + first * ROW_HEIGHT + 'px)'
+  table.count.textContent = table.rows.length + ' of ' + table.allRows.length
+}
+
+function scheduleRender (table) {
+  if (!table.renderPending) {
+    table.renderPending = true
+    window.requestAnimationFrame(() => render(table))
+  }
+}
+
+function onTableSearch (table) {
+  const query = table.input.value.trim().toLowerCase()
+  table.rows = query ? findRows(table, query) : table.allRows
+  table.viewport.scrollTop = 0
+  scheduleRender(table)
+}
+
+function initVirtualTable (container) {
+  const indexUrl = new URL(container.getAttribute('data-index'), window.location.href)
+  const table = {
+    resolve: assetName => new URL(assetName, indexUrl).href,
+    input: container.querySelector('input'),
+    viewport: container.querySelector('.virtualViewport'),
+    spacer: container.querySelector('.virtualSpacer'),
+    body: container.querySelector('.virtualSpacer tbody'),
+    count: container.querySelector('.virtualCount'),
+    chunks: {},
+    renderPending: false
+  }
+  fetchJson(indexUrl.href).then(index => {
+    table.index = index
+    table.lowerNames = index.names.map(name => name.toLowerCase())
+    table.allRows = index.names.map((name, idx) => idx)
+    table.rows = table.allRows
+    table.viewport.addEventListener('scroll', () => scheduleRender(table))
+    table.input.addEventListener('input', () => onTableSearch(table))
+    scheduleRender(table)
+  })
+}
+
+for (const container of document.getElementsByClassName('virtualTable')) {
+  initVirtualTable(container)
+}
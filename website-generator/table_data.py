@@ -0,0 +1,74 @@
+"""Chunked data of the virtualized tests and operators tables.
+
+Tables on the details pages don't contain static rows. Each table is saved
+as a set of JSON assets loaded by virtual_table.js:
+    index  - names of all rows, statuses list and names of the other assets,
+    chunks - status codes (and peak RSS) of CHUNK_SIZE consecutive rows,
+             loaded when the rows are scrolled into view.
+Search filters the names of the index, so no search index is needed.
+"""
+
+from collections import OrderedDict
+
+
+# Table name and database key with names and statuses of its rows
+TABLES = OrderedDict([("tests", "report"), ("ops", "ops")])
+
+# Number of rows in a single data chunk
+CHUNK_SIZE = 500
+
+# Bytes in a megabyte, peak RSS is displayed in MB
+MB = 1048576
+
+
+def _get_memory_column(names, memory):
+    """Return peak RSS of rows in MB.
+
+    :param names: List of row names.
+    :type names: list
+    :param memory: Dictionary with row name as a key and memory data as a value.
+    :type memory: dict
+    :return: List of peak RSS values (None if not measured), empty without memory data.
+    :rtype: list
+    """
+    if not memory:
+        return []
+    column = []
+    for name in names:
+        rss_peak = memory.get(name, {}).get("rss_peak")
+        column.append(None if rss_peak is None else round(rss_peak / MB, 1))
+    return column
+
+
+def prepare_table(framework_data, table):
+    """Return index and data chunks of the table.
+
+    :param framework_data: Results data of the framework.
+    :type framework_data: dict
+    :param table: Table name (key of TABLES).
+    :type table: str
+    :return: Table index (without chunk asset names) and list of chunks.
+    :rtype: tuple
+    """
+    results = framework_data.get(TABLES[table], {})
+    names = list(results.keys())
+    statuses = sorted(set(results.values()))
+    codes = {status: code for code, status in enumerate(statuses)}
+    status_column = [codes[status] for status in results.values()]
+    memory_column = _get_memory_column(
+        names, framework_data.get("memory", {}).get(table)
+    )
+
+    chunks = []
+    for start in range(0, len(names), CHUNK_SIZE):
+        chunk = {"statuses": status_column[start:start + CHUNK_SIZE]}
+        if memory_column:
+            chunk["memory"] = memory_column[start:start + CHUNK_SIZE]
+        chunks.append(chunk)
+    index = {
+        "names": names,
+        "statuses": statuses,
+        "chunk_size": CHUNK_SIZE,
+        "memory": bool(memory_column),
+    }
+    return index, chunks
@@ -0,0 +1,138 @@
+"""Incremental build tests of the website generator.
+
+Run from the main dir (onnx-backend-scoreboard/):
+    python3 -m pytest website-generator/test_incremental_build.py
+"""
+
+import generator
+import glob
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+
+# Main dir of the repository, resources are copied relative to it
+MAIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# URL of the data asset in the generated page or in the table index asset
+ASSET_URL_PATTERN = re.compile(r"resources/data/[\w./-]+?\.json")
+
+
+@pytest.fixture
+def website(tmp_path, monkeypatch):
+    """Copy results and config of the main dir to a temporary dir.
+
+    :return: Scoreboard config and path to the config file.
+    :rtype: tuple
+    """
+    monkeypatch.chdir(MAIN_DIR)
+    config = generator.load_config(os.path.join(MAIN_DIR, "setup", "config.json"))
+    for state in ["stable", "development"]:
+        for framework_id, framework_config in config.get(state, {}).items():
+            results_dir = str(tmp_path / "results" / state / framework_id)
+            shutil.copytree(framework_config["results_dir"], results_dir)
+            framework_config["results_dir"] = results_dir
+    docs_dir = str(tmp_path / "docs")
+    config["deploy_paths"] = {
+        "index": docs_dir,
+        "subpages": docs_dir,
+        "resources": os.path.join(docs_dir, "resources"),
+    }
+    config_path = str(tmp_path / "config.json")
+    with open(config_path, "w") as config_file:
+        json.dump(config, config_file)
+    return config, config_path
+
+
+def build(config_path, hash_seed, *args):
+    """Run the generator in a new process.
+
+    Each build runs with a different hash seed, as separate scoreboard runs do,
+    so iteration order of sets and dictionaries can't hide in the output.
+
+    :param config_path: Path to the scoreboard config file.
+    :type config_path: str
+    :param hash_seed: Value of PYTHONHASHSEED of the generator process.
+    :type hash_seed: int
+    :param args: Additional command line arguments, e.g. "--incremental".
+    """
+    env = dict(os.environ, PYTHONHASHSEED=str(hash_seed))
+    command = [sys.executable, os.path.join("website-generator", "generator.py")]
+    command.extend(["--config", config_path] + list(args))
+    subprocess.run(command, cwd=MAIN_DIR, env=env, check=True)
+
+
+def get_missing_assets(docs_dir):
+    """Return data asset URLs referenced by the pages and table indexes but not found.
+
+    :param docs_dir: Path to the deploy dir of the pages.
+    :type docs_dir: str
+    :return: Set of URLs of missing assets.
+    :rtype: set
+    """
+    asset_urls = set()
+    for page_path in glob.glob(os.path.join(docs_dir, "*.html")):
+        with open(page_path, "r") as page_file:
+            asset_urls.update(ASSET_URL_PATTERN.findall(page_file.read()))
+    assert asset_urls, "Pages don't refer to any data assets"
+
+    missing_urls = set()
+    for asset_url in asset_urls:
+        if not os.path.isfile(os.path.join(docs_dir, asset_url)):
+            missing_urls.add(asset_url)
+            continue
+        for table_url in _get_table_assets(docs_dir, asset_url):
+            if not os.path.isfile(os.path.join(docs_dir, table_url)):
+                missing_urls.add(table_url)
+    return missing_urls
+
+
+def _get_table_assets(docs_dir, asset_url):
+    """Return URLs of the chunks referenced by the table index.
+
+    :param docs_dir: Path to the deploy dir of the pages.
+    :type docs_dir: str
+    :param asset_url: URL of the data asset.
+    :type asset_url: str
+    :return: List of URLs, empty if the asset isn't a table index.
+    :rtype: list
+    """
+    with open(os.path.join(docs_dir, asset_url), "r") as asset_file:
+        asset = json.load(asset_file)
+    if not isinstance(asset, dict) or "chunks" not in asset:
+        return []
+    return [os.path.dirname(asset_url) + "/" + name for name in asset["chunks"]]
+
+
+def test_incremental_build_assets(website):
+    """Test that all pages refer to existing assets after an incremental build."""
+    config, config_path = website
+    build(config_path, 1)
+    docs_dir = config["deploy_paths"]["index"]
+    assert not get_missing_assets(docs_dir)
+
+    results_dir = config["stable"]["ngraph"]["results_dir"]
+    report_path = os.path.join(results_dir, "report.json")
+    with open(report_path, "r") as report_file:
+        report = json.load(report_file)
+    report["failed"].append(report["passed"].pop())
+    with open(report_path, "w") as report_file:
+        json.dump(report, report_file)
+
+    build(config_path, 2, "--incremental")
+    assert not get_missing_assets(docs_dir)
+
+
+def test_repeated_build_is_identical(website):
+    """Test that building the same results again gives the same assets."""
+    config, config_path = website
+    data_dir = os.path.join(config["deploy_paths"]["resources"], generator.DATA_DIR)
+    build(config_path, 1)
+    assets = sorted(os.listdir(os.path.join(data_dir, "stable")))
+    build(config_path, 2)
+    assert sorted(os.listdir(os.path.join(data_dir, "stable"))) == assets
@@ -0,0 +1,323 @@
+"""Compacted and downsampled trend history of the details page chart.
+
+The whole trend log is streamed, but only the summary keys drawn by the chart
+are kept. Consecutive summaries with the same results and versions are collapsed
+into a single range summary with the first and last run dates. The history is
+then downsampled to a point budget with the Largest-Triangle-Three-Buckets
+algorithm on the passed tests percentage, so the shape of the chart is preserved.
+Points where packages versions change are always kept exactly.
+
+The trend log is parsed by the trend_log module of the test harness which writes it,
+and the last summaries shown on the pages are collected in the same pass.
+"""
+
+import importlib.util
+import json
+import os
+
+from collections import deque
+
+
+# Path to the test harness dir, its trend_log module defines the trend log format
+HARNESS_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), os.pardir, "test"
+)
+
+# Default maximal number of points of the trend chart ("trend_points" in the config)
+TREND_POINTS = 60
+
+# Summary keys used by the trend chart and the score table
+CHART_KEYS = [
+    "date",
+    "first_date",
+    "runs",
+    "passed",
+    "failed",
+    "skipped",
+    "crashed",
+    "timeout",
+    "partial",
+    "versions",
+]
+
+# Keys which don't have to be equal in the collapsed summaries
+RANGE_KEYS = ["date", "first_date", "runs"]
+
+# Trend summary keys of tests which didn't pass (crashed and timeout in isolated mode)
+FAILED_KEYS = ["failed", "crashed", "timeout"]
+
+
+def _import_harness_module(name):
+    """Import module of the test harness by its file path.
+
+    :param name: Module name, e.g. "trend_log".
+    :type name: str
+    :return: The imported module.
+    :rtype: module
+    """
+    spec = importlib.util.spec_from_file_location(
+        name, os.path.join(HARNESS_DIR, "{0}.py".format(name))
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# Trend log is read with the module writing it, so the format is parsed in one place
+trend_log = _import_harness_module("trend_log")
+
+
+def iter_summaries(file_dir, file_name="trend.json", log_name="trend.jsonl"):
+    """Yield all trend summaries from the trend log or JSON file.
+
+    Broken lines of the trend log are skipped.
+
+    :param file_dir: Path to the dir with the trend files.
+    :type file_dir: str
+    :param file_name: Name of the trend JSON file, defaults to "trend.json"
+    :type file_name: str, optional
+    :param log_name: Name of the trend log file, defaults to "trend.jsonl"
+    :type log_name: str, optional
+    :return: Generator of summaries ordered from the oldest one.
+    :rtype: generator
+    """
+    log_path = os.path.join(file_dir, log_name)
+    if os.path.isfile(log_path):
+        yield from trend_log.iter_entries(log_path)
+    else:
+        yield from _load_trend_file(os.path.join(file_dir, file_name))
+
+
+def _load_trend_file(file_path):
+    """Load summaries from the trend JSON file.
+
+    :param file_path: Path to the trend JSON file.
+    :type file_path: str
+    :return: List of summaries, empty if the file is broken or not found.
+    :rtype: list
+    """
+    try:
+        with open(file_path, "r") as trend_file:
+            return json.load(trend_file)
+    except (IOError, json.decoder.JSONDecodeError):
+        return []
+
+
+def _get_chart_summary(summary):
+    """Return summary without keys unused by the chart (e.g. durations).
+
+    :param summary: Report summary.
+    :type summary: dict
+    :return: Summary with CHART_KEYS only.
+    :rtype: dict
+    """
+    return {key: summary[key] for key in CHART_KEYS if key in summary}
+
+
+def _is_repeated(summary, previous):
+    """Check if the summary has the same results and versions as the previous one.
+
+    :param summary: Report summary.
+    :type summary: dict
+    :param previous: Previous report summary.
+    :type previous: dict
+    :return: True if the summaries can be collapsed.
+    :rtype: bool
+    """
+    keys = (set(summary) | set(previous)) - set(RANGE_KEYS)
+    return all(summary.get(key) == previous.get(key) for key in keys)
+
+
+def compact(summaries):
+    """Collapse consecutive summaries with the same results and versions.
+
+    Collapsed summary has the values and the date of the last run,
+    the date of the first run ("first_date") and the number of runs ("runs").
+
+    :param summaries: Iterable of summaries ordered from the oldest one.
+    :type summaries: iterable
+    :return: List of summaries and range summaries.
+    :rtype: list
+    """
+    trend = []
+    for summary in summaries:
+        if trend and _is_repeated(summary, trend[-1]):
+            previous = trend[-1]
+            summary = dict(
+                summary,
+                first_date=previous.get("first_date", previous.get("date")),
+                runs=previous.get("runs", 1) + summary.get("runs", 1),
+            )
+            trend[-1] = summary
+        else:
+            trend.append(summary)
+    return trend
+
+
+def get_passed_percentage(summary):
+    """Return percentage of passed tests of the summary.
+
+    :param summary: Report summary.
+    :type summary: dict
+    :return: Passed tests percentage, 0 if there are no tests.
+    :rtype: float
+    """
+    passed = summary.get("passed", 0)
+    total = passed + summary.get("skipped", 0)
+    total += sum(summary.get(key, 0) for key in FAILED_KEYS)
+    return passed / total * 100 if total else 0.0
+
+
+def get_version_changes(trend):
+    """Return indexes of the first, the last and version changing summaries.
+
+    :param trend: List of summaries.
+    :type trend: list
+    :return: Sorted list of summary indexes.
+    :rtype: list
+    """
+    changes = {0, len(trend) - 1}
+    for idx in range(1, len(trend)):
+        if trend[idx].get("versions") != trend[idx - 1].get("versions"):
+            changes.add(idx)
+    return sorted(changes)
+
+
+def _allocate_points(anchors, budget):
+    """Split the point budget between the gaps of the anchor points.
+
+    Each gap gets points proportionally to the number of points inside it.
+
+    :param anchors: Sorted list of indexes of the kept points.
+    :type anchors: list
+    :param budget: Number of points to select inside the gaps.
+    :type budget: int
+    :return: List of numbers of points selected in each gap.
+    :rtype: list
+    """
+    gaps = [end - start - 1 for start, end in zip(anchors, anchors[1:])]
+    total = sum(gaps)
+    if not total or budget <= 0:
+        return [0] * len(gaps)
+    shares = [gap * budget / total for gap in gaps]
+    counts = [int(share) for share in shares]
+    # Points left by rounding down go to the gaps with the largest remainders
+    by_remainder = sorted(
+        range(len(gaps)), key=lambda idx: shares[idx] - counts[idx], reverse=True
+    )
+    for idx in by_remainder[: budget - sum(counts)]:
+        counts[idx] += 1
+    return counts
+
+
+def _get_triangle_area(values, first, second, third_x, third_y):
+    """Return doubled area of the triangle of two points and the third point.
+
+    :param values: List of point values, indexes are x coordinates.
+    :type values: list
+    :param first: Index of the first point.
+    :type first: int
+    :param second: Index of the second point.
+    :type second: int
+    :param third_x: X coordinate of the third point.
+    :type third_x: float
+    :param third_y: Y coordinate of the third point.
+    :type third_y: float
+    :return: Doubled triangle area.
+    :rtype: float
+    """
+    return abs(
+        (first - third_x) * (values[second] - values[first])
+        - (first - second) * (third_y - values[first])
+    )
+
+
+def select_points(values, start, end, count):
+    """Select points between two kept points with Largest-Triangle-Three-Buckets.
+
+    Points between start and end are split into count buckets. From each bucket
+    the point forming the largest triangle with the previously selected point
+    and the average of the next bucket is selected.
+
+    :param values: List of point values, indexes are x coordinates.
+    :type values: list
+    :param start: Index of the kept point before the selected points.
+    :type start: int
+    :param end: Index of the kept point after the selected points.
+    :type end: int
+    :param count: Number of points to select.
+    :type count: int
+    :return: List of selected indexes.
+    :rtype: list
+    """
+    if count >= end - start - 1:
+        return list(range(start + 1, end))
+    bucket_size = (end - start - 1) / count
+    bounds = [start + 1 + int(bucket * bucket_size) for bucket in range(count)]
+    bounds.append(end)
+    selected = []
+    previous = start
+    for bucket in range(count):
+        if bucket + 1 < count:
+            next_bucket = range(bounds[bucket + 1], bounds[bucket + 2])
+        else:
+            next_bucket = [end]
+        average_x = sum(next_bucket) / len(next_bucket)
+        average_y = sum(values[idx] for idx in next_bucket) / len(next_bucket)
+        previous = max(
+            range(bounds[bucket], bounds[bucket + 1]),
+            key=lambda idx: _get_triangle_area(
+                values, previous, idx, average_x, average_y
+            ),
+        )
+        selected.append(previous)
+    return selected
+
+
+def downsample(trend, points=TREND_POINTS):
+    """Return at most the specified number of summaries preserving the chart shape.
+
+    The first and the last summary and summaries where versions change are kept,
+    even if there are more of them than points.
+
+    :param trend: List of summaries ordered from the oldest one.
+    :type trend: list
+    :param points: Maximal number of summaries, defaults to TREND_POINTS
+    :type points: int, optional
+    :return: List of selected summaries.
+    :rtype: list
+    """
+    if len(trend) <= points:
+        return list(trend)
+    values = [get_passed_percentage(summary) for summary in trend]
+    anchors = get_version_changes(trend)
+    counts = _allocate_points(anchors, points - len(anchors))
+    selected = set(anchors)
+    for start, end, count in zip(anchors, anchors[1:], counts):
+        if count:
+            selected.update(select_points(values, start, end, count))
+    return [trend[idx] for idx in sorted(selected)]
+
+
+def load_trend_and_history(file_dir, count, points=TREND_POINTS):
+    """Load the last trend summaries and the chart history in one pass of the trend.
+
+    :param file_dir: Path to the dir with the trend files.
+    :type file_dir: str
+    :param count: Number of the last summaries to return with all their keys.
+    :type count: int
+    :param points: Maximal number of history summaries, defaults to TREND_POINTS
+    :type points: int, optional
+    :return: List of the last summaries and list of compacted and downsampled
+             history summaries, both empty if there are no trend files.
+    :rtype: tuple
+    """
+    tail = deque(maxlen=count)
+
+    def iter_chart_summaries():
+        for summary in iter_summaries(file_dir):
+            tail.append(summary)
+            yield _get_chart_summary(summary)
+
+    history = downsample(compact(iter_chart_summaries()), points)
+    return list(tail), history
@@ -0,0 +1,121 @@
+"""File watching and local HTTP server of the generator watch mode.
+
+Watched files are polled (no platform specific notification API is needed),
+changes are reported when the files stop changing, so a results file which is
+being written is loaded only once it's complete. With the default interval
+updated pages are generated within a second of the results being written.
+"""
+
+import os
+import threading
+import time
+
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+from socketserver import ThreadingMixIn
+
+
+# Time in seconds between scans of the watched files
+WATCH_INTERVAL = 0.1
+
+
+def scan(file_paths):
+    """Return modification times and sizes of the files.
+
+    :param file_paths: Paths to the files.
+    :type file_paths: list
+    :return: Dictionary with absolute file path as a key and tuple
+             of modification time (ns) and size as a value.
+    :rtype: dict
+    """
+    snapshot = {}
+    for file_path in file_paths:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            continue  # Removed since it was listed
+        snapshot[os.path.abspath(file_path)] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+def get_changed_files(previous, current):
+    """Return files added, removed or modified between two scans.
+
+    :param previous: Snapshot returned by scan.
+    :type previous: dict
+    :param current: Later snapshot returned by scan.
+    :type current: dict
+    :return: Set of absolute file paths.
+    :rtype: set
+    """
+    return {
+        file_path
+        for file_path in set(previous) | set(current)
+        if previous.get(file_path) != current.get(file_path)
+    }
+
+
+class FileWatcher:
+    """Poll watched files for changes."""
+
+    def __init__(self, list_files, interval=WATCH_INTERVAL):
+        """Take the initial snapshot of the watched files.
+
+        :param list_files: Function returning paths to the watched files,
+                           called on each scan, so new files are detected.
+        :type list_files: callable
+        :param interval: Time in seconds between scans, defaults to WATCH_INTERVAL
+        :type interval: float, optional
+        """
+        self._list_files = list_files
+        self._interval = interval
+        self._snapshot = scan(list_files())
+
+    def wait(self):
+        """Block until watched files change and stop changing.
+
+        :return: Set of absolute paths to the changed files.
+        :rtype: set
+        """
+        changed_files = set()
+        while True:
+            time.sleep(self._interval)
+            snapshot = scan(self._list_files())
+            new_changes = get_changed_files(self._snapshot, snapshot)
+            self._snapshot = snapshot
+            if new_changes:
+                changed_files.update(new_changes)
+            elif changed_files:
+                return changed_files
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    """HTTP server handling each request in a separate thread."""
+
+    daemon_threads = True
+
+
+def serve(directory, port):
+    """Serve files of the directory over HTTP in a background thread.
+
+    :param directory: Path to the served directory, e.g. the index deploy dir.
+    :type directory: str
+    :param port: Port of the server, 0 selects a free port.
+    :type port: int
+    :return: Running server, stopped with its shutdown method.
+    :rtype: http.server.HTTPServer
+    """
+    root_dir = os.path.abspath(directory)
+
+    class RequestHandler(SimpleHTTPRequestHandler):
+        def translate_path(self, path):
+            """Return path to the file in the served directory."""
+            file_path = super().translate_path(path)
+            return os.path.join(root_dir, os.path.relpath(file_path, os.getcwd()))
+
+        def log_message(self, *args):
+            """Don't log requests, the console shows the pages updates."""
+
+    server = _ThreadingHTTPServer(("localhost", port), RequestHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server